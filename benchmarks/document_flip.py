@@ -0,0 +1,150 @@
+"""Benchmark flipping a document widget between different documents.
+
+Shows one document and then another in the same document widget, over and
+over, both building new block widgets for each document and recycling the
+block widgets of the document that was on display. Reports how long it
+takes for each document to be on display, along with how many block
+widgets are built, and how many are re-bound, for each flip.
+
+Run with:
+
+    python benchmarks/document_flip.py
+"""
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from asyncio import run
+from statistics import mean
+
+##############################################################################
+# Textual imports.
+from textual.app import App, ComposeResult
+from textual.containers import VerticalScroll
+
+##############################################################################
+# Local imports.
+from hike.widgets.document import Document
+
+
+##############################################################################
+def document(title: str, sections: int) -> str:
+    """Make the Markdown for a document.
+
+    Args:
+        title: The title of the document.
+        sections: The number of sections in the document.
+
+    Returns:
+        The Markdown for the document.
+    """
+    return f"# {title}\n\n" + "".join(
+        f"## {title} section {section}\n\n"
+        f"The first paragraph of section {section} of {title}, with *some* "
+        f"`inline` markup.\n\n"
+        f"The second paragraph of section {section} of {title}.\n\n"
+        + (
+            f"- An item in {title}\n- Another item in {title}\n\n"
+            if section % 3 == 0
+            else ""
+        )
+        + ("---\n\n" if section % 4 == 0 else "")
+        for section in range(sections)
+    )
+
+
+##############################################################################
+class FlipApp(App[None]):
+    """An application for benchmarking flipping between documents."""
+
+    def __init__(self, recycle: bool) -> None:
+        """Initialise the application.
+
+        Args:
+            recycle: Should the document recycle its block widgets?
+        """
+        super().__init__()
+        self._recycle = recycle
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(recycle=self._recycle)
+
+
+##############################################################################
+async def measure(
+    sections: int, recycle: bool, flips: int
+) -> tuple[float, float, float]:
+    """Measure flipping between documents.
+
+    Args:
+        sections: The number of sections in each document.
+        recycle: Should the document recycle its block widgets?
+        flips: The number of times to flip between the documents.
+
+    Returns:
+        The average seconds taken for a document to be on display, and the
+        average number of block widgets built and re-bound for each flip.
+    """
+    documents = (document("Alpha", sections), document("Beta", sections))
+    app = FlipApp(recycle)
+    shown: list[float] = []
+    built: list[int] = []
+    recycled: list[int] = []
+    async with app.run_test(size=(120, 40)) as pilot:
+        widget = app.query_one(Document)
+        for flip in range(flips + 1):
+            await widget.update(documents[flip % 2])
+            while widget.timings.complete is None:
+                await pilot.pause()
+            # The first document goes into an empty widget, so it's not
+            # counted as a flip.
+            if flip:
+                shown.append(widget.timings.complete)
+                built.append(widget.timings.built)
+                recycled.append(widget.timings.recycled)
+    return mean(shown), mean(built), mean(recycled)
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The arguments.
+    """
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sections",
+        type=int,
+        nargs="+",
+        default=[10, 50, 100, 250],
+        help="The section counts to benchmark",
+    )
+    parser.add_argument(
+        "--flips", type=int, default=10, help="The number of flips to make"
+    )
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    args = get_args()
+    print(
+        f"{'Sections':>8} {'Widgets':>8} {'Shown (s)':>10} {'Built':>7} {'Re-bound':>9}"
+    )
+    for sections in args.sections:
+        for recycle in (False, True):
+            shown, built, recycled = run(measure(sections, recycle, args.flips))
+            print(
+                f"{sections:>8} {'recycled' if recycle else 'new':>8} "
+                f"{shown:>10.3f} {built:>7.0f} {recycled:>9.0f}"
+            )
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### document_flip.py ends here
@@ -0,0 +1,145 @@
+"""Benchmark the scrolling of large Markdown tables.
+
+Shows tables of increasing size, both as Textual's own table (a widget
+for every cell) and as Hike's virtual table, and reports how long it
+takes for the table to be on display, along with the average time it
+takes to draw a frame while scrolling through it.
+
+Run with:
+
+    python benchmarks/table_scroll.py
+"""
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from asyncio import run
+from statistics import mean
+from time import perf_counter
+
+##############################################################################
+# Textual imports.
+from textual.app import App, ComposeResult
+from textual.containers import VerticalScroll
+
+##############################################################################
+# Local imports.
+from hike.widgets.document import Document
+
+
+##############################################################################
+def table(rows: int) -> str:
+    """Make the Markdown for a table.
+
+    Args:
+        rows: The number of rows in the table.
+
+    Returns:
+        The Markdown for the table.
+    """
+    return "| Package | Version | Licence | Notes |\n|---|---|---|---|\n" + "".join(
+        f"| package-{row} | {row // 100}.{row % 100}.0 | MIT | Row {row} of the table |\n"
+        for row in range(rows)
+    )
+
+
+##############################################################################
+class TableApp(App[None]):
+    """An application for benchmarking the showing of a table."""
+
+    def __init__(self, markdown: str, virtual: bool) -> None:
+        """Initialise the application.
+
+        Args:
+            markdown: The Markdown to show.
+            virtual: Should the table be shown virtually?
+        """
+        super().__init__()
+        self._markdown = markdown
+        self._virtual = virtual
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(
+                self._markdown, virtual_table_rows=0 if self._virtual else None
+            )
+
+
+##############################################################################
+async def measure(rows: int, virtual: bool, frames: int) -> tuple[float, float]:
+    """Measure the showing and scrolling of a table.
+
+    Args:
+        rows: The number of rows in the table.
+        virtual: Should the table be shown virtually?
+        frames: The number of frames to scroll through.
+
+    Returns:
+        The seconds taken to show the table, and the average seconds per
+        frame while scrolling.
+    """
+    app = TableApp(table(rows), virtual)
+    async with app.run_test(size=(120, 40)) as pilot:
+        while (app.query_one(Document).timings.complete) is None:
+            await pilot.pause()
+        shown = app.query_one(Document).timings.complete or 0.0
+        scroller = app.query_one(VerticalScroll)
+        step = max(scroller.max_scroll_y // frames, 1)
+        timings: list[float] = []
+        for frame in range(frames):
+            started = perf_counter()
+            scroller.scroll_to(y=frame * step, animate=False)
+            await pilot.pause()
+            timings.append(perf_counter() - started)
+        return shown, mean(timings)
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The arguments.
+    """
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[100, 500, 1_000, 5_000, 20_000],
+        help="The row counts to benchmark",
+    )
+    parser.add_argument(
+        "--grid-limit",
+        type=int,
+        default=5_000,
+        help="The largest row count to benchmark Textual's own table with",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=50, help="The number of frames to scroll"
+    )
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """Main entry point for the benchmark."""
+    args = get_args()
+    print(f"{'Rows':>8} {'Table':>8} {'Shown (s)':>10} {'Frame (ms)':>11}")
+    for rows in args.rows:
+        for virtual in (False, True):
+            if not virtual and rows > args.grid_limit:
+                print(f"{rows:>8} {'grid':>8} {'skipped':>10} {'':>11}")
+                continue
+            shown, frame = run(measure(rows, virtual, args.frames))
+            print(
+                f"{rows:>8} {'virtual' if virtual else 'grid':>8} "
+                f"{shown:>10.3f} {frame * 1000:>11.2f}"
+            )
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### table_scroll.py ends here
@@ -15,6 +15,7 @@ from .main import (
     SaveCopy,
     SearchBookmarks,
     ToggleNavigation,
+    ToggleOutline,
 )
 from .navigation import (
     Backward,
@@ -46,6 +47,7 @@ __all__ = [
     "SaveCopy",
     "SearchBookmarks",
     "ToggleNavigation",
+    "ToggleOutline",
 ]
 
 ### __init__.py ends here
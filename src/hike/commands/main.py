@@ -21,6 +21,13 @@ class ChangeNavigationSide(Command):
     BINDING_KEY = "shift+f2"
 
 
+##############################################################################
+class ToggleOutline(Command):
+    """Toggle showing documents as an outline of collapsible sections"""
+
+    BINDING_KEY = "f6"
+
+
 ##############################################################################
 class JumpToCommandLine(Command):
     """Jump to the command line"""
@@ -10,6 +10,7 @@ from .config import (
     save_configuration,
     update_configuration,
 )
+from .forge_cache import cached_forge_url, forget_forge_url, remember_forge_url
 from .history import load_history, save_history
 from .location_types import is_editable, looks_urllike, maybe_markdown
 
@@ -19,6 +20,8 @@ __all__ = [
     "Bookmark",
     "Bookmarks",
     "Configuration",
+    "cached_forge_url",
+    "forget_forge_url",
     "is_editable",
     "load_bookmarks",
     "load_command_history",
@@ -26,6 +29,7 @@ __all__ = [
     "load_history",
     "looks_urllike",
     "maybe_markdown",
+    "remember_forge_url",
     "save_bookmarks",
     "save_command_history",
     "save_configuration",
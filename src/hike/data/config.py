@@ -28,6 +28,9 @@ class Configuration:
     navigation_on_right: bool = False
     """Should the navigation panel live on the right?"""
 
+    outline_mode: bool = False
+    """Should documents be shown as an outline of collapsible sections?"""
+
     markdown_extensions: list[str] = field(default_factory=lambda: [".md", ".markdown"])
     """The file extensions to consider to be Markdown files."""
 
@@ -36,6 +39,15 @@ class Configuration:
     )
     """The content types to consider when looking for remote Markdown content."""
 
+    markdown_sniff_size: int = 512
+    """The number of bytes to look at when a server doesn't give a content type.
+
+    Set to `0` to treat such content as not being Markdown.
+    """
+
+    maximum_markdown_size: int = 10 * 1024 * 1024
+    """The maximum size, in bytes, of a remote Markdown document."""
+
     command_line_on_top: bool = False
     """Should the command line live at the top of the screen?"""
 
@@ -45,6 +57,124 @@ class Configuration:
     obsidian_vaults: str = "~/Library/Mobile Documents/iCloud~md~obsidian/Documents"
     """The path to the root of all Obsidian vaults."""
 
+    http2: bool = True
+    """Should HTTP/2 be used, where it's available?"""
+
+    http_max_connections: int = 10
+    """The maximum number of concurrent connections to make."""
+
+    http_max_keepalive_connections: int = 5
+    """The maximum number of idle connections to keep alive."""
+
+    http_keepalive_expiry: float = 30.0
+    """The number of seconds to keep an idle connection alive for."""
+
+    http_timeout: float = 10.0
+    """The number of seconds to wait on the network before giving up."""
+
+    http_connect_timeout: float = 5.0
+    """The number of seconds to wait for a connection before giving up."""
+
+    http_cache_size: int = 50 * 1024 * 1024
+    """The maximum size, in bytes, of the cache of downloaded documents."""
+
+    forge_probe_concurrency: int = 4
+    """The maximum number of branches to look for a file on at once."""
+
+    readme_names: list[str] = field(
+        default_factory=lambda: [
+            "README.md",
+            "README.markdown",
+            "docs/README.md",
+            ".github/README.md",
+        ]
+    )
+    """The names of README files to look for on forges, in order of preference."""
+
+    forge_cache_ttl: int = 7 * 24 * 60 * 60
+    """The number of seconds to remember where a file on a forge was found."""
+
+    prefetch_links: bool = False
+    """Should Markdown documents linked to from the current document be prefetched?"""
+
+    prefetch_limit: int = 20
+    """The maximum number of linked documents to prefetch."""
+
+    prefetch_concurrency: int = 2
+    """The maximum number of linked documents to prefetch at once."""
+
+    prefetch_cache_size: int = 50
+    """The maximum number of prefetched local documents to hold on to."""
+
+    virtual_document_threshold: int = 1024 * 1024
+    """The size of document at which only the part of it in view is rendered."""
+
+    virtual_table_rows: int = 200
+    """The number of rows at which only the part of a table in view is rendered."""
+
+    virtual_table_cells: int = 2000
+    """The number of cells at which only the part of a table in view is rendered."""
+
+    rendered_documents: int = 5
+    """The number of rendered documents to keep around for return visits."""
+
+    rendered_documents_size: int = 5 * 1024 * 1024
+    """The maximum total size of the sources of the rendered documents kept around."""
+
+    recycled_block_widgets: int = 2_000
+    """The maximum number of block widgets to keep around for showing new documents with.
+
+    Set to `0` to always build new widgets for a new document.
+    """
+
+    source_store_size: int = 16 * 1024 * 1024
+    """The maximum total size of the compressed sources of documents kept around."""
+
+    source_compression: str = "zlib"
+    """How to compress the sources of documents kept around; `zlib` or `lzma`."""
+
+    parse_cache_entries: int = 20
+    """The maximum number of parsed documents to keep in memory."""
+
+    parse_cache_size: int = 20 * 1024 * 1024
+    """The maximum total size of the sources of the parsed documents kept in memory."""
+
+    parse_cache_on_disk: bool = False
+    """Should the parsed form of large documents also be kept on disk?"""
+
+    parse_cache_disk_threshold: int = 256 * 1024
+    """The size a document needs to be before its parsed form is kept on disk."""
+
+    parse_cache_disk_size: int = 100 * 1024 * 1024
+    """The maximum size, in bytes, of the parsed documents kept on disk."""
+
+    parse_process_threshold: int = 512 * 1024
+    """The size of document at which it is parsed in a separate process.
+
+    Set to `0` to always parse documents on a thread.
+    """
+
+    parse_processes: int = 2
+    """The maximum number of processes to parse documents in."""
+
+    highlight_cache_entries: int = 1024
+    """The maximum number of highlighted code blocks to keep around."""
+
+    progressive_load_threshold: int = 2 * 1024 * 1024
+    """The size of document at which it is shown as it's loaded."""
+
+    progressive_load_chunk_size: int = 128 * 1024
+    """The size of the chunks a document is loaded in when it's shown as it's loaded."""
+
+    watch_local_documents: bool = False
+    """Should a local document be reloaded when it changes on disk?"""
+
+    watch_debounce: float = 0.25
+    """The number of seconds a watched document needs to be quiet before it's reloaded."""
+
+    watch_poll_interval: float = 1.0
+    """The number of seconds between checks of a watched document, if it has to be polled."""
+
 
 ##############################################################################
 def configuration_file() -> Path:
@@ -0,0 +1,186 @@
+"""Provides code for remembering where files on forges were found."""
+
+##############################################################################
+# Python imports.
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
+from time import time
+from typing import Any
+
+##############################################################################
+# httpx imports.
+from httpx import URL
+
+##############################################################################
+# Local imports.
+from .config import load_configuration
+from .locations import data_dir
+
+
+##############################################################################
+def forge_cache_file() -> Path:
+    """The path of the forge resolution cache file.
+
+    Returns:
+        The path for the forge resolution cache file.
+    """
+    return data_dir() / "forge-cache.json"
+
+
+##############################################################################
+def _is_entry(entry: Any) -> bool:
+    """Does something look like an entry in the forge resolution cache?
+
+    Args:
+        entry: The thing to check.
+
+    Returns:
+        `True` if it looks like an entry, `False` if not.
+    """
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("url"), str)
+        and isinstance(entry.get("resolved", 0), (int, float))
+    )
+
+
+##############################################################################
+def _load_forge_cache() -> dict[str, dict[str, Any]]:
+    """Load the forge resolution cache.
+
+    Returns:
+        The content of the cache.
+
+    Note:
+        A cache file that can't be read, or that isn't what's expected, is
+        treated as an empty cache; any entry in it that isn't what's
+        expected is ignored.
+    """
+    try:
+        cache = loads(forge_cache_file().read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, JSONDecodeError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return {key: entry for key, entry in cache.items() if _is_entry(entry)}
+
+
+##############################################################################
+def _save_forge_cache(cache: dict[str, dict[str, Any]]) -> None:
+    """Save the forge resolution cache.
+
+    Args:
+        cache: The cache to save.
+
+    Note:
+        The cache is only there to save looking things up again, so if it
+        can't be saved it's simply not saved.
+    """
+    try:
+        forge_cache_file().write_text(dumps(cache, indent=4), encoding="utf-8")
+    except OSError:
+        pass
+
+
+##############################################################################
+def _key(
+    forge: str, owner: str, repository: str, branch: str | None, filename: str | None
+) -> str:
+    """Make the cache key for a file on a forge.
+
+    Args:
+        forge: The name of the forge.
+        owner: The owner of the repository.
+        repository: The name of the repository.
+        branch: The branch asked for, if one was.
+        filename: The file asked for, if one was.
+
+    Returns:
+        The key for the cache.
+
+    Note:
+        Forges treat the names of owners and repositories without regard
+        to case, but branches and paths within a repository are
+        case-sensitive; so only the former are folded.
+    """
+    where = f"{forge}:{owner}/{repository}".casefold()
+    return f"{where}:{branch or ''}:{filename or ''}"
+
+
+##############################################################################
+def cached_forge_url(
+    forge: str, owner: str, repository: str, branch: str | None, filename: str | None
+) -> URL | None:
+    """Get the previously-resolved URL for a file on a forge.
+
+    Args:
+        forge: The name of the forge.
+        owner: The owner of the repository.
+        repository: The name of the repository.
+        branch: The branch asked for, if one was.
+        filename: The file asked for, if one was.
+
+    Returns:
+        The URL if it is known and hasn't expired, otherwise `None`.
+    """
+    if (
+        entry := _load_forge_cache().get(
+            _key(forge, owner, repository, branch, filename)
+        )
+    ) is None:
+        return None
+    if time() - entry.get("resolved", 0) > load_configuration().forge_cache_ttl:
+        return None
+    return URL(entry["url"])
+
+
+##############################################################################
+def remember_forge_url(
+    forge: str,
+    owner: str,
+    repository: str,
+    branch: str | None,
+    filename: str | None,
+    url: URL,
+) -> None:
+    """Remember the resolved URL for a file on a forge.
+
+    Args:
+        forge: The name of the forge.
+        owner: The owner of the repository.
+        repository: The name of the repository.
+        branch: The branch asked for, if one was.
+        filename: The file asked for, if one was.
+        url: The URL the file was found at.
+    """
+    now = time()
+    ttl = load_configuration().forge_cache_ttl
+    cache = {
+        key: entry
+        for key, entry in _load_forge_cache().items()
+        if now - entry.get("resolved", 0) <= ttl
+    }
+    cache[_key(forge, owner, repository, branch, filename)] = {
+        "url": str(url),
+        "resolved": now,
+    }
+    _save_forge_cache(cache)
+
+
+##############################################################################
+def forget_forge_url(url: URL) -> None:
+    """Forget any forge resolutions that led to the given URL.
+
+    Args:
+        url: The URL to forget.
+    """
+    cache = _load_forge_cache()
+    if len(
+        remaining := {
+            key: entry for key, entry in cache.items() if entry.get("url") != str(url)
+        }
+    ) != len(cache):
+        _save_forge_cache(remaining)
+
+
+### forge_cache.py ends here
@@ -3,6 +3,7 @@
 ##############################################################################
 # Python imports.
 from argparse import Namespace
+from asyncio import to_thread
 
 ##############################################################################
 # Textual imports.
@@ -19,6 +20,7 @@ from .data import (
     load_configuration,
     update_configuration,
 )
+from .network import close_http_client, flush_http_cache
 from .screens import Main
 
 
@@ -73,6 +75,11 @@ class Hike(EnhancedApp[None]):
         with update_configuration() as config:
             config.theme = self.theme
 
+    async def on_unmount(self) -> None:
+        """Tidy up as the application shuts down."""
+        await close_http_client()
+        await to_thread(flush_http_cache)
+
     def get_default_screen(self) -> Main:
         """Get the default screen for the application.
 
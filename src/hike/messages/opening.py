@@ -2,12 +2,13 @@
 
 ##############################################################################
 # Python imports.
+from asyncio import to_thread
 from dataclasses import dataclass
 from pathlib import Path
 
 ##############################################################################
 # httpx imports.
-from httpx import URL, AsyncClient, HTTPStatusError, RequestError
+from httpx import URL, RequestError
 
 ##############################################################################
 # Textual imports.
@@ -15,8 +16,13 @@ from textual.message import Message
 
 ##############################################################################
 # Local imports.
-from .. import USER_AGENT
-from ..data import load_configuration
+from ..data import cached_forge_url, load_configuration, remember_forge_url
+from ..network import (
+    RepositoryDetails,
+    first_available,
+    readme_candidates,
+    repository_details,
+)
 from ..types import HikeLocation
 
 
@@ -70,41 +76,115 @@ class OpenFromForge(Message):
     filename: str | None = None
     """The optional name of the file to open."""
 
+    def _raw_url(self, branch: str, filename: str) -> str:
+        """Make the raw URL for a file on a branch.
+
+        Args:
+            branch: The branch the file is on.
+            filename: The name of the file.
+
+        Returns:
+            The raw URL for the file.
+        """
+        return self.raw_url_format.format(
+            owner=self.owner, repository=self.repository, branch=branch, file=filename
+        )
+
+    async def _readme_url(self) -> URL | None:
+        """Find the URL of the repository's README.
+
+        Returns:
+            The URL if one could be worked out, or `None` if not.
+
+        Raises:
+            RequestError: If there was a problem talking to the forge.
+
+        Note:
+            This asks the forge about the repository, which tells us its
+            default branch and (depending on the forge) what's in it, and
+            from that works out the most likely README.
+        """
+        if (
+            details := await repository_details(self.forge, self.owner, self.repository)
+        ) is None or (branch := self.branch or details.branch) is None:
+            return None
+        if details.branch != branch:
+            # What we know about the content relates to a different branch,
+            # so all we can rely on is the branch we've been asked for.
+            details = RepositoryDetails(branch=branch)
+        configuration = load_configuration()
+        if not (candidates := readme_candidates(details, configuration.readme_names)):
+            return None
+        if details.has(candidates[0]):
+            return URL(self._raw_url(branch, candidates[0]))
+        return await first_available(
+            [self._raw_url(branch, candidate) for candidate in candidates],
+            configuration.forge_probe_concurrency,
+        )
+
+    async def _probe_url(self) -> URL | None:
+        """Find the URL of the file by looking on the candidate branches.
+
+        Returns:
+            The URL if one could be worked out, or `None` if not.
+
+        Raises:
+            RequestError: If there was a problem talking to the forge.
+        """
+        configuration = load_configuration()
+        return await first_available(
+            [
+                self._raw_url(candidate_branch, self.filename or "README.md")
+                for candidate_branch in (
+                    [self.branch] if self.branch else configuration.main_branches
+                )
+            ],
+            configuration.forge_probe_concurrency,
+        )
+
     async def url(self) -> URL | None:
         """The URL for the file on the forge.
 
         Returns:
             The URL if one could be worked out, or `None` if not.
         """
-        filename = self.filename or "README.md"
-        async with AsyncClient() as client:
-            for candidate_branch in (
-                [self.branch] if self.branch else load_configuration().main_branches
-            ):
-                url = self.raw_url_format.format(
-                    owner=self.owner,
-                    repository=self.repository,
-                    branch=candidate_branch,
-                    file=filename,
-                )
-                try:
-                    response = await client.head(
-                        url, follow_redirects=True, headers={"user-agent": USER_AGENT}
-                    )
-                except RequestError:
-                    # A failed request would suggest further attempts aren't
-                    # going to work so let's GTFO now.
-                    return None
-                try:
-                    response.raise_for_status()
-                except HTTPStatusError:
-                    # Some sort of status error means we at least managed to
-                    # contact the server, but didn't quite hit it with the
-                    # URL we had; so let's go around again.
-                    continue
-                # If we're here we got a working URL, so let's go with that.
-                return URL(url)
-        return None
+        # If we've found this file before, there's no need to go looking
+        # for it again.
+        if (
+            cached := await to_thread(
+                cached_forge_url,
+                self.forge,
+                self.owner,
+                self.repository,
+                self.branch,
+                self.filename,
+            )
+        ) is not None:
+            return cached
+
+        try:
+            # If we've not been asked for a specific file we're after the
+            # README, so ask the forge what it can tell us about that; if
+            # that's no help we'll fall back to looking for it ourselves.
+            url = (await self._readme_url() if self.filename is None else None) or (
+                await self._probe_url()
+            )
+        except RequestError:
+            # A failed request would suggest that we can't talk to the
+            # forge at all, so there's no sensible answer.
+            return None
+
+        if url is not None:
+            await to_thread(
+                remember_forge_url,
+                self.forge,
+                self.owner,
+                self.repository,
+                self.branch,
+                self.filename,
+                url,
+            )
+        return url
 
 
 ### opening.py ends here
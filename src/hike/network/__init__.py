@@ -0,0 +1,45 @@
+"""Provides code for getting things from the network."""
+
+##############################################################################
+# Local imports.
+from .cache import (
+    CachedResponse,
+    HTTPCache,
+    canonical_url,
+    flush_http_cache,
+    http_cache,
+)
+from .client import close_http_client, http2_available, http_client
+from .download import Download, download_markdown, is_markdown_type
+from .forges import (
+    FORGE_APIS,
+    ForgeAPI,
+    RepositoryDetails,
+    readme_candidates,
+    repository_details,
+)
+from .probe import first_available
+
+##############################################################################
+# Exports.
+__all__ = [
+    "FORGE_APIS",
+    "CachedResponse",
+    "Download",
+    "ForgeAPI",
+    "HTTPCache",
+    "RepositoryDetails",
+    "canonical_url",
+    "close_http_client",
+    "download_markdown",
+    "first_available",
+    "flush_http_cache",
+    "http2_available",
+    "http_cache",
+    "http_client",
+    "is_markdown_type",
+    "readme_candidates",
+    "repository_details",
+]
+
+### __init__.py ends here
@@ -0,0 +1,391 @@
+"""Provides an on-disk cache of HTTP responses."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import asdict, dataclass, replace
+from hashlib import sha256
+from json import dumps, loads
+from pathlib import Path
+from re import compile
+from threading import Lock
+from time import time
+from typing import Final
+
+##############################################################################
+# httpx imports.
+from httpx import URL, Headers
+
+##############################################################################
+# Local imports.
+from ..data import load_configuration
+from ..data.locations import data_dir
+
+##############################################################################
+_MAX_AGE: Final = compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)\"?")
+"""Regular expression for finding the max-age in a Cache-Control header."""
+
+
+##############################################################################
+def canonical_url(url: URL) -> str:
+    """Get the canonical form of a URL, for use as a cache key.
+
+    Args:
+        url: The URL to get the canonical form of.
+
+    Returns:
+        The canonical form of the URL.
+    """
+    return str(url.copy_with(fragment=None))
+
+
+##############################################################################
+@dataclass(frozen=True)
+class CachedResponse:
+    """Details of a response held in the cache."""
+
+    url: str
+    """The canonical URL the response came from."""
+
+    content_type: str
+    """The content type of the response."""
+
+    etag: str | None
+    """The ETag of the response, if there was one."""
+
+    last_modified: str | None
+    """The Last-Modified value of the response, if there was one."""
+
+    max_age: int | None
+    """The max-age of the response, if there was one."""
+
+    validated: float
+    """The time at which the response was last known to be good."""
+
+    last_used: float
+    """The time at which the response was last taken from the cache."""
+
+    size: int
+    """The size of the body of the response, in bytes."""
+
+    @property
+    def is_fresh(self) -> bool:
+        """Can the response be used without checking with the server?"""
+        return self.max_age is not None and (time() - self.validated) < self.max_age
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        """The headers to use to revalidate this response with the server."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["if-none-match"] = self.etag
+        if self.last_modified:
+            headers["if-modified-since"] = self.last_modified
+        return headers
+
+
+##############################################################################
+def _max_age(headers: Headers) -> int | None:
+    """Get the max-age from some response headers.
+
+    Args:
+        headers: The headers to look in.
+
+    Returns:
+        The max-age, or `None` if there wasn't one.
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-cache" in cache_control:
+        return 0
+    if max_age := _MAX_AGE.search(cache_control):
+        return int(max_age[1])
+    return None
+
+
+##############################################################################
+class HTTPCache:
+    """A size-bounded, least-recently-used, on-disk cache of HTTP responses.
+
+    The index of the cache is read the first time the cache is used. When
+    a response is taken from the cache, the time it was used is only
+    recorded in memory; the index is written out after every so many uses,
+    along with any other change to the cache, or when `flush` is called.
+
+    Note:
+        As it works with files, the cache is best used away from the event
+        loop; it is safe to use from more than one thread.
+    """
+
+    SAVE_EVERY: Final[int] = 32
+    """The number of uses of the cache after which the index is saved."""
+
+    def __init__(self, root: Path, max_size: int) -> None:
+        """Initialise the cache.
+
+        Args:
+            root: The directory to keep the cache in.
+            max_size: The maximum size, in bytes, of the cached bodies.
+        """
+        self._root = root
+        """The directory that holds the cache."""
+        self._max_size = max_size
+        """The maximum size, in bytes, of the cached bodies."""
+        self._loaded: dict[str, CachedResponse] | None = None
+        """The entries in the cache, once they've been loaded."""
+        self._unsaved = 0
+        """The number of uses of the cache since the index was saved."""
+        self._lock = Lock()
+        """Lock for access to the cache."""
+
+    @property
+    def _index(self) -> Path:
+        """The path to the index of the cache."""
+        return self._root / "index.json"
+
+    @property
+    def _entries(self) -> dict[str, CachedResponse]:
+        """The entries in the cache.
+
+        Note:
+            The entries are loaded from the index the first time they're
+            needed. The caller is expected to hold the lock.
+        """
+        if self._loaded is None:
+            self._loaded = {}
+            if self._index.exists():
+                try:
+                    self._loaded = {
+                        key: CachedResponse(**entry)
+                        for key, entry in loads(
+                            self._index.read_text(encoding="utf-8")
+                        ).items()
+                    }
+                except (OSError, ValueError, TypeError):
+                    # If the index is unreadable the cache is useless, so
+                    # start again from nothing.
+                    pass
+        return self._loaded
+
+    def _body(self, key: str) -> Path:
+        """Get the path of the body for a given key.
+
+        Args:
+            key: The key of the entry.
+
+        Returns:
+            The path to the file that holds the body.
+        """
+        return self._root / f"{key}.body"
+
+    @staticmethod
+    def _key(url: URL) -> str:
+        """Get the cache key for a URL.
+
+        Args:
+            url: The URL to get the key for.
+
+        Returns:
+            The key for the URL.
+        """
+        return sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def _save_index(self) -> None:
+        """Save the index of the cache.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        self._unsaved = 0
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._index.write_text(
+                dumps({key: asdict(entry) for key, entry in self._entries.items()}),
+                encoding="utf-8",
+            )
+        except OSError:
+            pass
+
+    def flush(self) -> None:
+        """Save the index of the cache, if it has unsaved uses."""
+        with self._lock:
+            if self._unsaved:
+                self._save_index()
+
+    @property
+    def size(self) -> int:
+        """The total size, in bytes, of the cached bodies."""
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        """The number of responses in the cache."""
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, url: object) -> bool:
+        """Is a response for the given URL in the cache?"""
+        with self._lock:
+            return isinstance(url, URL) and self._key(url) in self._entries
+
+    def get(self, url: URL) -> tuple[CachedResponse, str] | None:
+        """Get a response from the cache.
+
+        Args:
+            url: The URL to get the response for.
+
+        Returns:
+            The details of the response and its body, or `None` if there is
+            nothing cached for the URL.
+        """
+        with self._lock:
+            if (entry := self._entries.get(key := self._key(url))) is None:
+                return None
+            try:
+                body = self._body(key).read_text(encoding="utf-8")
+            except OSError:
+                self._remove(key)
+                self._save_index()
+                return None
+            self._entries[key] = entry = replace(entry, last_used=time())
+            self._unsaved += 1
+            if self._unsaved >= self.SAVE_EVERY:
+                self._save_index()
+            return entry, body
+
+    def store(self, url: URL, headers: Headers, body: str) -> None:
+        """Store a response in the cache.
+
+        Args:
+            url: The URL the response came from.
+            headers: The headers of the response.
+            body: The body of the response.
+        """
+        if "no-store" in headers.get("cache-control", "").lower():
+            self.forget(url)
+            return
+        if (size := len(encoded := body.encode("utf-8"))) > self._max_size:
+            return
+        with self._lock:
+            try:
+                self._root.mkdir(parents=True, exist_ok=True)
+                self._body(key := self._key(url)).write_bytes(encoded)
+            except OSError:
+                return
+            self._entries[key] = CachedResponse(
+                url=canonical_url(url),
+                content_type=headers.get("content-type", ""),
+                etag=headers.get("etag"),
+                last_modified=headers.get("last-modified"),
+                max_age=_max_age(headers),
+                validated=(now := time()),
+                last_used=now,
+                size=size,
+            )
+            self._evict()
+            self._save_index()
+
+    def revalidated(self, url: URL, headers: Headers) -> None:
+        """Record that the server says a cached response is still good.
+
+        Args:
+            url: The URL of the response.
+            headers: The headers of the not-modified response.
+        """
+        with self._lock:
+            if (entry := self._entries.get(key := self._key(url))) is not None:
+                self._entries[key] = replace(
+                    entry,
+                    etag=headers.get("etag", entry.etag),
+                    last_modified=headers.get("last-modified", entry.last_modified),
+                    max_age=_max_age(headers)
+                    if "cache-control" in headers
+                    else entry.max_age,
+                    validated=time(),
+                )
+                self._save_index()
+
+    def expire(self, url: URL) -> None:
+        """Mark a cached response as needing revalidation before use.
+
+        Args:
+            url: The URL of the response to expire.
+
+        Note:
+            Like a use of the cache, this is only saved along with the next
+            change to the index.
+        """
+        with self._lock:
+            if (entry := self._entries.get(key := self._key(url))) is not None:
+                self._entries[key] = replace(entry, max_age=0)
+                self._unsaved += 1
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry from the cache.
+
+        Args:
+            key: The key of the entry to remove.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        del self._entries[key]
+        self._body(key).unlink(missing_ok=True)
+
+    def forget(self, url: URL) -> None:
+        """Remove any response for the given URL from the cache.
+
+        Args:
+            url: The URL to forget.
+        """
+        with self._lock:
+            if (key := self._key(url)) in self._entries:
+                self._remove(key)
+                self._save_index()
+
+    def _evict(self) -> None:
+        """Evict the least-recently-used entries until the cache fits.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        total = sum(entry.size for entry in self._entries.values())
+        for key, entry in sorted(
+            self._entries.items(), key=lambda item: item[1].last_used
+        ):
+            if total <= self._max_size:
+                break
+            self._remove(key)
+            total -= entry.size
+
+
+##############################################################################
+_cache: HTTPCache | None = None
+"""The application-wide HTTP cache."""
+
+
+##############################################################################
+def http_cache() -> HTTPCache:
+    """Get the application-wide HTTP cache.
+
+    Returns:
+        The HTTP cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = HTTPCache(
+            data_dir() / "cache" / "http", load_configuration().http_cache_size
+        )
+    return _cache
+
+
+##############################################################################
+def flush_http_cache() -> None:
+    """Save any unsaved changes to the application-wide HTTP cache."""
+    if _cache is not None:
+        _cache.flush()
+
+
+### cache.py ends here
@@ -0,0 +1,73 @@
+"""Provides the application-wide HTTP client."""
+
+##############################################################################
+# Python imports.
+from importlib.util import find_spec
+
+##############################################################################
+# httpx imports.
+from httpx import AsyncClient, Limits, Timeout
+
+##############################################################################
+# Local imports.
+from .. import USER_AGENT
+from ..data import load_configuration
+
+##############################################################################
+_client: AsyncClient | None = None
+"""The shared HTTP client."""
+
+
+##############################################################################
+def http2_available() -> bool:
+    """Is HTTP/2 support available?
+
+    Returns:
+        `True` if the optional HTTP/2 support is installed, `False` if not.
+    """
+    return find_spec("h2") is not None
+
+
+##############################################################################
+def http_client() -> AsyncClient:
+    """Get the application-wide HTTP client.
+
+    Returns:
+        The HTTP client.
+
+    Note:
+        The client is created the first time it is asked for, and is then
+        shared by everything that needs to talk to the outside world; this
+        means that connections to a host are kept alive and reused between
+        requests.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        configuration = load_configuration()
+        _client = AsyncClient(
+            http2=configuration.http2 and http2_available(),
+            limits=Limits(
+                max_connections=configuration.http_max_connections,
+                max_keepalive_connections=configuration.http_max_keepalive_connections,
+                keepalive_expiry=configuration.http_keepalive_expiry,
+            ),
+            timeout=Timeout(
+                configuration.http_timeout,
+                connect=configuration.http_connect_timeout,
+            ),
+            headers={"user-agent": USER_AGENT},
+            follow_redirects=True,
+        )
+    return _client
+
+
+##############################################################################
+async def close_http_client() -> None:
+    """Close the application-wide HTTP client, if it's open."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+### client.py ends here
@@ -0,0 +1,190 @@
+"""Provides code for downloading Markdown documents."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from codecs import getincrementaldecoder
+from dataclasses import dataclass
+from typing import Callable
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncClient, Response
+
+##############################################################################
+# Local imports.
+from ..data import load_configuration
+from .client import http_client
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Download:
+    """The result of downloading a document."""
+
+    response: Response
+    """The response; its body will already have been dealt with."""
+
+    markdown: str | None = None
+    """The Markdown, if the document was Markdown."""
+
+    too_large: bool = False
+    """Was the document Markdown, but too large to download?"""
+
+
+##############################################################################
+def is_markdown_type(content_type: str) -> bool:
+    """Is the given content type one that we consider to be Markdown?
+
+    Args:
+        content_type: The content type to check.
+
+    Returns:
+        `True` if the content type is for Markdown, `False` if not.
+    """
+    return any(
+        content_type.startswith(allowed_type)
+        for allowed_type in load_configuration().markdown_content_types
+    )
+
+
+##############################################################################
+def looks_like_markdown(prefix: bytes) -> bool:
+    """Does the start of a document look like it could be Markdown?
+
+    Args:
+        prefix: The start of the document.
+
+    Returns:
+        `True` if it could be Markdown, `False` if it's clearly not.
+
+    Note:
+        This is used when a server doesn't say what the content is, and so
+        is only a rough check for something that is plain text and isn't
+        HTML.
+    """
+    if b"\0" in prefix:
+        return False
+    try:
+        text = prefix.decode("utf-8")
+    except UnicodeDecodeError as error:
+        # The prefix may well have chopped a character in half, so only
+        # worry if the problem is before the very end.
+        if error.start < len(prefix) - 3:
+            return False
+        text = prefix[: error.start].decode("utf-8")
+    return not text.lstrip().lower().startswith(("<!doctype html", "<html"))
+
+
+##############################################################################
+def _expected_size(response: Response) -> int:
+    """Get the size of the body that a response says it has.
+
+    Args:
+        response: The response.
+
+    Returns:
+        The size of the body, or `0` if the response doesn't say, or what it
+        says makes no sense.
+    """
+    try:
+        return max(int(response.headers.get("content-length", 0) or 0), 0)
+    except ValueError:
+        return 0
+
+
+##############################################################################
+async def download_markdown(
+    location: URL,
+    headers: dict[str, str] | None = None,
+    client: AsyncClient | None = None,
+    progress: Callable[[str], None] | None = None,
+    progress_threshold: int = 0,
+) -> Download:
+    """Download a document, so long as it's Markdown.
+
+    Args:
+        location: The location of the document to download.
+        headers: Any extra headers to send with the request.
+        client: The client to use, or `None` to use the shared client.
+        progress: Function to call with each piece of the document as it
+            arrives, or `None` if the pieces aren't of interest.
+        progress_threshold: The size the document needs to be, or to be
+            expected to be, before `progress` is called.
+
+    Returns:
+        The result of the download.
+
+    Raises:
+        RequestError: If there was a problem making the request.
+
+    Note:
+        The body of the response is only downloaded if the response is a
+        successful one and the document is Markdown, or looks like it could
+        be; otherwise the connection is dropped as soon as the headers have
+        arrived. The body is also abandoned as soon as it's known to be
+        larger than the configured maximum size of a Markdown document.
+
+        Once `progress` is being called, it is called with all of the
+        document that has arrived so far, then with each piece after that as
+        it arrives. It is only called once the document is known to be
+        Markdown, and may still be called for a document that turns out to
+        be too large.
+    """
+    configuration = load_configuration()
+    async with (client or http_client()).stream(
+        "GET", location, headers=headers
+    ) as response:
+        # If it's not a good response, we've no interest in the body.
+        if not response.is_success:
+            return Download(response)
+
+        # Decide from the headers if it's a document we want. If the server
+        # doesn't say what it is we'll need to sniff it, if we're allowed.
+        if content_type := response.headers.get("content-type"):
+            if not is_markdown_type(content_type):
+                return Download(response)
+        elif configuration.markdown_sniff_size <= 0:
+            return Download(response)
+        # If the size isn't known, or can't be made sense of, it's down to
+        # keeping an eye on the body as it arrives.
+        expected = _expected_size(response)
+        if expected > configuration.maximum_markdown_size:
+            return Download(response, too_large=True)
+
+        # Now read the body, keeping an eye on the size.
+        body = bytearray()
+        sniffed = bool(content_type)
+        decoder = getincrementaldecoder(response.encoding or "utf-8")("replace")
+        reported = 0
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > configuration.maximum_markdown_size:
+                return Download(response, too_large=True)
+            if not sniffed and len(body) >= configuration.markdown_sniff_size:
+                if not looks_like_markdown(bytes(body)):
+                    return Download(response)
+                sniffed = True
+            if (
+                progress is not None
+                and sniffed
+                and max(expected, len(body)) >= progress_threshold
+            ):
+                progress(decoder.decode(body[reported:]))
+                reported = len(body)
+
+        # If the server didn't say what it was, and there wasn't enough of
+        # it to sniff during the download, sniff it now.
+        if not sniffed and not looks_like_markdown(bytes(body)):
+            return Download(response)
+
+        return Download(
+            response,
+            markdown=body.decode(response.encoding or "utf-8", errors="replace"),
+        )
+
+
+### download.py ends here
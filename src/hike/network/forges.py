@@ -0,0 +1,245 @@
+"""Provides code for asking forges about their repositories."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from typing import Any, Callable, Final, Sequence
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncClient, HTTPStatusError, RequestError
+
+##############################################################################
+# Local imports.
+from ..data import maybe_markdown
+from .client import http_client
+
+
+##############################################################################
+@dataclass(frozen=True)
+class RepositoryDetails:
+    """What a forge has told us about a repository."""
+
+    branch: str | None = None
+    """The default branch of the repository, if known."""
+
+    entries: tuple[str, ...] = ()
+    """The entries in the root of the repository, if known.
+
+    Directories are marked with a trailing `/`.
+    """
+
+    readme: str | None = None
+    """The path to the README that the forge itself picked, if it did."""
+
+    def has(self, path: str) -> bool:
+        """Is the given path known to exist in the repository?
+
+        Args:
+            path: The path to check.
+
+        Returns:
+            `True` if the path is known to exist, `False` if not.
+        """
+        return path == self.readme or path in self.entries
+
+
+##############################################################################
+def _from_contents(data: Any) -> RepositoryDetails:
+    """Get repository details from a GitHub-style contents listing.
+
+    Args:
+        data: The listing of the root of the repository.
+
+    Returns:
+        The details of the repository.
+
+    Note:
+        GitHub, Codeberg (and so Forgejo and Gitea) all use this form.
+        Any entry in the listing that isn't what's expected is ignored.
+    """
+    if not isinstance(data, list):
+        return RepositoryDetails()
+    entries = [
+        entry
+        for entry in data
+        if isinstance(entry, dict) and isinstance(entry.get("name"), str)
+    ]
+    return RepositoryDetails(
+        branch=next(
+            (
+                branch
+                for entry in entries
+                if isinstance(url := entry.get("url"), str)
+                and (branch := URL(url).params.get("ref"))
+            ),
+            None,
+        ),
+        entries=tuple(
+            f"{entry['name']}/" if entry.get("type") == "dir" else entry["name"]
+            for entry in entries
+        ),
+    )
+
+
+##############################################################################
+def _from_gitlab_project(data: Any) -> RepositoryDetails:
+    """Get repository details from a GitLab project.
+
+    Args:
+        data: The GitLab project data.
+
+    Returns:
+        The details of the repository.
+    """
+    if not isinstance(data, dict):
+        return RepositoryDetails()
+    if not isinstance(branch := data.get("default_branch"), str):
+        branch = None
+    readme: str | None = None
+    if branch and isinstance(readme_url := data.get("readme_url"), str):
+        _, _, readme = readme_url.partition(f"/-/blob/{branch}/")
+    return RepositoryDetails(branch=branch, readme=readme or None)
+
+
+##############################################################################
+def _from_bitbucket_repository(data: Any) -> RepositoryDetails:
+    """Get repository details from a Bitbucket repository.
+
+    Args:
+        data: The Bitbucket repository data.
+
+    Returns:
+        The details of the repository.
+    """
+    if not isinstance(data, dict) or not isinstance(
+        main_branch := data.get("mainbranch"), dict
+    ):
+        return RepositoryDetails()
+    return RepositoryDetails(
+        branch=branch if isinstance(branch := main_branch.get("name"), str) else None
+    )
+
+
+##############################################################################
+@dataclass(frozen=True)
+class ForgeAPI:
+    """Details of how to ask a forge about a repository."""
+
+    root: str
+    """The root of the forge's API."""
+
+    path: str
+    """The format of the path to ask about a repository."""
+
+    details: Callable[[Any], RepositoryDetails]
+    """Function that turns the forge's answer into repository details."""
+
+
+##############################################################################
+FORGE_APIS: Final[dict[str, ForgeAPI]] = {
+    "Bitbucket": ForgeAPI(
+        "https://api.bitbucket.org/2.0",
+        "/repositories/{owner}/{repository}",
+        _from_bitbucket_repository,
+    ),
+    "Codeberg": ForgeAPI(
+        "https://codeberg.org/api/v1",
+        "/repos/{owner}/{repository}/contents",
+        _from_contents,
+    ),
+    "GitHub": ForgeAPI(
+        "https://api.github.com",
+        "/repos/{owner}/{repository}/contents",
+        _from_contents,
+    ),
+    "GitLab": ForgeAPI(
+        "https://gitlab.com/api/v4",
+        "/projects/{owner}%2F{repository}",
+        _from_gitlab_project,
+    ),
+}
+"""The APIs of the forges we know how to talk to."""
+
+
+##############################################################################
+async def repository_details(
+    forge: str,
+    owner: str,
+    repository: str,
+    api_root: str | None = None,
+    client: AsyncClient | None = None,
+) -> RepositoryDetails | None:
+    """Ask a forge about a repository.
+
+    Args:
+        forge: The name of the forge.
+        owner: The owner of the repository.
+        repository: The name of the repository.
+        api_root: Optional root of the API, to use in place of the forge's.
+        client: The client to use, or `None` to use the shared client.
+
+    Returns:
+        The details of the repository, or `None` if they couldn't be had.
+
+    Note:
+        This makes a single request of the forge.
+    """
+    if (api := FORGE_APIS.get(forge)) is None:
+        return None
+    try:
+        response = await (client or http_client()).get(
+            f"{api_root or api.root}{api.path.format(owner=owner, repository=repository)}",
+            headers={"accept": "application/json"},
+        )
+        response.raise_for_status()
+        return api.details(response.json())
+    except (RequestError, HTTPStatusError, ValueError):
+        return None
+
+
+##############################################################################
+def readme_candidates(
+    details: RepositoryDetails, preferred: Sequence[str]
+) -> list[str]:
+    """Get the ranked candidates for a repository's README.
+
+    Args:
+        details: The details of the repository.
+        preferred: The names of README files, in order of preference.
+
+    Returns:
+        The candidate README paths, best first.
+    """
+    candidates: list[str] = []
+
+    def add(candidate: str) -> None:
+        if candidate not in candidates:
+            candidates.append(candidate)
+
+    if details.readme and maybe_markdown(details.readme):
+        add(details.readme)
+    if details.entries:
+        # We know what's in the root of the repository, so we can narrow
+        # things down to what's actually there.
+        entries = {entry.casefold(): entry for entry in details.entries}
+        for name in preferred:
+            if "/" in name:
+                if f"{name.partition('/')[0]}/".casefold() in entries:
+                    add(name)
+            elif name.casefold() in entries:
+                add(entries[name.casefold()])
+        for entry in details.entries:
+            if entry.casefold().startswith("readme") and maybe_markdown(entry):
+                add(entry)
+    else:
+        for name in preferred:
+            add(name)
+    return candidates
+
+
+### forges.py ends here
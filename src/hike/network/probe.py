@@ -0,0 +1,67 @@
+"""Provides code for finding the first of a set of URLs that exists."""
+
+##############################################################################
+# Python imports.
+from asyncio import Semaphore, create_task
+from typing import Sequence
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncClient
+
+##############################################################################
+# Local imports.
+from .client import http_client
+
+
+##############################################################################
+async def first_available(
+    candidates: Sequence[str],
+    concurrency: int,
+    client: AsyncClient | None = None,
+) -> URL | None:
+    """Find the first of a list of URLs that is available.
+
+    Args:
+        candidates: The candidate URLs, in order of preference.
+        concurrency: The maximum number of requests to have in flight.
+        client: The client to use, or `None` to use the shared client.
+
+    Returns:
+        The first URL, in order of preference, that is available; or `None`
+        if none of them are.
+
+    Raises:
+        RequestError: If there was a problem talking to the server.
+
+    Note:
+        All of the candidates are probed concurrently, but preference order
+        is respected: a candidate is only picked once all of those ahead of
+        it are known not to be available. As soon as the winner is known any
+        outstanding probes are cancelled.
+    """
+    client = client or http_client()
+    limit = Semaphore(max(concurrency, 1))
+
+    async def probe(candidate: str) -> bool:
+        async with limit:
+            return (await client.head(candidate)).is_success
+
+    probes = [create_task(probe(candidate)) for candidate in candidates]
+    try:
+        for candidate, result in zip(candidates, probes):
+            if await result:
+                return URL(candidate)
+    finally:
+        for result in probes:
+            if result.done():
+                # Retrieve any error a probe we didn't get to ended with, so
+                # that it doesn't get reported as never having been seen.
+                if not result.cancelled():
+                    result.exception()
+            else:
+                result.cancel()
+    return None
+
+
+### probe.py ends here
@@ -31,6 +31,7 @@ from ..commands import (
     SaveCopy,
     SearchBookmarks,
     ToggleNavigation,
+    ToggleOutline,
 )
 
 
@@ -65,6 +66,7 @@ class MainCommands(CommandsProvider):
         yield from self.maybe(SaveCopy)
         yield SearchBookmarks()
         yield ToggleNavigation()
+        yield ToggleOutline()
 
 
 ### main.py ends here
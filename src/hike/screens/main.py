@@ -51,6 +51,7 @@ from ..commands import (
     SaveCopy,
     SearchBookmarks,
     ToggleNavigation,
+    ToggleOutline,
 )
 from ..data import (
     load_bookmarks,
@@ -154,6 +155,7 @@ class Main(EnhancedScreen[None]):
         Reload,
         SaveCopy,
         SearchBookmarks,
+        ToggleOutline,
     )
 
     BINDINGS = Command.bindings(*COMMAND_MESSAGES)
@@ -192,6 +194,7 @@ class Main(EnhancedScreen[None]):
         self.query_one(Navigation).bookmarks = (bookmarks := load_bookmarks())
         BookmarkCommands.bookmarks = bookmarks
         self.query_one(Viewer).history = load_history()
+        self.query_one(Viewer).outline = config.outline_mode
         self.query_one(CommandLine).history = load_command_history()
         self.query_one(CommandLine).dock_top = config.command_line_on_top
         if self._arguments.command:
@@ -391,6 +394,14 @@ class Main(EnhancedScreen[None]):
         """Toggle the display of the navigation panel."""
         self.navigation_visible = not self.navigation_visible
 
+    @on(ToggleOutline)
+    def action_toggle_outline_command(self) -> None:
+        """Toggle showing documents as an outline."""
+        viewer = self.query_one(Viewer)
+        viewer.outline = not viewer.outline
+        with update_configuration() as config:
+            config.outline_mode = viewer.outline
+
     @on(ChangeNavigationSide)
     def action_change_navigation_side_command(self) -> None:
         """Change the side that the navigation panel lives on."""
@@ -2,12 +2,44 @@
 
 ##############################################################################
 # Local imports.
+from .anchors import AnchorIndex, github_slug
+from .blocks import Block, top_level_blocks
+from .coalesce import Coalescer
+from .highlight_cache import HighlightCache, highlight_theme
 from .history import History
+from .lru import LRUCache
+from .markdown import links_in, markdown_parser
 from .mouse import is_copy_request_click
+from .parse_cache import ParseCache
+from .parse_pool import ParsePool
+from .progressive import ProgressiveMarkdown, read_progressively
+from .source_store import SourceStore
 from .view_in_browser import view_in_browser
+from .watch import FileWatcher, watch_file
 
 ##############################################################################
 # Exports.
-__all__ = ["History", "is_copy_request_click", "view_in_browser"]
+__all__ = [
+    "AnchorIndex",
+    "Block",
+    "Coalescer",
+    "FileWatcher",
+    "HighlightCache",
+    "History",
+    "LRUCache",
+    "ParseCache",
+    "ParsePool",
+    "ProgressiveMarkdown",
+    "SourceStore",
+    "github_slug",
+    "highlight_theme",
+    "is_copy_request_click",
+    "links_in",
+    "markdown_parser",
+    "read_progressively",
+    "top_level_blocks",
+    "view_in_browser",
+    "watch_file",
+]
 
 ### __init__.py ends here
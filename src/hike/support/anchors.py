@@ -0,0 +1,115 @@
+"""Provides support for the anchors of the headings in a Markdown document."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import Iterable, Iterator
+from unicodedata import category
+from urllib.parse import unquote
+
+
+##############################################################################
+def _kept(character: str) -> bool:
+    """Is a character kept when making a slug?
+
+    Args:
+        character: The character to check.
+
+    Returns:
+        `True` if the character is kept, `False` if it's dropped.
+    """
+    return (
+        character in "- " or (kind := category(character))[0] in "LMN" or kind == "Pc"
+    )
+
+
+##############################################################################
+def github_slug(text: str) -> str:
+    """Make a slug for the text of a heading, as GitHub does.
+
+    Args:
+        text: The text of the heading.
+
+    Returns:
+        The slug for the heading.
+
+    Note:
+        The text is lower-cased; letters, marks, numbers, connecting
+        punctuation (such as `_`), hyphens and spaces are kept, and
+        everything else is dropped; then each space becomes a hyphen.
+        Unlike some other slugging, runs of spaces aren't collapsed and
+        non-ASCII letters are kept as they are.
+    """
+    return "".join(
+        "-" if character == " " else character
+        for character in text.lower()
+        if _kept(character)
+    )
+
+
+##############################################################################
+class AnchorIndex:
+    """An index of the anchors of the headings in a document.
+
+    Anchors are made from the text of the headings with `github_slug`; where
+    more than one heading has the same slug, the later ones have `-1`, `-2`
+    and so on added to make them unique, as GitHub does.
+    """
+
+    def __init__(self, headings: Iterable[tuple[int, str]]) -> None:
+        """Initialise the index.
+
+        Args:
+            headings: The headings of the document, each as the index of the
+                heading's block and the plain text of the heading.
+        """
+        self._anchors: dict[str, int] = {}
+        """The index of the block for each anchor."""
+        occurrences: dict[str, int] = {}
+        for index, heading in headings:
+            anchor = slug = github_slug(heading)
+            # A numbered anchor could clash with the anchor of a heading
+            # that happens to end in a number, so keep counting until
+            # there's no clash.
+            while anchor in self._anchors:
+                occurrences[slug] = occurrences.get(slug, 0) + 1
+                anchor = f"{slug}-{occurrences[slug]}"
+            self._anchors[anchor] = index
+
+    def __len__(self) -> int:
+        """The number of anchors in the index."""
+        return len(self._anchors)
+
+    def __iter__(self) -> Iterator[str]:
+        """The anchors in the index, in the order of their headings."""
+        return iter(self._anchors)
+
+    def __contains__(self, anchor: object) -> bool:
+        """Is the given anchor in the index?"""
+        return isinstance(anchor, str) and self.get(anchor) is not None
+
+    def get(self, anchor: str) -> int | None:
+        """Get the index of the block for an anchor.
+
+        Args:
+            anchor: The anchor, as it appears in a link, without the `#`.
+
+        Returns:
+            The index of the block of the heading the anchor is for, or
+            `None` if there's no such anchor.
+
+        Note:
+            As well as the anchor as given, the anchor is looked for with
+            any percent-encoding decoded, and then in lower case.
+        """
+        if (index := self._anchors.get(anchor)) is not None:
+            return index
+        if (index := self._anchors.get(anchor := unquote(anchor))) is not None:
+            return index
+        return self._anchors.get(anchor.lower())
+
+
+### anchors.py ends here
@@ -0,0 +1,138 @@
+"""Support code for working with the top-level blocks of a Markdown document."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Hashable, Iterable, Sequence
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it.token import Token
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Block:
+    """A top-level block of a Markdown document."""
+
+    tokens: Sequence[Token]
+    """The tokens that make up the block."""
+
+    lines: tuple[int, int]
+    """The range of lines in the source that the block came from."""
+
+    @cached_property
+    def fingerprint(self) -> Hashable:
+        """A fingerprint of the content of the block.
+
+        Two blocks with the same fingerprint will render the same, even if
+        they came from different places in their documents.
+        """
+        return tuple(_token_fingerprint(token) for token in self.tokens)
+
+    @property
+    def kind(self) -> str:
+        """The kind of block this is.
+
+        This is the type of the block's first token, without any `_open`
+        suffix; so a heading is `heading`, a paragraph `paragraph`, etc.
+        """
+        return self.tokens[0].type.removesuffix("_open") if self.tokens else ""
+
+    @property
+    def heading_level(self) -> int | None:
+        """The level of the heading, if the block is a heading."""
+        if self.kind == "heading":
+            return int(self.tokens[0].tag[1:])
+        return None
+
+    @property
+    def heading(self) -> str | None:
+        """The plain text of the heading, if the block is a heading."""
+        if self.kind == "heading":
+            return "".join(
+                plain_text(token) for token in self.tokens if token.type == "inline"
+            )
+        return None
+
+
+##############################################################################
+def _token_fingerprint(token: Token) -> tuple[Any, ...]:
+    """Get a fingerprint of a token.
+
+    Args:
+        token: The token to get the fingerprint of.
+
+    Returns:
+        A fingerprint of the content of the token.
+
+    Note:
+        Where the token came from in the source is ignored.
+    """
+    return (
+        token.type,
+        token.tag,
+        token.nesting,
+        tuple(token.attrs.items()),
+        token.content,
+        token.markup,
+        token.info,
+        token.hidden,
+        tuple(_token_fingerprint(child) for child in token.children or ()),
+    )
+
+
+##############################################################################
+def plain_text(token: Token) -> str:
+    """Get the plain text of an inline token.
+
+    Args:
+        token: The token to get the text of.
+
+    Returns:
+        The text of the token, without any markup.
+    """
+    if token.type in ("text", "code_inline", "html_inline"):
+        return token.content
+    if token.type in ("softbreak", "hardbreak"):
+        return " "
+    return "".join(plain_text(child) for child in token.children or [])
+
+
+##############################################################################
+def top_level_blocks(tokens: Iterable[Token]) -> list[Block]:
+    """Split the tokens of a document into its top-level blocks.
+
+    Args:
+        tokens: The tokens of the parsed document.
+
+    Returns:
+        The top-level blocks of the document, in order.
+    """
+    blocks: list[Block] = []
+    current: list[Token] = []
+    depth = 0
+    for token in tokens:
+        current.append(token)
+        depth += token.nesting
+        if depth <= 0:
+            first, last = current[0], current[-1]
+            start = first.map[0] if first.map else 0
+            end = first.map[1] if first.map else (last.map[1] if last.map else start)
+            blocks.append(Block(tuple(current), (start, end)))
+            current = []
+            depth = 0
+    if current:
+        first = current[0]
+        blocks.append(
+            Block(tuple(current), (first.map[0], first.map[1]) if first.map else (0, 0))
+        )
+    return blocks
+
+
+### blocks.py ends here
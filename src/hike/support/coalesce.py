@@ -0,0 +1,93 @@
+"""Provides a class for coalescing concurrent requests for the same thing."""
+
+##############################################################################
+# Python imports.
+from asyncio import Task, create_task, shield
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+##############################################################################
+RequestKey = TypeVar("RequestKey", bound=Hashable)
+"""The type of the key that identifies a request."""
+
+RequestResult = TypeVar("RequestResult")
+"""The type of the result of a request."""
+
+
+##############################################################################
+@dataclass
+class _InFlight(Generic[RequestResult]):
+    """Details of a request that is in flight."""
+
+    task: Task[RequestResult]
+    """The task that is performing the request."""
+
+    waiters: int = 0
+    """The number of callers waiting on the request."""
+
+
+##############################################################################
+class Coalescer(Generic[RequestKey, RequestResult]):
+    """Coalesces concurrent requests for the same thing into one request."""
+
+    def __init__(self) -> None:
+        """Initialise the coalescer."""
+        self._in_flight: dict[RequestKey, _InFlight[RequestResult]] = {}
+        """The requests currently in flight."""
+        self.hits = 0
+        """The number of requests that joined one already in flight."""
+        self.misses = 0
+        """The number of requests that had to start a new request."""
+
+    def __contains__(self, key: object) -> bool:
+        """Is a request for the given key in flight?"""
+        return key in self._in_flight
+
+    async def request(
+        self, key: RequestKey, start: Callable[[], Awaitable[RequestResult]]
+    ) -> RequestResult:
+        """Make a request, or join the same request if it's in flight.
+
+        Args:
+            key: The key that identifies the request.
+            start: Function that starts the request if it's not in flight.
+
+        Returns:
+            The result of the request.
+
+        Note:
+            If a caller is cancelled while waiting, the request carries on
+            for the benefit of any other callers; once the last caller
+            waiting on the request is cancelled the request is cancelled
+            too.
+        """
+        if (in_flight := self._in_flight.get(key)) is None:
+            self.misses += 1
+
+            async def perform() -> RequestResult:
+                return await start()
+
+            in_flight = self._in_flight[key] = _InFlight(create_task(perform()))
+            in_flight.task.add_done_callback(lambda _: self._landed(key, in_flight))
+        else:
+            self.hits += 1
+        in_flight.waiters += 1
+        try:
+            return await shield(in_flight.task)
+        finally:
+            in_flight.waiters -= 1
+            if not in_flight.waiters and not in_flight.task.done():
+                in_flight.task.cancel()
+
+    def _landed(self, key: RequestKey, in_flight: _InFlight[RequestResult]) -> None:
+        """Tidy up after a request has finished.
+
+        Args:
+            key: The key that identifies the request.
+            in_flight: The details of the request that finished.
+        """
+        if self._in_flight.get(key) is in_flight:
+            del self._in_flight[key]
+
+
+### coalesce.py ends here
@@ -0,0 +1,146 @@
+"""Provides a cache of highlighted code."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from hashlib import sha256
+from threading import Lock
+from typing import Final
+
+##############################################################################
+# Textual imports.
+from textual.content import Content
+from textual.highlight import (
+    ANSIDarkHighlightTheme,
+    ANSILightHighlightTheme,
+    HighlightTheme,
+    highlight,
+)
+
+##############################################################################
+# Local imports.
+from .lru import LRUCache
+
+##############################################################################
+_THEMES: Final[dict[str, type[HighlightTheme]]] = {
+    "textual": HighlightTheme,
+    "ansi-dark": ANSIDarkHighlightTheme,
+    "ansi-light": ANSILightHighlightTheme,
+}
+"""The highlight themes, by name."""
+
+
+##############################################################################
+def highlight_theme(ansi: bool, dark: bool) -> str:
+    """Get the name of the highlight theme to use.
+
+    Args:
+        ansi: Is the application using ANSI colours?
+        dark: Is the application's theme a dark one?
+
+    Returns:
+        The name of the highlight theme.
+
+    Note:
+        Outside of ANSI mode, highlighted code is styled with the variables
+        of the application's theme, so the same highlighting serves for
+        both light and dark themes.
+    """
+    return f"ansi-{'dark' if dark else 'light'}" if ansi else "textual"
+
+
+##############################################################################
+class HighlightCache:
+    """A cache of highlighted code.
+
+    Code is keyed on its language, a hash of the code itself, and the theme
+    it was highlighted with, so the same code only gets highlighted once
+    for each theme for as long as it's in the cache. A change of theme
+    doesn't affect what's cached for other themes.
+
+    Note:
+        The cache is safe to use from more than one thread.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_entries: The maximum number of pieces of code to hold.
+        """
+        self._highlighted: LRUCache[tuple[str, str, str], Content] = LRUCache(
+            max_entries
+        )
+        """The highlighted code."""
+        self._lock = Lock()
+        """Lock for access to the cache."""
+
+    @property
+    def hits(self) -> int:
+        """The number of times code was found already highlighted."""
+        return self._highlighted.hits
+
+    @property
+    def misses(self) -> int:
+        """The number of times code wasn't found already highlighted."""
+        return self._highlighted.misses
+
+    def __len__(self) -> int:
+        """The number of pieces of code held in the cache."""
+        return len(self._highlighted)
+
+    @staticmethod
+    def _key(code: str, language: str, theme: str) -> tuple[str, str, str]:
+        """Get the key for some code.
+
+        Args:
+            code: The code.
+            language: The language of the code.
+            theme: The name of the highlight theme.
+
+        Returns:
+            The key for the code.
+        """
+        return language, sha256(code.encode("utf-8")).hexdigest(), theme
+
+    def get(self, code: str, language: str, theme: str) -> Content | None:
+        """Get some code from the cache, if it's already been highlighted.
+
+        Args:
+            code: The code.
+            language: The language of the code.
+            theme: The name of the highlight theme.
+
+        Returns:
+            The highlighted code, or `None` if it isn't in the cache.
+        """
+        with self._lock:
+            return self._highlighted.get(self._key(code, language, theme))
+
+    def highlight(self, code: str, language: str, theme: str) -> Content:
+        """Highlight some code, using the cache if possible.
+
+        Args:
+            code: The code.
+            language: The language of the code.
+            theme: The name of the highlight theme.
+
+        Returns:
+            The highlighted code.
+        """
+        key = self._key(code, language, theme)
+        with self._lock:
+            if (highlighted := self._highlighted.get(key)) is not None:
+                return highlighted
+        # Highlighting is done outside of the lock; at worst the same code
+        # ends up being highlighted twice at the same time.
+        highlighted = highlight(code, language=language or None, theme=_THEMES[theme])
+        with self._lock:
+            self._highlighted[key] = highlighted
+        return highlighted
+
+
+### highlight_cache.py ends here
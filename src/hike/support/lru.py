@@ -0,0 +1,147 @@
+"""Provides a simple least-recently-used cache."""
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, TypeVar
+
+##############################################################################
+CacheKey = TypeVar("CacheKey", bound=Hashable)
+"""The type of a key in the cache."""
+
+CacheValue = TypeVar("CacheValue")
+"""The type of a value in the cache."""
+
+
+##############################################################################
+class LRUCache(Generic[CacheKey, CacheValue]):
+    """A cache that discards the least-recently-used values when full."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_size: int | None = None,
+        size_of: Callable[[CacheValue], int] | None = None,
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_entries: The maximum number of entries to hold.
+            max_size: The optional maximum total size of the entries.
+            size_of: Optional function for working out the size of a value.
+
+        Note:
+            If `max_size` is given then `size_of` should be too; without it
+            every value is considered to have no size.
+        """
+        self._max_entries = max_entries
+        """The maximum number of entries to hold."""
+        self._max_size = max_size
+        """The maximum total size of the entries, if there is one."""
+        self._size_of = size_of or (lambda _: 0)
+        """Function for working out the size of a value."""
+        self._entries: OrderedDict[CacheKey, tuple[CacheValue, int]] = OrderedDict()
+        """The entries in the cache, with their sizes."""
+        self._size = 0
+        """The current total size of the entries."""
+        self.hits = 0
+        """The number of times a lookup found a value."""
+        self.misses = 0
+        """The number of times a lookup didn't find a value."""
+
+    @property
+    def size(self) -> int:
+        """The total size of the values in the cache."""
+        return self._size
+
+    def __len__(self) -> int:
+        """The number of entries in the cache."""
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        """Is the given key in the cache?
+
+        Note:
+            Testing for a key does not count as using it.
+        """
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[CacheKey]:
+        """The keys in the cache, least-recently-used first."""
+        return iter(list(self._entries))
+
+    def get(self, key: CacheKey) -> CacheValue | None:
+        """Get a value from the cache.
+
+        Args:
+            key: The key of the value to get.
+
+        Returns:
+            The value, or `None` if it isn't in the cache.
+        """
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: CacheKey, value: CacheValue) -> None:
+        """Put a value in the cache.
+
+        Args:
+            key: The key for the value.
+            value: The value.
+        """
+        self.pop(key)
+        self._entries[key] = (value, size := self._size_of(value))
+        self._size += size
+        while self._entries and (
+            len(self._entries) > self._max_entries
+            or (self._max_size is not None and self._size > self._max_size)
+        ):
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: CacheKey) -> None:
+        """Discard an entry from the cache.
+
+        Args:
+            key: The key of the entry to discard.
+        """
+        value, size = self._entries.pop(key)
+        self._size -= size
+        self.discarded(key, value)
+
+    def discarded(self, key: CacheKey, value: CacheValue) -> None:
+        """Called when an entry is discarded to make room.
+
+        Args:
+            key: The key of the entry that was discarded.
+            value: The value that was discarded.
+        """
+
+    def pop(self, key: CacheKey) -> CacheValue | None:
+        """Remove a value from the cache.
+
+        Args:
+            key: The key of the value to remove.
+
+        Returns:
+            The value that was removed, or `None` if it wasn't in the cache.
+        """
+        try:
+            value, size = self._entries.pop(key)
+        except KeyError:
+            return None
+        self._size -= size
+        return value
+
+    def clear(self) -> None:
+        """Remove everything from the cache."""
+        self._entries.clear()
+        self._size = 0
+
+
+### lru.py ends here
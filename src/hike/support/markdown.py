@@ -0,0 +1,51 @@
+"""Support code for working with Markdown."""
+
+##############################################################################
+# Python imports.
+from functools import partial
+from typing import Iterable, Iterator
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+from mdit_py_plugins import front_matter
+
+##############################################################################
+# Local imports.
+from .parse_cache import CachingParser, ParseCache
+
+
+##############################################################################
+def markdown_parser(cache: ParseCache | None = None) -> MarkdownIt:
+    """Make a parser for the Markdown that Hike views.
+
+    Args:
+        cache: Optional cache of parsed documents for the parser to use.
+
+    Returns:
+        A configured Markdown parser.
+    """
+    return (MarkdownIt if cache is None else partial(CachingParser, cache))(
+        "gfm-like"
+    ).use(front_matter.front_matter_plugin)
+
+
+##############################################################################
+def links_in(tokens: Iterable[Token]) -> Iterator[str]:
+    """Get the targets of all of the links in a document.
+
+    Args:
+        tokens: The tokens of the parsed document.
+
+    Yields:
+        The target of each link, in the order they appear.
+    """
+    for token in tokens:
+        if token.type == "link_open" and isinstance(href := token.attrGet("href"), str):
+            yield href
+        if token.children:
+            yield from links_in(token.children)
+
+
+### markdown.py ends here
@@ -0,0 +1,367 @@
+"""Provides a cache of parsed Markdown documents."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from hashlib import sha256
+from json import dumps, loads
+from os import utime
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, MutableMapping
+from zlib import compress, decompress
+from zlib import error as ZLibError
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+from markdown_it import __version__ as markdown_it_version
+from markdown_it.token import Token
+
+##############################################################################
+# Local imports.
+from .lru import LRUCache
+
+
+##############################################################################
+@dataclass(frozen=True)
+class _Parsed:
+    """A parsed document held in the cache."""
+
+    tokens: list[Token]
+    """The tokens that resulted from parsing the document."""
+
+    seconds: float
+    """The time it took to parse the document."""
+
+    size: int
+    """The size of the source of the document."""
+
+
+##############################################################################
+def parser_signature(parser: MarkdownIt) -> str:
+    """Get a signature for the configuration of a parser.
+
+    Args:
+        parser: The parser to get the signature for.
+
+    Returns:
+        A signature that will change if the parser's output could.
+    """
+    return dumps(
+        {
+            "markdown-it": markdown_it_version,
+            "options": dict(parser.options),
+            "rules": parser.get_active_rules(),
+        },
+        default=repr,
+        sort_keys=True,
+    )
+
+
+##############################################################################
+class ParseCache:
+    """A cache of the tokens that result from parsing Markdown documents.
+
+    Documents are keyed on a hash of their source and of the configuration
+    of the parser, so the same document parsed the same way will only be
+    parsed once for as long as it's in the cache. Recently-parsed documents
+    are held in memory; optionally, the parsed form of large documents can
+    also be kept on disk, so they don't need parsing again in a later
+    session.
+
+    Note:
+        The cache is safe to use from more than one thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_size: int,
+        directory: Path | None = None,
+        disk_threshold: int = 0,
+        max_disk_size: int = 0,
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_entries: The maximum number of documents to hold in memory.
+            max_size: The maximum total size of the sources of the documents
+                held in memory.
+            directory: The directory to keep parsed documents in, or `None`
+                to only cache in memory.
+            disk_threshold: The size a document's source needs to be before
+                it is kept on disk.
+            max_disk_size: The maximum size, in bytes, of the disk cache.
+        """
+        self._memory: LRUCache[str, _Parsed] = LRUCache(
+            max_entries, max_size, lambda parsed: parsed.size
+        )
+        """The documents held in memory."""
+        self._directory = directory
+        """The directory for the on-disk tier of the cache, if there is one."""
+        self._disk_threshold = disk_threshold
+        """The size a document needs to be before it is kept on disk."""
+        self._max_disk_size = max_disk_size
+        """The maximum size, in bytes, of the on-disk tier."""
+        self._lock = Lock()
+        """Lock for access to the cache."""
+        self.hits = 0
+        """The number of documents found in memory."""
+        self.disk_hits = 0
+        """The number of documents found on disk."""
+        self.misses = 0
+        """The number of documents that needed to be parsed."""
+        self.time_saved = 0.0
+        """The number of seconds of parsing that the cache has saved."""
+
+    @property
+    def hit_rate(self) -> float:
+        """The proportion of documents that didn't need to be parsed."""
+        found = self.hits + self.disk_hits
+        return found / total if (total := found + self.misses) else 0.0
+
+    def __len__(self) -> int:
+        """The number of documents held in memory."""
+        return len(self._memory)
+
+    @staticmethod
+    def _key(signature: str, source: str) -> str:
+        """Get the key for a document.
+
+        Args:
+            signature: The signature of the parser's configuration.
+            source: The source of the document.
+
+        Returns:
+            The key for the document.
+        """
+        return sha256(f"{signature}\0{source}".encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> Path | None:
+        """Get the on-disk location of a document.
+
+        Args:
+            key: The key of the document.
+
+        Returns:
+            The file for the document, or `None` if there's no on-disk tier.
+        """
+        return None if self._directory is None else self._directory / f"{key}.tokens"
+
+    def _load(self, key: str, size: int) -> _Parsed | None:
+        """Load a parsed document from disk.
+
+        Args:
+            key: The key of the document.
+            size: The size of the document's source.
+
+        Returns:
+            The parsed document, or `None` if it wasn't on disk.
+        """
+        if (tokens_file := self._file(key)) is None or size < self._disk_threshold:
+            return None
+        try:
+            data = loads(decompress(tokens_file.read_bytes()))
+            parsed = _Parsed(
+                [Token.from_dict(token) for token in data["tokens"]],
+                data["seconds"],
+                size,
+            )
+            # Make a note that it's been used, for the sake of eviction.
+            utime(tokens_file)
+        except (OSError, ValueError, KeyError, TypeError, ZLibError):
+            return None
+        return parsed
+
+    def _save(self, key: str, parsed: _Parsed) -> None:
+        """Save a parsed document to disk.
+
+        Args:
+            key: The key of the document.
+            parsed: The parsed document.
+        """
+        if (
+            self._directory is None
+            or (tokens_file := self._file(key)) is None
+            or parsed.size < self._disk_threshold
+        ):
+            return
+        try:
+            data = compress(
+                dumps(
+                    {
+                        "seconds": parsed.seconds,
+                        "tokens": [token.as_dict() for token in parsed.tokens],
+                    }
+                ).encode("utf-8")
+            )
+        except (TypeError, ValueError):
+            # Something in the tokens that we can't save; that's fine, it
+            # just won't be cached on disk.
+            return
+        if len(data) > self._max_disk_size:
+            return
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            tokens_file.write_bytes(data)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Evict the least-recently-used documents from the disk."""
+        if self._directory is None:
+            return
+        try:
+            files = sorted(
+                (
+                    (details.st_mtime, details.st_size, tokens_file)
+                    for tokens_file in self._directory.glob("*.tokens")
+                    if (details := tokens_file.stat())
+                ),
+                key=lambda file: file[0],
+            )
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, tokens_file in files:
+            if total <= self._max_disk_size:
+                break
+            tokens_file.unlink(missing_ok=True)
+            total -= size
+
+    def lookup(self, signature: str, source: str) -> list[Token] | None:
+        """Look for the parsed form of a document in the cache.
+
+        Args:
+            signature: The signature of the parser's configuration.
+            source: The source of the document.
+
+        Returns:
+            The tokens of the document, or `None` if it isn't in the cache.
+
+        Note:
+            The tokens may be shared with other users of the cache, and so
+            should not be modified.
+        """
+        key = self._key(signature, source)
+        with self._lock:
+            if (parsed := self._memory.get(key)) is not None:
+                self.hits += 1
+                self.time_saved += parsed.seconds
+                return parsed.tokens
+        if (parsed := self._load(key, len(source))) is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self.time_saved += parsed.seconds
+                self._memory[key] = parsed
+            return parsed.tokens
+        return None
+
+    def store(
+        self, signature: str, source: str, tokens: list[Token], seconds: float
+    ) -> None:
+        """Store the parsed form of a document in the cache.
+
+        Args:
+            signature: The signature of the parser's configuration.
+            source: The source of the document.
+            tokens: The tokens that resulted from parsing the document.
+            seconds: The time it took to parse the document.
+        """
+        key = self._key(signature, source)
+        parsed = _Parsed(tokens, seconds, len(source))
+        with self._lock:
+            self.misses += 1
+            self._memory[key] = parsed
+        self._save(key, parsed)
+
+    def parse(
+        self,
+        parser: MarkdownIt,
+        source: str,
+        env: MutableMapping[str, Any] | None = None,
+        signature: str | None = None,
+    ) -> list[Token]:
+        """Parse a document, using the cache where possible.
+
+        Args:
+            parser: The parser to parse the document with.
+            source: The source of the document.
+            env: Optional environment for the parse.
+            signature: The signature of the parser, if it's already known.
+
+        Returns:
+            The tokens that result from parsing the document.
+
+        Note:
+            The tokens may be shared with other users of the cache, and so
+            should not be modified.
+        """
+        # An environment can be used to pass things in to, or get things
+        # out of, the parse; so if there is one the parse has to happen.
+        if env is not None:
+            return MarkdownIt.parse(parser, source, env)
+        signature = signature or parser_signature(parser)
+        if (tokens := self.lookup(signature, source)) is not None:
+            return tokens
+        started = perf_counter()
+        tokens = MarkdownIt.parse(parser, source)
+        self.store(signature, source, tokens, perf_counter() - started)
+        return tokens
+
+
+##############################################################################
+class CachingParser(MarkdownIt):
+    """A Markdown parser that makes use of a parse cache."""
+
+    def __init__(self, cache: ParseCache, *args: Any, **kwargs: Any) -> None:
+        """Initialise the parser.
+
+        Args:
+            cache: The cache to use.
+            args: The positional arguments for the parser.
+            kwargs: The keyword arguments for the parser.
+        """
+        super().__init__(*args, **kwargs)
+        self._cache = cache
+        """The cache that the parser makes use of."""
+        self._signature: str | None = None
+        """The signature of the parser's configuration, once known."""
+
+    @property
+    def cache(self) -> ParseCache:
+        """The cache that the parser makes use of."""
+        return self._cache
+
+    @property
+    def signature(self) -> str:
+        """The signature of the parser's configuration."""
+        # Plugins are added after the parser is created, so the signature
+        # can only be worked out once the parser is being used.
+        if self._signature is None:
+            self._signature = parser_signature(self)
+        return self._signature
+
+    def parse(
+        self, src: str, env: MutableMapping[str, Any] | None = None
+    ) -> list[Token]:
+        """Parse a document, using the cache where possible.
+
+        Args:
+            src: The source of the document.
+            env: Optional environment for the parse.
+
+        Returns:
+            The tokens that result from parsing the document.
+        """
+        return self._cache.parse(self, src, env, self.signature)
+
+
+### parse_cache.py ends here
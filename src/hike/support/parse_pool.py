@@ -0,0 +1,168 @@
+"""Provides a pool for parsing Markdown documents away from the event loop."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from asyncio import get_running_loop, to_thread
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from typing import Callable
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+##############################################################################
+# Local imports.
+from .markdown import markdown_parser
+from .parse_cache import CachingParser, parser_signature
+
+
+##############################################################################
+def _parse(factory: Callable[[], MarkdownIt], source: str) -> list[Token]:
+    """Parse a document in a worker process.
+
+    Args:
+        factory: The factory for the parser to use.
+        source: The source of the document.
+
+    Returns:
+        The tokens that result from parsing the document.
+    """
+    return factory().parse(source)
+
+
+##############################################################################
+class ParsePool:
+    """Parses Markdown documents away from the event loop.
+
+    Small documents are parsed on a thread, which is cheap to get going.
+    Documents at or above a given size are parsed in a worker process, so
+    that the parse doesn't compete for the GIL with the rest of the
+    application.
+
+    A document can only be parsed in a worker process if the parser it's
+    to be parsed with is configured the same as the parser the pool's
+    factory makes; if it isn't, it's parsed on a thread.
+    """
+
+    def __init__(
+        self,
+        process_threshold: int,
+        max_processes: int,
+        factory: Callable[[], MarkdownIt] = markdown_parser,
+    ) -> None:
+        """Initialise the pool.
+
+        Args:
+            process_threshold: The size of document at which it is parsed in
+                a worker process; `0` to always parse on a thread.
+            max_processes: The maximum number of worker processes.
+            factory: The factory for the parser used in the worker processes.
+
+        Note:
+            The factory needs to be something that can be pickled, such as
+            a function defined at the top level of a module.
+        """
+        self._process_threshold = process_threshold
+        """The size of document at which it is parsed in a worker process."""
+        self._max_processes = max_processes
+        """The maximum number of worker processes."""
+        self._factory = factory
+        """The factory for the parser used in the worker processes."""
+        self._signature: str | None = None
+        """The signature of the parser used in the worker processes."""
+        self._executor: ProcessPoolExecutor | None = None
+        """The executor for the worker processes, once it's needed."""
+
+    @property
+    def signature(self) -> str:
+        """The signature of the parser used in the worker processes."""
+        if self._signature is None:
+            self._signature = parser_signature(self._factory())
+        return self._signature
+
+    def in_process(self, parser: MarkdownIt, size: int) -> bool:
+        """Should a document be parsed in a worker process?
+
+        Args:
+            parser: The parser the document is to be parsed with.
+            size: The size of the source of the document.
+
+        Returns:
+            `True` if it should be parsed in a worker process, `False` if
+            it should be parsed on a thread.
+        """
+        return (
+            self._process_threshold > 0
+            and self._max_processes > 0
+            and size >= self._process_threshold
+            and (
+                parser.signature
+                if isinstance(parser, CachingParser)
+                else parser_signature(parser)
+            )
+            == self.signature
+        )
+
+    def _processes(self) -> ProcessPoolExecutor:
+        """Get the executor for the worker processes.
+
+        Returns:
+            The executor.
+        """
+        if self._executor is None:
+            # Worker processes are spawned rather than forked; forking a
+            # process that is running threads isn't safe.
+            self._executor = ProcessPoolExecutor(
+                self._max_processes, mp_context=get_context("spawn")
+            )
+        return self._executor
+
+    async def parse(self, parser: MarkdownIt, source: str) -> list[Token]:
+        """Parse a document.
+
+        Args:
+            parser: The parser to parse the document with.
+            source: The source of the document.
+
+        Returns:
+            The tokens that result from parsing the document.
+
+        Note:
+            If the parse is cancelled before a worker process has picked it
+            up, it will never be started.
+        """
+        if not self.in_process(parser, len(source)):
+            return await to_thread(parser.parse, source)
+        # If the parser has a cache, make sure it gets used.
+        cache = parser.cache if isinstance(parser, CachingParser) else None
+        if (
+            cache is not None
+            and (cached := await to_thread(cache.lookup, self.signature, source))
+            is not None
+        ):
+            return cached
+        started = perf_counter()
+        tokens = await get_running_loop().run_in_executor(
+            self._processes(), _parse, self._factory, source
+        )
+        if cache is not None:
+            await to_thread(
+                cache.store, self.signature, source, tokens, perf_counter() - started
+            )
+        return tokens
+
+    def shutdown(self) -> None:
+        """Shut down the pool, abandoning any outstanding parses."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+### parse_pool.py ends here
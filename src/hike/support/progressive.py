@@ -0,0 +1,144 @@
+"""Provides support for showing Markdown documents as they arrive."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from codecs import getincrementaldecoder
+from io import IncrementalNewlineDecoder
+from mmap import ACCESS_READ, mmap
+from os import fstat
+from pathlib import Path
+from re import compile as compile_regexp
+from typing import Final, Generator
+
+##############################################################################
+_FENCE: Final = compile_regexp(r" {0,3}(`{3,}|~{3,})([^\n]*)")
+"""Regular expression for the line that opens or closes a fenced block."""
+
+
+##############################################################################
+class ProgressiveMarkdown:
+    """Gathers up a Markdown document as it arrives, a piece at a time.
+
+    As the document arrives, track is kept of the last point in it where
+    it's safe to cut it short for display: the end of a blank line that
+    isn't inside a fenced block. Up to that point, what has arrived can be
+    shown as a document in its own right.
+
+    So as not to have what has arrived parsed and built over and over, it
+    is only offered for display once there is a decent amount of it, and
+    then each time the amount of it has doubled.
+    """
+
+    def __init__(self, first: int) -> None:
+        """Initialise the document.
+
+        Args:
+            first: The amount of the document that needs to have arrived
+                before it's first offered for display.
+        """
+        self._first = first
+        """The amount of the document needed before it's offered for display."""
+        self._pieces: list[str] = []
+        """The pieces of the document that have arrived."""
+        self._pending = ""
+        """The text at the end of the document that hasn't been scanned yet."""
+        self._size = 0
+        """The size of the document that has been scanned."""
+        self._safe = 0
+        """The amount of the document that it's safe to show."""
+        self._offered = 0
+        """The amount of the document that was last offered for display."""
+        self._fence: str | None = None
+        """The marker of the fenced block the scan is inside, if any."""
+
+    @property
+    def text(self) -> str:
+        """All of the document that has arrived."""
+        return "".join(self._pieces) + self._pending
+
+    def _scan(self, line: str) -> None:
+        """Scan a complete line of the document.
+
+        Args:
+            line: The line to scan, including its newline.
+        """
+        self._size += len(line)
+        if (fence := _FENCE.match(line)) is not None:
+            marker, info = fence.groups()
+            if self._fence is None:
+                # A backtick fence can't have a backtick in its info string.
+                if marker[0] == "~" or "`" not in info:
+                    self._fence = marker
+            elif (
+                marker[0] == self._fence[0]
+                and len(marker) >= len(self._fence)
+                and not info.strip()
+            ):
+                self._fence = None
+        elif self._fence is None and not line.strip():
+            self._safe = self._size
+
+    def feed(self, text: str) -> str | None:
+        """Add the next piece of the document.
+
+        Args:
+            text: The next piece of the document.
+
+        Returns:
+            The part of the document that should now be shown, or `None` if
+            it isn't time to show any more of it yet.
+        """
+        # Only complete lines can be scanned; anything after the last
+        # newline is held back until the rest of its line arrives.
+        *lines, self._pending = (self._pending + text).split("\n")
+        for line in lines:
+            self._scan(f"{line}\n")
+            self._pieces.append(f"{line}\n")
+        if self._safe > self._offered and (
+            self._size + len(self._pending) >= max(self._first, self._offered * 2)
+        ):
+            self._offered = self._safe
+            return "".join(self._pieces)[: self._safe]
+        return None
+
+
+##############################################################################
+def read_progressively(location: Path, chunk_size: int) -> Generator[str, None, None]:
+    """Read a local Markdown file a chunk at a time.
+
+    Args:
+        location: The location of the file to read.
+        chunk_size: The size of the chunks to read the file in.
+
+    Yields:
+        The text of the file, a chunk at a time.
+
+    Raises:
+        OSError: If there was a problem reading the file.
+        UnicodeDecodeError: If the file isn't valid UTF-8.
+
+    Note:
+        The file is memory-mapped rather than read, so only the chunks
+        that have been got to are ever paged in. Line endings are
+        translated in the same way as they are when a file is read as text.
+    """
+    chunk_size = max(chunk_size, 1)
+    decoder = IncrementalNewlineDecoder(getincrementaldecoder("utf-8")(), True)
+    with location.open("rb") as source:
+        # A file that is empty can't be mapped; but then there's nothing to
+        # read either.
+        if not (size := fstat(source.fileno()).st_size):
+            return
+        with mmap(source.fileno(), 0, access=ACCESS_READ) as mapped:
+            for start in range(0, size, chunk_size):
+                if text := decoder.decode(
+                    mapped[start : start + chunk_size], start + chunk_size >= size
+                ):
+                    yield text
+
+
+### progressive.py ends here
@@ -0,0 +1,335 @@
+"""Provides a store for the sources of documents."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from lzma import compress as lzma_compress
+from lzma import decompress as lzma_decompress
+from sys import maxsize
+from threading import Lock
+from typing import Callable, Final, Generic, Hashable, TypeAlias, TypeVar
+from zlib import compress as zlib_compress
+from zlib import decompress as zlib_decompress
+
+##############################################################################
+# Local imports.
+from .lru import LRUCache
+
+##############################################################################
+SourceKey = TypeVar("SourceKey", bound=Hashable)
+"""The type of the key of a source in the store."""
+
+_CODECS: Final[dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]] = {
+    "zlib": (zlib_compress, zlib_decompress),
+    "lzma": (lzma_compress, lzma_decompress),
+}
+"""The compressors and decompressors that can be used, by name."""
+
+
+##############################################################################
+@dataclass(frozen=True)
+class _Plain:
+    """A source held in the store as plain text."""
+
+    source: str
+    """The source."""
+
+    version: Hashable
+    """The version of the source."""
+
+    @property
+    def size(self) -> int:
+        """The size of the source as it's held."""
+        return len(self.source)
+
+
+##############################################################################
+@dataclass(frozen=True)
+class _Compressed:
+    """A source held in the store compressed."""
+
+    source: bytes
+    """The compressed source."""
+
+    version: Hashable
+    """The version of the source."""
+
+    @property
+    def size(self) -> int:
+        """The size of the source as it's held."""
+        return len(self.source)
+
+
+##############################################################################
+_Stored: TypeAlias = _Plain | _Compressed
+"""A source held in the store."""
+
+
+##############################################################################
+class SourceStore(Generic[SourceKey]):
+    """A store for the sources of documents.
+
+    One source in the store is the active one, and it's held as plain
+    text, ready for use. The others are held compressed, and are only
+    decompressed when they're asked for; when there are more of them than
+    fit in the store, the least-recently-used are discarded.
+
+    A source that stops being active isn't compressed right away, as it
+    could be large and take a while to compress; instead it's held as it is
+    until `compress` is called, which can be done from another thread.
+
+    Each source can be stored with a version, such as the modification
+    stamp of the file it came from; asking for a source with a version
+    other than the one it was stored with finds nothing.
+
+    Note:
+        The store is safe to use from more than one thread.
+    """
+
+    COMPRESSIONS: Final[tuple[str, ...]] = tuple(_CODECS)
+    """The names of the compressions that the store can use."""
+
+    def __init__(self, max_size: int, compression: str = "zlib") -> None:
+        """Initialise the store.
+
+        Args:
+            max_size: The maximum total size of the inactive sources.
+            compression: The name of the compression to use.
+
+        Raises:
+            ValueError: If the compression isn't one that can be used.
+        """
+        try:
+            self._compress, self._decompress = _CODECS[compression]
+        except KeyError:
+            raise ValueError(f"Unknown compression: {compression}") from None
+        self._max_size = max_size
+        """The maximum total size of the inactive sources."""
+        self._inactive: LRUCache[SourceKey, _Compressed] = LRUCache(
+            maxsize, max_size, lambda stored: stored.size
+        )
+        """The inactive sources that have been compressed."""
+        self._waiting: dict[SourceKey, _Plain] = {}
+        """The inactive sources that are waiting to be compressed."""
+        self._active_key: SourceKey | None = None
+        """The key of the active source."""
+        self._active = _Plain("", None)
+        """The active source."""
+        self._lock = Lock()
+        """Lock for access to the store."""
+
+    @property
+    def active(self) -> str:
+        """The active source."""
+        return self._active.source
+
+    @property
+    def active_key(self) -> SourceKey | None:
+        """The key of the active source, if it has one."""
+        return self._active_key
+
+    @property
+    def size(self) -> int:
+        """The total size of the sources held in the store.
+
+        Note:
+            Compressed sources are measured in bytes, and sources that are
+            held as plain text are measured in characters.
+        """
+        with self._lock:
+            return (
+                self._inactive.size
+                + sum(stored.size for stored in self._waiting.values())
+                + self._active.size
+            )
+
+    @property
+    def compressed_size(self) -> int:
+        """The total size of the compressed sources held in the store."""
+        with self._lock:
+            return self._inactive.size
+
+    def __len__(self) -> int:
+        """The number of sources held in the store."""
+        with self._lock:
+            return (
+                len(self._inactive)
+                + len(self._waiting)
+                + (self._active_key is not None)
+            )
+
+    def __contains__(self, key: object) -> bool:
+        """Is there a source for the given key in the store?"""
+        with self._lock:
+            return (
+                key == self._active_key or key in self._waiting or key in self._inactive
+            )
+
+    def _find(self, key: SourceKey) -> _Stored | None:
+        """Find a source in the store.
+
+        Args:
+            key: The key of the source.
+
+        Returns:
+            The source, or `None` if it isn't in the store.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        if key == self._active_key:
+            return self._active
+        if (stored := self._waiting.get(key)) is not None:
+            return stored
+        return self._inactive.get(key)
+
+    def _deactivate(self) -> None:
+        """Make the active source an inactive one.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        if self._active_key is not None and self._max_size > 0:
+            self._waiting[self._active_key] = self._active
+        self._active_key = None
+        self._active = _Plain("", None)
+
+    def activate(
+        self, key: SourceKey | None, source: str, version: Hashable = None
+    ) -> None:
+        """Make a source the active one.
+
+        Args:
+            key: The key of the source, or `None` if it's not to be kept
+                once it stops being active.
+            source: The source.
+            version: The version of the source.
+        """
+        with self._lock:
+            if key is None or key != self._active_key:
+                self._deactivate()
+            if key is not None:
+                self._waiting.pop(key, None)
+                self._inactive.pop(key)
+            self._active_key = key
+            self._active = _Plain(source, version)
+
+    def _plain(self, stored: _Stored) -> str:
+        """Get the plain text of a stored source.
+
+        Args:
+            stored: The stored source.
+
+        Returns:
+            The plain text of the source.
+        """
+        if isinstance(stored, _Plain):
+            return stored.source
+        return self._decompress(stored.source).decode("utf-8")
+
+    def get(self, key: SourceKey, version: Hashable = None) -> str | None:
+        """Get a source from the store, without making it the active one.
+
+        Args:
+            key: The key of the source.
+            version: The version of the source wanted.
+
+        Returns:
+            The source, or `None` if that version of it isn't in the store.
+        """
+        with self._lock:
+            stored = self._find(key)
+        if stored is None or stored.version != version:
+            return None
+        # Decompression is done outside of the lock; it's the slow part.
+        return self._plain(stored)
+
+    def restore(self, key: SourceKey, version: Hashable = None) -> str | None:
+        """Make a source that is in the store the active one.
+
+        Args:
+            key: The key of the source.
+            version: The version of the source wanted.
+
+        Returns:
+            The source, or `None` if that version of it isn't in the store.
+
+        Note:
+            If the store holds a different version of the source, it is
+            discarded.
+        """
+        with self._lock:
+            if (stored := self._find(key)) is None:
+                return None
+            if stored.version != version:
+                self._discard(key)
+                return None
+        source = self._plain(stored)
+        self.activate(key, source, version)
+        return source
+
+    def _discard(self, key: SourceKey) -> None:
+        """Discard a source from the store.
+
+        Args:
+            key: The key of the source to discard.
+
+        Note:
+            The caller is expected to hold the lock.
+        """
+        if key == self._active_key:
+            self._active_key = None
+            self._active = _Plain("", None)
+        self._waiting.pop(key, None)
+        self._inactive.pop(key)
+
+    def discard(self, key: SourceKey) -> None:
+        """Discard a source from the store.
+
+        Args:
+            key: The key of the source to discard.
+        """
+        with self._lock:
+            self._discard(key)
+
+    def compress(self) -> int:
+        """Compress the inactive sources that are waiting to be compressed.
+
+        Returns:
+            The number of sources that were compressed.
+
+        Note:
+            This is where the size of the store is brought back within its
+            budget, by discarding the least-recently-used sources.
+        """
+        with self._lock:
+            waiting = list(self._waiting.items())
+        compressed = 0
+        for key, stored in waiting:
+            squashed = _Compressed(
+                self._compress(stored.source.encode("utf-8")), stored.version
+            )
+            with self._lock:
+                # Only store the compressed source if it's still the one
+                # that was waiting; it could have been restored, replaced or
+                # discarded in the meantime.
+                if self._waiting.get(key) is stored:
+                    del self._waiting[key]
+                    self._inactive[key] = squashed
+                    compressed += 1
+        return compressed
+
+    def clear(self) -> None:
+        """Remove everything from the store."""
+        with self._lock:
+            self._inactive.clear()
+            self._waiting.clear()
+            self._active_key = None
+            self._active = _Plain("", None)
+
+
+### source_store.py ends here
@@ -0,0 +1,308 @@
+"""Provides code for watching a file for changes to its content."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from abc import ABC, abstractmethod
+from ctypes import CDLL, c_char_p, c_int, c_uint32, get_errno
+from ctypes.util import find_library
+from hashlib import sha256
+from os import close, read, strerror
+from pathlib import Path
+from select import select
+from struct import calcsize, unpack_from
+from threading import Event, Thread
+from time import monotonic
+from typing import Callable, Final
+
+##############################################################################
+_IN_MODIFY: Final[int] = 0x00000002
+_IN_ATTRIB: Final[int] = 0x00000004
+_IN_CLOSE_WRITE: Final[int] = 0x00000008
+_IN_MOVED_TO: Final[int] = 0x00000080
+_IN_CREATE: Final[int] = 0x00000100
+_IN_NONBLOCK: Final[int] = 0o4000
+_IN_CLOEXEC: Final[int] = 0o2000000
+"""Values used with inotify; see `inotify(7)`."""
+
+_EVENT: Final[str] = "iIII"
+"""The layout of the fixed part of an inotify event."""
+
+
+##############################################################################
+def _digest(text: str) -> bytes:
+    """Get a digest of some text.
+
+    Args:
+        text: The text to get the digest of.
+
+    Returns:
+        The digest.
+    """
+    return sha256(text.encode("utf-8")).digest()
+
+
+##############################################################################
+class FileWatcher(ABC):
+    """Watches a file, reporting when its content changes.
+
+    The watching happens in a thread of its own. Bursts of activity on the
+    file are debounced, and a change is only reported if the content of the
+    file is actually different from what it was last known to be.
+
+    How activity on the file is noticed is left to subclasses.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        content: str,
+        on_change: Callable[[str], None],
+        debounce: float,
+    ) -> None:
+        """Initialise the watcher.
+
+        Args:
+            path: The path to the file to watch.
+            content: The content of the file as it is currently known.
+            on_change: Function to call with the new content of the file.
+            debounce: How long the file needs to be quiet before it's read.
+
+        Note:
+            `on_change` is called from the watcher's own thread.
+        """
+        self.path = path
+        """The path to the file being watched."""
+        self._digest = _digest(content)
+        """The digest of the last-known content of the file."""
+        self._on_change = on_change
+        """The function to call when the content changes."""
+        self._debounce = debounce
+        """How long the file needs to be quiet before it's read."""
+        self._stopping = Event()
+        """Event that is set when the watcher should stop."""
+        self._thread = Thread(target=self._watch, daemon=True)
+        """The thread that does the watching."""
+
+    def start(self) -> FileWatcher:
+        """Start watching the file.
+
+        Returns:
+            Self.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching the file."""
+        self._stopping.set()
+
+    @property
+    def stopped(self) -> bool:
+        """Has the watcher been asked to stop?"""
+        return self._stopping.is_set()
+
+    @abstractmethod
+    def _activity(self, timeout: float) -> bool:
+        """Wait for activity on the file.
+
+        Args:
+            timeout: The maximum time to wait.
+
+        Returns:
+            `True` if there was activity, `False` if not.
+        """
+
+    def _close(self) -> None:
+        """Release anything the watcher was using."""
+
+    def _check(self) -> None:
+        """Check if the content of the file has changed."""
+        try:
+            content = self.path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return
+        if (digest := _digest(content)) != self._digest:
+            self._digest = digest
+            if not self.stopped:
+                self._on_change(content)
+
+    def _watch(self) -> None:
+        """Watch the file."""
+        try:
+            while not self.stopped:
+                if self._activity(0.5):
+                    # Something happened; wait for things to go quiet
+                    # before taking a look.
+                    while not self.stopped and self._activity(self._debounce):
+                        pass
+                    self._check()
+        finally:
+            self._close()
+
+
+##############################################################################
+class PollingFileWatcher(FileWatcher):
+    """A file watcher that polls the file for changes."""
+
+    def __init__(
+        self,
+        path: Path,
+        content: str,
+        on_change: Callable[[str], None],
+        debounce: float,
+        interval: float,
+    ) -> None:
+        """Initialise the watcher.
+
+        Args:
+            path: The path to the file to watch.
+            content: The content of the file as it is currently known.
+            on_change: Function to call with the new content of the file.
+            debounce: How long the file needs to be quiet before it's read.
+            interval: How often to look at the file.
+        """
+        super().__init__(path, content, on_change, debounce)
+        self._interval = interval
+        """How often to look at the file."""
+        self._stamp = self._current_stamp()
+        """The stamp of the file when it was last looked at."""
+
+    def _current_stamp(self) -> tuple[int, int, int] | None:
+        """Get the current stamp of the file.
+
+        Returns:
+            The stamp of the file, or `None` if it couldn't be had.
+        """
+        try:
+            details = self.path.stat()
+        except OSError:
+            return None
+        return details.st_ino, details.st_mtime_ns, details.st_size
+
+    def _activity(self, timeout: float) -> bool:
+        deadline = monotonic() + timeout
+        while not self.stopped and (remaining := deadline - monotonic()) > 0:
+            self._stopping.wait(min(self._interval, remaining))
+            if (stamp := self._current_stamp()) != self._stamp:
+                self._stamp = stamp
+                return True
+        return False
+
+
+##############################################################################
+class InotifyFileWatcher(FileWatcher):
+    """A file watcher that uses inotify to learn of changes."""
+
+    def __init__(
+        self,
+        path: Path,
+        content: str,
+        on_change: Callable[[str], None],
+        debounce: float,
+    ) -> None:
+        """Initialise the watcher.
+
+        Args:
+            path: The path to the file to watch.
+            content: The content of the file as it is currently known.
+            on_change: Function to call with the new content of the file.
+            debounce: How long the file needs to be quiet before it's read.
+
+        Raises:
+            OSError: If inotify isn't available or the watch can't be set.
+        """
+        super().__init__(path, content, on_change, debounce)
+        if (library := find_library("c")) is None:
+            raise OSError("The C library could not be found")
+        libc = CDLL(library, use_errno=True)
+        try:
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError as error:
+            raise OSError("inotify is not available") from error
+        init.argtypes, init.restype = [c_int], c_int
+        add_watch.argtypes, add_watch.restype = [c_int, c_char_p, c_uint32], c_int
+        if (descriptor := init(_IN_NONBLOCK | _IN_CLOEXEC)) < 0:
+            errno = get_errno()
+            raise OSError(errno, strerror(errno))
+        self._descriptor = descriptor
+        """The inotify file descriptor."""
+        # Editors often save by writing a new file and moving it over the
+        # old one, so it's the directory that gets watched.
+        if (
+            add_watch(
+                descriptor,
+                bytes(path.absolute().parent),
+                _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE,
+            )
+            < 0
+        ):
+            errno = get_errno()
+            close(descriptor)
+            raise OSError(errno, strerror(errno))
+        self._name = bytes(Path(path.name))
+        """The name of the file, as it'll appear in events."""
+
+    def _activity(self, timeout: float) -> bool:
+        deadline = monotonic() + timeout
+        while not self.stopped and (remaining := deadline - monotonic()) > 0:
+            # Wait in short slices, so that a request to stop is noticed.
+            if not select([self._descriptor], [], [], min(remaining, 0.25))[0]:
+                continue
+            try:
+                events = read(self._descriptor, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            relevant = False
+            while offset < len(events):
+                *_, length = unpack_from(_EVENT, events, offset)
+                offset += calcsize(_EVENT)
+                relevant = relevant or (
+                    events[offset : offset + length].rstrip(b"\0") == self._name
+                )
+                offset += length
+            if relevant:
+                return True
+        return False
+
+    def _close(self) -> None:
+        close(self._descriptor)
+
+
+##############################################################################
+def watch_file(
+    path: Path,
+    content: str,
+    on_change: Callable[[str], None],
+    debounce: float = 0.25,
+    poll_interval: float = 1.0,
+) -> FileWatcher:
+    """Start watching a file for changes to its content.
+
+    Args:
+        path: The path to the file to watch.
+        content: The content of the file as it is currently known.
+        on_change: Function to call with the new content of the file.
+        debounce: How long the file needs to be quiet before it's read.
+        poll_interval: How often to look at the file, if it has to be polled.
+
+    Returns:
+        The watcher, which has been started.
+
+    Note:
+        inotify is used where it's available; otherwise the file is polled.
+        `on_change` is called from the watcher's own thread.
+    """
+    watcher: FileWatcher
+    try:
+        watcher = InotifyFileWatcher(path, content, on_change, debounce)
+    except OSError:
+        watcher = PollingFileWatcher(path, content, on_change, debounce, poll_interval)
+    return watcher.start()
+
+
+### watch.py ends here
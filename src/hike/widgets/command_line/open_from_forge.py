@@ -41,15 +41,19 @@ class OpenFromForgeCommand(InputCommand):
     HELP = f"""
     | Format | Effect |
     | -- | -- |
-    | `<owner>/<repo>` | Open `README.md` from a repository |
-    | `<owner> <repo>` | Open `README.md` from a repository |
+    | `<owner>/<repo>` | Open the README from a repository |
+    | `<owner> <repo>` | Open the README from a repository |
     | `<owner>/<repo> <file>` | Open a specific file from a repository |
     | `<owner> <repo> <file>` | Open a specific file from a repository |
-    | `<owner>/<repo>:<branch>` | Open `README.md` from a specific branch of a repository |
-    | `<owner> <repo>:<branch>` | Open `README.md` from a specific branch of a repository |
+    | `<owner>/<repo>:<branch>` | Open the README from a specific branch of a repository |
+    | `<owner> <repo>:<branch>` | Open the README from a specific branch of a repository |
     | `<owner>/<repo>:<branch> <file>` | Open a specific file from a specific branch of a repository |
     | `<owner> <repo>:<branch> <file>` | Open a specific file from a specific branch of a repository |
 
+    If `<file>` is omitted the forge is asked about the repository and the
+    most likely README is opened, looking for these in order of preference:
+    {", ".join(f"`{readme}`" for readme in load_configuration().readme_names)}.
+
     If `<branch>` is omitted the requested file is looked in the following branches:
     {", ".join(f"`{branch}`" for branch in load_configuration().main_branches)}.
     """
@@ -0,0 +1,1544 @@
+"""Provides the widget that displays a Markdown document."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from asyncio import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Event,
+    Task,
+    create_task,
+    gather,
+    to_thread,
+    wait,
+)
+from bisect import bisect_right
+from contextlib import suppress
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from time import perf_counter
+from typing import Any, Callable, Final, Iterable, Iterator, Sequence
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+##############################################################################
+# Textual imports.
+from textual.app import ComposeResult
+from textual.await_complete import AwaitComplete
+from textual.await_remove import AwaitRemove
+from textual.content import Content
+from textual.css.query import NoMatches
+from textual.events import Click
+from textual.geometry import Region
+from textual.reactive import var
+from textual.strip import Strip
+from textual.widget import AwaitMount, Widget
+from textual.widgets import Label, Markdown
+from textual.widgets.markdown import MarkdownBlock, MarkdownFence, TableOfContentsType
+
+##############################################################################
+# Local imports.
+from ..support import (
+    AnchorIndex,
+    Block,
+    HighlightCache,
+    ParsePool,
+    highlight_theme,
+    top_level_blocks,
+)
+from .markdown_compat import (
+    MarkdownTable,
+    MarkdownTableContent,
+    document_of,
+    inline_content,
+    parse_blocks,
+    set_highlighted_code,
+    set_source,
+    set_token,
+    table_cells,
+)
+from .table import VirtualTable
+
+
+##############################################################################
+def estimated_height(block: Block) -> int:
+    """Estimate the height of a block once it is rendered.
+
+    Args:
+        block: The block to estimate the height of.
+
+    Returns:
+        The estimated height of the block, in lines.
+    """
+    start, end = block.lines
+    return max(end - start, 1) + 1
+
+
+##############################################################################
+def _document_of(block: MarkdownBlock) -> Document | None:
+    """Get the document that a block belongs to, if it's a `Document`.
+
+    Args:
+        block: The block.
+
+    Returns:
+        The document the block belongs to, or `None` if it isn't a
+        `Document`.
+    """
+    return document if isinstance(document := document_of(block), Document) else None
+
+
+##############################################################################
+@dataclass
+class RenderTimings:
+    """Timings for an update of a document."""
+
+    started: float = field(default_factory=perf_counter)
+    """The time at which the update started."""
+
+    first_paint: float | None = None
+    """The number of seconds until the first of the update was on display."""
+
+    complete: float | None = None
+    """The number of seconds until all of the update was on display."""
+
+    on_display: Event = field(default_factory=Event, repr=False, compare=False)
+    """Event that is set once the first of the update is on display."""
+
+    built: int = 0
+    """The number of block widgets that were built for the update."""
+
+    recycled: int = 0
+    """The number of block widgets that were re-bound to new content for the update."""
+
+    def painted(self) -> None:
+        """Make a note that the first of the update is on display."""
+        if self.first_paint is None:
+            self.first_paint = perf_counter() - self.started
+            self.on_display.set()
+
+    def completed(self) -> None:
+        """Make a note that all of the update is on display."""
+        self.painted()
+        if self.complete is None:
+            self.complete = perf_counter() - self.started
+
+
+##############################################################################
+class DocumentPage(Widget):
+    """A page of the blocks of a virtual document."""
+
+    DEFAULT_CSS = """
+    DocumentPage {
+        height: auto;
+        layout: vertical;
+        & > MarkdownParagraph {
+            margin: 0 0 1 0;
+        }
+    }
+    """
+
+    def __init__(self, first: int, blocks: Sequence[Block]) -> None:
+        """Initialise the page.
+
+        Args:
+            first: The index of the first block on the page.
+            blocks: The blocks on the page.
+        """
+        super().__init__()
+        self.first = first
+        """The index of the first block on the page."""
+        self.blocks = blocks
+        """The blocks on the page."""
+        self.estimate = sum(estimated_height(block) for block in blocks)
+        """The estimated height of the page."""
+        self.widgets: dict[int, Widget] = {}
+        """The widgets for the blocks on the page, keyed by block index."""
+        self.materialised = False
+        """Are the widgets for the blocks on the page mounted?"""
+        self.styles.height = self.estimate
+
+    @property
+    def height(self) -> int:
+        """The height of the page as it is laid out, or as estimated."""
+        return self.outer_size.height or self.estimate
+
+
+##############################################################################
+class DocumentTable(MarkdownTable):
+    """A table in a document, which is shown virtually if it's large."""
+
+    def __init__(self, markdown: Markdown, token: Token, *args: Any, **kwargs: Any):
+        """Initialise the table.
+
+        Args:
+            markdown: The document the table is in.
+            token: The token the table is built from.
+            args: The positional arguments for the block.
+            kwargs: The keyword arguments for the block.
+        """
+        super().__init__(markdown, token, *args, **kwargs)
+        self._cells: tuple[list[Content], list[list[Content]]] | None = None
+        """The headers and rows of the table, if built straight from tokens."""
+
+    @classmethod
+    def from_tokens(cls, markdown: Markdown, tokens: Sequence[Token]) -> DocumentTable:
+        """Build a virtual table straight from its tokens.
+
+        Args:
+            markdown: The document the table is in.
+            tokens: The tokens of the table.
+
+        Returns:
+            The table.
+
+        Note:
+            Unlike a table built by Markdown, this doesn't make a block for
+            every cell of the table along the way, which for a large table
+            takes far longer than showing it.
+        """
+        table = cls(markdown, tokens[0])
+        headers: list[Content] = []
+        rows: list[list[Content]] = []
+        cells: list[Content] | None = None
+        for token in tokens:
+            if token.type == "th_open":
+                cells = headers
+            elif token.type == "td_open":
+                cells = rows[-1]
+            elif token.type == "tr_open" and headers:
+                rows.append([])
+            elif token.type == "inline" and cells is not None:
+                cells.append(inline_content(table, token))
+                cells = None
+        table._cells = headers, rows
+        return table
+
+    def compose(self) -> ComposeResult:
+        """Compose the content of the table."""
+        if self._cells is not None:
+            yield VirtualTable(*self._cells)
+            return
+        headers, rows = table_cells(self)
+        if (document := _document_of(self)) is not None and document.is_large_table(
+            len(rows), len(rows) * len(headers)
+        ):
+            yield VirtualTable(headers, rows)
+        else:
+            yield MarkdownTableContent(headers, rows)
+
+
+##############################################################################
+class DocumentFence(MarkdownFence):
+    """A fence in a document, which is highlighted once it's near the view."""
+
+    def __init__(self, markdown: Markdown, token: Token, code: str) -> None:
+        """Initialise the fence.
+
+        Args:
+            markdown: The document the fence is in.
+            token: The token the fence is built from.
+            code: The code in the fence.
+        """
+        super().__init__(markdown, token, code)
+        self.theme = highlight_theme(
+            self.app.native_ansi_color, self.app.current_theme.dark
+        )
+        """The name of the highlight theme for the fence."""
+        self.highlighted = False
+        """Has the code in the fence been highlighted?"""
+        if (highlighted := self._cached()) is not None:
+            set_highlighted_code(self, highlighted)
+
+    @classmethod
+    def highlight(
+        cls, code: str, language: str, ansi: bool = False, dark: bool = False
+    ) -> Content:
+        """Get the code of a fence, as it's shown before it's highlighted.
+
+        Args:
+            code: The code.
+            language: The language of the code.
+            ansi: Is the application using ANSI colours?
+            dark: Is the application's theme a dark one?
+
+        Returns:
+            The code, unhighlighted.
+
+        Note:
+            MarkdownFence highlights its code as soon as it's made; here
+            that is put off until the fence is near the view, unless the
+            code has been highlighted before.
+        """
+        return Content(code)
+
+    def _cached(self) -> Content | None:
+        """Get the highlighted code from the document's cache.
+
+        Returns:
+            The highlighted code, or `None` if it isn't in the cache.
+        """
+        if (document := _document_of(self)) is not None:
+            highlighted = document.highlight_cache.get(
+                self.code, self.lexer, self.theme
+            )
+            self.highlighted = highlighted is not None
+            return highlighted
+        return None
+
+    def show_highlighted(self, highlighted: Content, theme: str) -> None:
+        """Show the highlighted code.
+
+        Args:
+            highlighted: The highlighted code.
+            theme: The name of the theme the code was highlighted with.
+        """
+        if theme == self.theme:
+            self.highlighted = True
+            set_highlighted_code(self, highlighted)
+            # Highlighting doesn't change the size of the code, so there's
+            # no need for the layout to be worked out again.
+            with suppress(NoMatches):
+                self.query_one("#code-content", Label).update(highlighted, layout=False)
+
+    def on_mount(self) -> None:
+        """Ask to be highlighted once mounted, if need be."""
+        if not self.highlighted and (document := _document_of(self)) is not None:
+            document.highlight_soon(self)
+
+    def on_unmount(self) -> None:
+        """Make sure the document forgets about the fence once it's gone."""
+        if (document := _document_of(self)) is not None:
+            document.forget_fence(self)
+
+    def render_lines(self, crop: Region) -> list[Strip]:
+        """Render the fence, asking for it to be highlighted if it isn't.
+
+        Args:
+            crop: The region of the fence to render.
+
+        Returns:
+            The rendered lines.
+        """
+        # A fence is only rendered when it's in view, which makes this the
+        # place to notice that it's time for it to be highlighted.
+        if not self.highlighted and (document := _document_of(self)) is not None:
+            document.highlight_near(self)
+        return super().render_lines(crop)
+
+    def notify_style_update(self) -> None:
+        """Handle the styles of the fence changing."""
+        # MarkdownFence highlights the code again for any change of style;
+        # here it's only done if the highlight theme has changed.
+        super(MarkdownFence, self).notify_style_update()
+        if (
+            theme := highlight_theme(
+                self.app.native_ansi_color, self.app.current_theme.dark
+            )
+        ) != self.theme:
+            self.theme = theme
+            if (highlighted := self._cached()) is not None:
+                self.show_highlighted(highlighted, theme)
+            elif (document := _document_of(self)) is not None:
+                document.highlight_soon(self)
+
+
+##############################################################################
+class Document(Markdown):
+    """Widget that displays a Markdown document.
+
+    When a document is updated, its top-level blocks are compared with the
+    blocks that are already displayed, and only those that have changed
+    are replaced. The table of contents is worked out from the blocks, and
+    is published as soon as the document has been parsed, before the
+    widgets for the document are built; a jump to a block whose widgets
+    aren't mounted yet waits until they are.
+
+    Parsing happens away from the event loop, optionally using a parse
+    pool that picks how to parse the document based on its size; a parse
+    that is still under way when the document is updated again, or when
+    `cancel_parse` is called, is abandoned.
+
+    Documents whose source is at or above a given size are shown in a
+    virtual mode: the whole document is parsed, but only the blocks in and
+    near the viewport of the containing scrollable widget are mounted;
+    everything else takes up space using an estimated height.
+
+    Tables with at least a given number of rows, or of cells, are shown
+    with a widget that only renders the rows that are in view, rather than
+    with a widget for every cell.
+
+    The code in fences is only highlighted once the fence comes near the
+    view, away from the event loop; highlighted code is cached, so code
+    that has been highlighted before is shown highlighted right away.
+
+    A document can also be shown as an outline, where each heading starts
+    out with its section collapsed. An outline is always shown in virtual
+    mode, so only the headings near the view are built to start with; the
+    body of a section is only built once the section is expanded, either by
+    clicking on its heading or by jumping to it.
+    """
+
+    BLOCKS = {
+        **Markdown.BLOCKS,
+        "table_open": DocumentTable,
+        "fence": DocumentFence,
+        "code_block": DocumentFence,
+    }
+
+    _PAGE_SIZE: Final[int] = 50
+    """The number of blocks on a page of a virtual document."""
+
+    _MOUNT_BATCH_SIZE: Final[int] = 200
+    """The number of widgets to mount at once."""
+
+    _RECYCLE_LOOKAHEAD: Final[int] = 8
+    """How far ahead to look for a widget to re-bind to a changed block."""
+
+    outline: var[bool] = var(False)
+    """Is the document being shown as an outline?"""
+
+    def __init__(
+        self,
+        markdown: str | None = None,
+        *,
+        parser_factory: Callable[[], MarkdownIt] | None = None,
+        open_links: bool = True,
+        virtual_threshold: int | None = None,
+        parse_pool: ParsePool | None = None,
+        virtual_table_rows: int | None = None,
+        virtual_table_cells: int | None = None,
+        highlight_cache: HighlightCache | None = None,
+        outline: bool = False,
+        partial: bool = False,
+        recycle: bool = True,
+    ) -> None:
+        """Initialise the document.
+
+        Args:
+            markdown: The Markdown to start the document with.
+            parser_factory: A factory function for a Markdown parser.
+            open_links: Open links automatically?
+            virtual_threshold: The size at which a document is shown in
+                virtual mode, or `None` to never use virtual mode.
+            parse_pool: The pool to parse the document with, or `None` to
+                always parse on a thread.
+            virtual_table_rows: The number of rows at which a table is shown
+                virtually, or `None` to not go by rows.
+            virtual_table_cells: The number of cells at which a table is
+                shown virtually, or `None` to not go by cells.
+            highlight_cache: The cache of highlighted code to use, or `None`
+                for the document to have a cache of its own.
+            outline: Show the document as an outline?
+            partial: Is the Markdown only the first part of the document?
+            recycle: Re-bind the widgets of changed blocks to new content,
+                where possible, rather than building new widgets?
+        """
+        super().__init__(parser_factory=parser_factory, open_links=open_links)
+        self._make_parser = parser_factory
+        """The factory function for a Markdown parser, if there is one."""
+        self._held_markdown = markdown
+        """The initial Markdown, held back until the document is mounted."""
+        self._held_partial = partial
+        """Is the initial Markdown only the first part of the document?"""
+        self._virtual_threshold = virtual_threshold
+        """The size at which a document is shown in virtual mode."""
+        self._blocks: list[Block] = []
+        """The blocks of the document."""
+        self._widgets: list[list[Widget]] = []
+        """The widgets for each of the blocks of the document.
+
+        This is only populated when the document isn't in virtual mode.
+        """
+        self._pages: list[DocumentPage] = []
+        """The pages of the document, when in virtual mode."""
+        self._parse_pool = parse_pool
+        """The pool to parse the document with."""
+        self._virtual_table_rows = virtual_table_rows
+        """The number of rows at which a table is shown virtually."""
+        self._virtual_table_cells = virtual_table_cells
+        """The number of cells at which a table is shown virtually."""
+        self._parsing: Task[list[Block]] | None = None
+        """The parse that is under way, if there is one."""
+        self._parse_generation = 0
+        """The generation of the most recent parse to be asked for."""
+        self._pending_jump: int | None = None
+        """The index of a block that is waiting to be jumped to."""
+        self.timings = RenderTimings()
+        """The timings for the most recent update of the document."""
+        self.highlight_cache = (
+            HighlightCache(256) if highlight_cache is None else highlight_cache
+        )
+        """The cache of highlighted code."""
+        self._unhighlighted: dict[DocumentFence, None] = {}
+        """The fences that are waiting to be highlighted, in the order they were mounted."""
+        self._headings: list[int] = []
+        """The indices of the blocks of the document that are headings."""
+        self._expanded: set[int] = set()
+        """The indices of the headings whose sections are expanded in outline mode."""
+        self._partial: Task[None] | None = None
+        """The update with the first part of the document, while it's under way."""
+        self._waiting = 0
+        """The number of updates that have waited on the first part of the document."""
+        self._recycle = recycle
+        """Should the widgets of changed blocks be re-bound to new content?"""
+        self._anchors: AnchorIndex | None = None
+        """The index of the anchors of the headings, once it's been built."""
+        self._contents: TableOfContentsType | None = None
+        """The table of contents, once it's been worked out."""
+        self.set_reactive(Document.outline, outline)
+
+    def is_large_table(self, rows: int, cells: int) -> bool:
+        """Is a table large enough that it should be shown virtually?
+
+        Args:
+            rows: The number of rows in the table.
+            cells: The number of cells in the table.
+
+        Returns:
+            `True` if the table should be shown virtually, `False` if not.
+        """
+        return (
+            self._virtual_table_rows is not None and rows >= self._virtual_table_rows
+        ) or (
+            self._virtual_table_cells is not None and cells >= self._virtual_table_cells
+        )
+
+    def _block_widgets(self, block: Block) -> list[Widget]:
+        """Build the widgets for a block of the document.
+
+        Args:
+            block: The block to build the widgets for.
+
+        Returns:
+            The widgets for the block.
+        """
+        if block.kind == "table" and self.is_large_table(
+            sum(1 for token in block.tokens if token.type == "tr_open") - 1,
+            sum(1 for token in block.tokens if token.type == "td_open"),
+        ):
+            return [DocumentTable.from_tokens(self, block.tokens)]
+        return list(parse_blocks(self, block.tokens))
+
+    def _recycle_class(self, block: Block) -> type[MarkdownBlock] | None:
+        """Get the class of widget that a block can be re-bound to.
+
+        Args:
+            block: The block to check.
+
+        Returns:
+            The class of widget that can show the block once re-bound to
+            it, or `None` if the block needs a widget built for it.
+
+        Note:
+            Only blocks that are made of a single widget whose content is
+            all inline, such as paragraphs and headings, can be re-bound.
+        """
+        if block.kind in ("heading", "paragraph") and len(block.tokens) == 3:
+            return self.get_block_class(
+                block.tokens[0].tag if block.kind == "heading" else "paragraph_open"
+            )
+        if block.kind == "hr" and len(block.tokens) == 1:
+            return self.get_block_class("hr")
+        return None
+
+    def _recyclable(
+        self,
+        old_blocks: Sequence[Block],
+        old_widgets: Sequence[list[Widget]],
+        blocks: Sequence[Block],
+    ) -> Iterator[tuple[int, int]]:
+        """Find the widgets of old blocks that can be re-bound to new blocks.
+
+        Args:
+            old_blocks: The old blocks that are being replaced.
+            old_widgets: The widgets for the old blocks.
+            blocks: The new blocks that are replacing them.
+
+        Yields:
+            The index of an old block and of the new block its widget can
+            be re-bound to.
+
+        Note:
+            Widgets are paired up in order, so those that are re-bound stay
+            in the same order as the blocks they're re-bound to.
+        """
+        position = 0
+        for index, block in enumerate(blocks):
+            if (wanted := self._recycle_class(block)) is None:
+                continue
+            for candidate in range(
+                position, min(position + self._RECYCLE_LOOKAHEAD, len(old_blocks))
+            ):
+                if (
+                    len(widgets := old_widgets[candidate]) == 1
+                    and type(widgets[0]) is wanted
+                    and self._recycle_class(old_blocks[candidate]) is wanted
+                ):
+                    yield candidate, index
+                    position = candidate + 1
+                    break
+
+    @staticmethod
+    def _rebind(widget: MarkdownBlock, block: Block) -> None:
+        """Re-bind the widget of a block to show a different block.
+
+        Args:
+            widget: The widget to re-bind.
+            block: The block to show in the widget.
+        """
+        set_token(widget, block.tokens[0])
+        widget.source_range = block.lines
+        if len(block.tokens) > 1:
+            widget.build_from_token(block.tokens[1])
+
+    @property
+    def is_virtual(self) -> bool:
+        """Is the document being shown in virtual mode?"""
+        return bool(self._pages)
+
+    def on_mount(self) -> None:
+        """Configure the document once it's mounted."""
+        if isinstance(self.parent, Widget):
+            self.watch(self.parent, "scroll_y", self._refresh_window, init=False)
+        # Markdown waits on the update with the initial Markdown while it's
+        # being mounted, which would stop the document handling messages,
+        # such as the publication of its table of contents, until it's all
+        # built; so the initial Markdown is held back until mounting is done.
+        if (markdown := self._held_markdown) is not None:
+            self._held_markdown = None
+            self.call_later(self._update_with, markdown, self._held_partial)
+
+    def highlight_soon(self, fence: DocumentFence) -> None:
+        """Highlight a fence once it comes into view.
+
+        Args:
+            fence: The fence to highlight.
+        """
+        self._unhighlighted[fence] = None
+        fence.refresh()
+
+    def forget_fence(self, fence: DocumentFence) -> None:
+        """Forget about a fence that no longer needs highlighting.
+
+        Args:
+            fence: The fence to forget about.
+        """
+        self._unhighlighted.pop(fence, None)
+
+    def highlight_near(self, fence: DocumentFence) -> None:
+        """Highlight a fence that is in view, and those near it.
+
+        Args:
+            fence: The fence that is in view.
+
+        Note:
+            The fences either side of the fence, up to about a screen's
+            worth of them in each direction, are highlighted along with it,
+            so that they're ready by the time they're scrolled into view.
+        """
+        if fence not in self._unhighlighted:
+            return
+        fences = list(self._unhighlighted)
+        position = fences.index(fence)
+        near = [
+            fence,
+            *self._within_a_screen(fences[position + 1 :]),
+            *self._within_a_screen(reversed(fences[:position])),
+        ]
+        for nearby in near:
+            del self._unhighlighted[nearby]
+        self.run_worker(self._highlight(near), group="highlight")
+
+    def _within_a_screen(self, fences: Iterable[DocumentFence]) -> list[DocumentFence]:
+        """Get the run of fences that takes up about a screen's worth of space.
+
+        Args:
+            fences: The fences to take from.
+
+        Returns:
+            The fences from the start of the run that fill a screen.
+        """
+        within: list[DocumentFence] = []
+        space = self.app.size.height
+        for fence in fences:
+            if space <= 0:
+                break
+            within.append(fence)
+            space -= max(fence.outer_size.height, 1)
+        return within
+
+    async def _highlight(self, fences: list[DocumentFence]) -> None:
+        """Highlight the code in some fences.
+
+        Args:
+            fences: The fences to highlight.
+        """
+        work = [(fence, fence.code, fence.lexer, fence.theme) for fence in fences]
+        highlighted = await to_thread(
+            lambda: [
+                self.highlight_cache.highlight(code, lexer, theme)
+                for _, code, lexer, theme in work
+            ]
+        )
+        with self.app.batch_update():
+            for (fence, *_, theme), content in zip(work, highlighted):
+                fence.show_highlighted(content, theme)
+
+    def _update_with(self, markdown: str, partial: bool) -> None:
+        """Update the document with new Markdown, without waiting on it.
+
+        Args:
+            markdown: The new Markdown for the document.
+            partial: Is the Markdown only the first part of the document?
+        """
+        self.update(markdown, partial=partial)
+
+    @property
+    def _parser(self) -> MarkdownIt:
+        """A parser for the document."""
+        return (
+            MarkdownIt("gfm-like") if self._make_parser is None else self._make_parser()
+        )
+
+    def update(self, markdown: str, *, partial: bool = False) -> AwaitComplete:
+        """Update the document with new Markdown.
+
+        Args:
+            markdown: The new Markdown for the document.
+            partial: Is the Markdown only the first part of the document?
+
+        Returns:
+            An optionally awaitable object that completes with the update.
+
+        Note:
+            Normally an update abandons any update that is still under way.
+            An update with the first part of a document is the exception:
+            any update that follows it waits for the first of it to be on
+            display, so that there is something to look at while the rest
+            of the document is worked on.
+        """
+        if self._partial is not None and not (
+            self._partial.done() or self.timings.on_display.is_set()
+        ):
+            self._waiting += 1
+            return AwaitComplete(
+                self._update_after(
+                    self._partial,
+                    self.timings,
+                    markdown,
+                    partial,
+                    self._waiting,
+                    self._parse_generation,
+                )
+            )
+        self.cancel_parse()
+        self.timings = timings = RenderTimings()
+        updating = self._update(markdown, self._parse_generation, timings)
+        if partial:
+            self._partial = create_task(updating)
+            return AwaitComplete(self._partial)
+        return AwaitComplete(updating)
+
+    async def _update_after(
+        self,
+        partial: Task[None],
+        timings: RenderTimings,
+        markdown: str,
+        is_partial: bool,
+        waiting: int,
+        generation: int,
+    ) -> None:
+        """Update the document once the first part of it is on display.
+
+        Args:
+            partial: The update with the first part of the document.
+            timings: The timings for the update with the first part.
+            markdown: The new Markdown for the document.
+            is_partial: Is the new Markdown only part of the document?
+            waiting: The position of this update among those waiting.
+            generation: The generation of the parse when the update was asked for.
+        """
+        on_display = create_task(timings.on_display.wait())
+        try:
+            await wait((partial, on_display), return_when=FIRST_COMPLETED)
+        finally:
+            on_display.cancel()
+        # Only the most recent of the updates that were waiting is of any
+        # interest; and then only if nothing else has happened since.
+        if waiting == self._waiting and generation == self._parse_generation:
+            await self.update(markdown, partial=is_partial)
+
+    def _shows_virtually(self, markdown: str) -> bool:
+        """Would some Markdown be shown in virtual mode?
+
+        Args:
+            markdown: The Markdown to check.
+
+        Returns:
+            `True` if it would be shown in virtual mode, `False` if not.
+        """
+        return self.outline or (
+            self._virtual_threshold is not None
+            and len(markdown) >= self._virtual_threshold
+        )
+
+    def cancel_parse(self) -> None:
+        """Cancel any parse of the document that is under way or pending."""
+        self._parse_generation += 1
+        self._partial = None
+        if self._parsing is not None:
+            self._parsing.cancel()
+            self._parsing = None
+
+    async def _parse(self, markdown: str) -> list[Block]:
+        """Parse Markdown into its top-level blocks.
+
+        Args:
+            markdown: The Markdown to parse.
+
+        Returns:
+            The top-level blocks of the Markdown.
+        """
+        parser = self._parser
+        tokens: list[Token] = await (
+            to_thread(parser.parse, markdown)
+            if self._parse_pool is None
+            else self._parse_pool.parse(parser, markdown)
+        )
+        return await to_thread(top_level_blocks, tokens)
+
+    async def _blocks_of(self, markdown: str, generation: int) -> list[Block] | None:
+        """Parse Markdown into its top-level blocks, unless cancelled.
+
+        Args:
+            markdown: The Markdown to parse.
+            generation: The generation of the parse.
+
+        Returns:
+            The top-level blocks of the Markdown, or `None` if the parse was
+            cancelled or superseded.
+        """
+        if generation != self._parse_generation:
+            return None
+        self._parsing = parsing = create_task(self._parse(markdown))
+        try:
+            blocks = await parsing
+        except CancelledError:
+            # If the parse was cancelled because it's been superseded,
+            # that's fine, the result just isn't wanted any more; otherwise
+            # it's the update itself that's being cancelled.
+            if generation != self._parse_generation:
+                return None
+            raise
+        finally:
+            if self._parsing is parsing:
+                self._parsing = None
+        return blocks if generation == self._parse_generation else None
+
+    def _clear(self) -> AwaitRemove:
+        """Clear the document of all of its content.
+
+        Returns:
+            An awaitable that completes when the content is removed.
+        """
+        self._blocks = []
+        self._widgets = []
+        self._pages = []
+        self._headings = []
+        self._expanded = set()
+        self._pending_jump = None
+        self._anchors = None
+        return self.remove_children()
+
+    def _publish_contents(self) -> None:
+        """Let everyone know that the table of contents has changed."""
+        self._contents = None
+        self._anchors = None
+        self.post_message(
+            Markdown.TableOfContentsUpdated(self, self.table_of_contents).set_sender(
+                self
+            )
+        )
+
+    async def _update(
+        self, markdown: str, generation: int, timings: RenderTimings
+    ) -> None:
+        """Update the document with new Markdown.
+
+        Args:
+            markdown: The new Markdown for the document.
+            generation: The generation of the parse for the update.
+            timings: The timings for the update.
+        """
+        if (blocks := await self._blocks_of(markdown, generation)) is not None:
+            await self._show_blocks(markdown, blocks, timings)
+
+    async def _show_blocks(
+        self, markdown: str, blocks: list[Block], timings: RenderTimings
+    ) -> None:
+        """Show the blocks of the document.
+
+        Args:
+            markdown: The Markdown of the document.
+            blocks: The blocks of the document.
+            timings: The timings for the update.
+        """
+        if self._shows_virtually(markdown):
+            set_source(self, markdown)
+            await self._show_virtually(blocks, timings)
+        else:
+            async with self.lock:
+                if self._pages:
+                    await self._clear()
+                set_source(self, markdown)
+                await self._replace_changed(blocks, timings)
+        self._resolve_jump()
+
+    async def _replace_changed(
+        self, blocks: list[Block], timings: RenderTimings
+    ) -> None:
+        """Replace the blocks that have changed.
+
+        Args:
+            blocks: The new blocks of the document.
+            timings: The timings for the update.
+        """
+        old_blocks, old_widgets = self._blocks, self._widgets
+        changes = SequenceMatcher(
+            None,
+            [block.fingerprint for block in old_blocks],
+            [block.fingerprint for block in blocks],
+            autojunk=False,
+        ).get_opcodes()
+
+        # The blocks of the document are known now, so the table of
+        # contents can go out before any widgets are built; the widgets for
+        # the new and changed blocks get filled in as they're made. Where
+        # the widget of a block that is going away can be re-bound to show
+        # a block that is coming in, it's recycled rather than removed.
+        widgets: list[list[Widget]] = [[] for _ in blocks]
+        recycling: list[tuple[MarkdownBlock, Block]] = []
+        for change, old_start, old_end, new_start, new_end in changes:
+            if change == "equal":
+                widgets[new_start:new_end] = old_widgets[old_start:old_end]
+            elif self._recycle:
+                for old, new in self._recyclable(
+                    old_blocks[old_start:old_end],
+                    old_widgets[old_start:old_end],
+                    blocks[new_start:new_end],
+                ):
+                    # Only a block widget can be re-bound; should anything
+                    # else turn up, the new block gets a widget built for it
+                    # instead, along with the rest of the new blocks.
+                    recycled = old_widgets[old_start + old]
+                    if isinstance(recycled[0], MarkdownBlock):
+                        widgets[new_start + new] = recycled
+                        recycling.append((recycled[0], blocks[new_start + new]))
+
+        # Work out which of the existing widgets are going away.
+        staying = {widget for block_widgets in widgets for widget in block_widgets}
+        removing = [
+            widget
+            for block_widgets in old_widgets
+            for widget in block_widgets
+            if widget not in staying
+        ]
+        anchor = self._scroll_anchor(
+            set(removing).union(widget for widget, _ in recycling)
+        )
+        self._blocks, self._widgets = blocks, widgets
+        self._pending_jump = None
+        self._publish_contents()
+
+        # Now work out where each run of new and changed blocks needs to be
+        # mounted; that's before the next widget that is staying.
+        runs: list[tuple[int, int, Widget | None]] = []
+        for change, old_start, old_end, new_start, new_end in changes:
+            if change == "equal":
+                # The blocks are the same, but they may have moved in the
+                # source.
+                for block_widgets, block in zip(
+                    old_widgets[old_start:old_end], blocks[new_start:new_end]
+                ):
+                    for widget in block_widgets:
+                        if isinstance(widget, MarkdownBlock):
+                            widget.source_range = block.lines
+                continue
+            start = new_start
+            while start < new_end:
+                if widgets[start]:
+                    start += 1
+                    continue
+                end = start
+                while end < new_end and not widgets[end]:
+                    end += 1
+                runs.append(
+                    (
+                        start,
+                        end,
+                        next(
+                            (
+                                widget
+                                for block_widgets in widgets[end:]
+                                for widget in block_widgets
+                            ),
+                            None,
+                        ),
+                    )
+                )
+                start = end
+
+        # Finally, make the changes. The widgets are built a batch at a
+        # time, as they're mounted, so the event loop gets to run in
+        # between. The first batch is only as much as will fill the view,
+        # and it happens in one go with the removals and the re-binding, so
+        # there's no flash of an empty document.
+        batches = self._mount_batches(runs)
+        with self.app.batch_update():
+            for widget, block in recycling:
+                self._rebind(widget, block)
+            timings.recycled = len(recycling)
+            if removing:
+                await self.remove_children(removing)
+            if (batch := next(batches, None)) is not None:
+                await self._mount_batch(batch, timings)
+        self.call_after_refresh(timings.painted)
+        self._resolve_jump()
+        for batch in batches:
+            await self._mount_batch(batch, timings)
+            self._resolve_jump()
+        self.call_after_refresh(timings.completed)
+        if anchor is not None:
+            self.call_after_refresh(self._restore_anchor, *anchor)
+
+    def _mount_batches(
+        self, runs: list[tuple[int, int, Widget | None]]
+    ) -> Iterator[list[tuple[list[Widget], Widget | None]]]:
+        """Build the widgets for runs of blocks, a batch at a time.
+
+        Args:
+            runs: The start and end of each run of blocks, along with what
+                to mount the widgets for the run before.
+
+        Yields:
+            Batches of widgets to mount; each batch is made up of groups of
+            widgets, each with what to mount them before.
+
+        Note:
+            The first batch is only as large as is needed to fill the view;
+            after that batches are up to `_MOUNT_BATCH_SIZE` widgets in size.
+            A batch can take in more than one run, so runs of just a few
+            blocks, dotted about between recycled widgets, don't each need
+            mounting on their own.
+        """
+        first = True
+        fill = (
+            self.parent.scrollable_content_region.height
+            if isinstance(self.parent, Widget)
+            else 0
+        ) or self.app.size.height
+        batch: list[tuple[list[Widget], Widget | None]] = []
+        size = 0
+        for start, end, before in runs:
+            group: list[Widget] = []
+            batch.append((group, before))
+            for index in range(start, end):
+                self._widgets[index] = self._block_widgets(self._blocks[index])
+                group.extend(self._widgets[index])
+                size += len(self._widgets[index])
+                fill -= estimated_height(self._blocks[index])
+                if size >= self._MOUNT_BATCH_SIZE or (first and fill <= 0):
+                    yield batch
+                    group, first, size = [], False, 0
+                    batch = [(group, before)]
+        if size:
+            yield batch
+
+    async def _mount_batch(
+        self, batch: list[tuple[list[Widget], Widget | None]], timings: RenderTimings
+    ) -> None:
+        """Mount a batch of widgets.
+
+        Args:
+            batch: The groups of widgets in the batch, each with what to
+                mount them before.
+            timings: The timings for the update.
+        """
+        await gather(
+            *(self.mount_all(group, before=before) for group, before in batch if group)
+        )
+        timings.built += sum(len(group) for group, _ in batch)
+
+    def _scroll_anchor(self, removing: set[Widget]) -> tuple[Widget, int] | None:
+        """Find a widget to keep in place while the document changes.
+
+        Args:
+            removing: The widgets that are being removed.
+
+        Returns:
+            The first widget that is staying and is in view, along with its
+            offset from the top of the view; or `None` if there's no need
+            to keep anything in place.
+        """
+        if not (
+            self.display and isinstance(self.parent, Widget) and self.parent.scroll_y
+        ):
+            return None
+        top = self.parent.region.y
+        for widgets in self._widgets:
+            for widget in widgets:
+                if widget not in removing and (region := widget.region).y >= top:
+                    return widget, region.y - top
+        return None
+
+    def _restore_anchor(self, widget: Widget, offset: int) -> None:
+        """Put a widget back where it was in the view.
+
+        Args:
+            widget: The widget to put back in place.
+            offset: The offset it should have from the top of the view.
+        """
+        if widget.is_mounted and isinstance(self.parent, Widget):
+            self.parent.scroll_to(
+                y=self.parent.scroll_y
+                + (widget.region.y - self.parent.region.y - offset),
+                animate=False,
+            )
+
+    async def _show_virtually(
+        self, blocks: list[Block], timings: RenderTimings
+    ) -> None:
+        """Show the blocks of the document in virtual mode.
+
+        Args:
+            blocks: The blocks of the document.
+            timings: The timings for the update.
+        """
+        async with self.lock:
+            # Sections of an outline that were expanded stay expanded, so
+            # long as their headings are still there.
+            expanded = {self._blocks[heading].fingerprint for heading in self._expanded}
+            pages = [
+                DocumentPage(first, blocks[first : first + self._PAGE_SIZE])
+                for first in range(0, len(blocks), self._PAGE_SIZE)
+            ]
+            with self.app.batch_update():
+                await self._clear()
+                self._blocks = blocks
+                self._headings = [
+                    index
+                    for index, block in enumerate(blocks)
+                    if block.kind == "heading"
+                ]
+                self._expanded = {
+                    heading
+                    for heading in self._headings
+                    if blocks[heading].fingerprint in expanded
+                }
+                self._pages = pages
+                if self.outline:
+                    for page in pages:
+                        page.styles.height = page.estimate = self._estimate(page)
+                await self.mount_all(pages)
+        self._publish_contents()
+        self.call_after_refresh(self._refresh_window)
+        # Only what's in view is ever built, so once that's on display the
+        # update is as complete as it gets.
+        self.call_after_refresh(timings.completed)
+
+    def _materialise(self, page: DocumentPage) -> AwaitMount | None:
+        """Mount the widgets for the blocks on a page.
+
+        Args:
+            page: The page to materialise.
+
+        Returns:
+            An awaitable that completes when the widgets are mounted, or
+            `None` if the page was already materialised.
+        """
+        if page.materialised:
+            return None
+        widgets: list[Widget] = []
+        for index, block in enumerate(page.blocks, start=page.first):
+            if not self._shown(index):
+                continue
+            for widget in self._block_widgets(block):
+                page.widgets.setdefault(index, widget)
+                widgets.append(widget)
+        page.materialised = True
+        page.styles.height = None
+        return page.mount_all(widgets)
+
+    def _dematerialise(self, page: DocumentPage) -> AwaitRemove | None:
+        """Remove the widgets for the blocks on a page.
+
+        Args:
+            page: The page to dematerialise.
+
+        Returns:
+            An awaitable that completes when the widgets are removed, or
+            `None` if the page wasn't materialised.
+
+        Note:
+            The page keeps the height it had while materialised, so the
+            layout of the document doesn't change.
+        """
+        if page.materialised:
+            page.styles.height = page.height
+            page.materialised = False
+            page.widgets.clear()
+            return page.remove_children()
+        return None
+
+    def _refresh_window(self) -> None:
+        """Refresh which pages are materialised, based on the viewport."""
+        if not (self._pages and self.display and isinstance(self.parent, Widget)):
+            return
+        top = self.parent.scroll_y
+        height = self.parent.scrollable_content_region.height or self.app.size.height
+        # Pages within a screen of the viewport are materialised; pages more
+        # than a few screens away are dematerialised. Anything in between is
+        # left as it is, to save churning pages when scrolling up and down.
+        near_top, near_bottom = top - height, top + (height * 2)
+        far_top, far_bottom = top - (height * 3), top + (height * 4)
+        position = 0
+        materialised = False
+        for page in self._pages:
+            bottom = position + page.height
+            if bottom >= near_top and position <= near_bottom:
+                materialised = self._materialise(page) is not None or materialised
+            elif bottom < far_top or position > far_bottom:
+                self._dematerialise(page)
+            position = bottom
+        # Now that real heights replace estimates, the window may be
+        # different, so check again once things have settled.
+        if materialised:
+            self.call_after_refresh(self._refresh_window)
+
+    def _section_of(self, index: int) -> int | None:
+        """Get the section that a block is in.
+
+        Args:
+            index: The index of the block.
+
+        Returns:
+            The index of the heading of the section the block is in, or
+            `None` if it comes before the first heading.
+        """
+        if position := bisect_right(self._headings, index):
+            return self._headings[position - 1]
+        return None
+
+    def _section_range(self, heading: int) -> range:
+        """Get the range of blocks that make up the body of a section.
+
+        Args:
+            heading: The index of the heading of the section.
+
+        Returns:
+            The range of the indices of the blocks in the section's body.
+        """
+        position = bisect_right(self._headings, heading)
+        return range(
+            heading + 1,
+            self._headings[position]
+            if position < len(self._headings)
+            else len(self._blocks),
+        )
+
+    def _shown(self, index: int) -> bool:
+        """Should a block of the document be on show?
+
+        Args:
+            index: The index of the block.
+
+        Returns:
+            `True` if the block should be on show, `False` if not.
+        """
+        return (
+            not self.outline
+            or (section := self._section_of(index)) is None
+            or section == index
+            or section in self._expanded
+        )
+
+    async def _watch_outline(self) -> None:
+        """Show or stop showing the document as an outline."""
+        # The blocks of the document are already known, so there's no need
+        # to parse it again; they just need showing in the new way. If the
+        # document is already shown a page at a time, and will carry on
+        # being so, the pages can stay as they are.
+        self.timings = timings = RenderTimings()
+        if self._pages and self._shows_virtually(self.source):
+            await self._reshow_pages(timings)
+        else:
+            await self._show_blocks(self.source, self._blocks, timings)
+
+    async def _reshow_pages(self, timings: RenderTimings) -> None:
+        """Show the pages of a virtual document again, once what's on show changes.
+
+        Args:
+            timings: The timings for the update.
+
+        Note:
+            Only the pages that are materialised need their widgets building
+            again; every other page just needs its estimated height
+            changing.
+        """
+        async with self.lock:
+            self._expanded = set()
+            with self.app.batch_update():
+                removing: list[AwaitRemove] = []
+                for page in self._pages:
+                    if (removal := self._dematerialise(page)) is not None:
+                        removing.append(removal)
+                    page.styles.height = page.estimate = self._estimate(page)
+                await gather(*removing)
+        self.call_after_refresh(self._refresh_window)
+        self.call_after_refresh(timings.completed)
+
+    def expand_section(self, heading: int) -> AwaitComplete:
+        """Expand a section of the document's outline.
+
+        Args:
+            heading: The index of the block that is the section's heading.
+
+        Returns:
+            An optionally awaitable object that completes once the body of
+            the section is on show.
+        """
+        return AwaitComplete(self._set_expanded(heading, True))
+
+    def collapse_section(self, heading: int) -> AwaitComplete:
+        """Collapse a section of the document's outline.
+
+        Args:
+            heading: The index of the block that is the section's heading.
+
+        Returns:
+            An optionally awaitable object that completes once the body of
+            the section is hidden.
+        """
+        return AwaitComplete(self._set_expanded(heading, False))
+
+    async def _set_expanded(self, heading: int, expanded: bool) -> None:
+        """Set if a section of the document's outline is expanded.
+
+        Args:
+            heading: The index of the block that is the section's heading,
+                or of any block in the section.
+            expanded: Should the section be expanded?
+        """
+        async with self.lock:
+            if (
+                not self.outline
+                or (section := self._section_of(heading)) is None
+                or (section in self._expanded) == expanded
+            ):
+                return
+            if expanded:
+                self._expanded.add(section)
+            else:
+                self._expanded.discard(section)
+            # Rebuild the pages that the section is on.
+            body = self._section_range(section)
+            with self.app.batch_update():
+                for page in self._pages[
+                    section // self._PAGE_SIZE : (body.stop - 1) // self._PAGE_SIZE + 1
+                ]:
+                    page.estimate = self._estimate(page)
+                    if (removing := self._dematerialise(page)) is not None:
+                        await removing
+                        if (mounting := self._materialise(page)) is not None:
+                            await mounting
+                    else:
+                        page.styles.height = page.estimate
+
+    def _estimate(self, page: DocumentPage) -> int:
+        """Estimate the height of the blocks on a page that are on show.
+
+        Args:
+            page: The page to estimate the height of.
+
+        Returns:
+            The estimated height of the page.
+        """
+        return sum(
+            estimated_height(block)
+            for index, block in enumerate(page.blocks, start=page.first)
+            if self._shown(index)
+        )
+
+    def on_click(self, event: Click) -> None:
+        """Expand or collapse a section of an outline when its heading is clicked.
+
+        Args:
+            event: The click event.
+        """
+        if not (self.outline and self._pages):
+            return
+        # Find the block on a page that was clicked.
+        clicked = event.widget
+        while clicked is not None and not isinstance(clicked.parent, DocumentPage):
+            clicked = clicked.parent if isinstance(clicked.parent, Widget) else None
+        if clicked is None or not isinstance(page := clicked.parent, DocumentPage):
+            return
+        for index, widget in page.widgets.items():
+            if widget is clicked and self._section_of(index) == index:
+                if index in self._expanded:
+                    self.collapse_section(index)
+                else:
+                    self.expand_section(index)
+                return
+
+    @property
+    def table_of_contents(self) -> TableOfContentsType:
+        """The document's table of contents.
+
+        Each entry refers to the block of its heading as `block-{index}`,
+        where `index` is the index of the block in the document.
+        """
+        if self._contents is None:
+            self._contents = [
+                (level, heading, f"block-{index}")
+                for index, block in enumerate(self._blocks)
+                if (level := block.heading_level) is not None
+                and (heading := block.heading) is not None
+            ]
+        return self._contents
+
+    @property
+    def anchors(self) -> AnchorIndex:
+        """The index of the anchors of the document's headings.
+
+        The index is built the first time it's needed after the document
+        has been parsed, and is then kept until the document changes.
+        """
+        if self._anchors is None:
+            self._anchors = AnchorIndex(
+                (index, heading)
+                for index, block in enumerate(self._blocks)
+                if (heading := block.heading) is not None
+            )
+        return self._anchors
+
+    def _block_index(self, block_id: str) -> int | None:
+        """Get the index of a block in the document from its ID.
+
+        Args:
+            block_id: The ID of the block.
+
+        Returns:
+            The index of the block, or `None` if it isn't the ID of a block.
+        """
+        if block_id.startswith("block-"):
+            try:
+                if (
+                    0
+                    <= (index := int(block_id.removeprefix("block-")))
+                    < len(self._blocks)
+                ):
+                    return index
+            except ValueError:
+                pass
+        return None
+
+    def jump_to_block(self, block_id: str) -> None:
+        """Jump to a block in the document.
+
+        Args:
+            block_id: The ID of the block to jump to.
+
+        Note:
+            If the widgets for the block haven't been mounted yet, the jump
+            happens once they are.
+        """
+        self._pending_jump = None
+        if (index := self._block_index(block_id)) is None:
+            self.query_one(f"#{block_id}").scroll_visible(top=True)
+        elif self.outline:
+            # In outline mode, jumping to a section opens it up first.
+            self.run_worker(self._expand_and_jump(index), group="jump", exclusive=True)
+        elif self._pages:
+            self._materialise(self._pages[index // self._PAGE_SIZE])
+            self.call_after_refresh(self._scroll_to_block, index, 3)
+        else:
+            self._pending_jump = index
+            self._resolve_jump()
+
+    async def _expand_and_jump(self, index: int) -> None:
+        """Expand the section of an outline that a block is in, then jump to it.
+
+        Args:
+            index: The index of the block to jump to.
+        """
+        await self._set_expanded(index, True)
+        if not (self._pages and index < len(self._blocks)):
+            return
+        if (
+            mounting := self._materialise(self._pages[index // self._PAGE_SIZE])
+        ) is not None:
+            await mounting
+        self.call_after_refresh(self._scroll_to_block, index, 3)
+
+    def _resolve_jump(self) -> None:
+        """Make the pending jump, if the block it's waiting on is mounted."""
+        if (index := self._pending_jump) is None or self._pages:
+            return
+        if index >= len(self._widgets):
+            self._pending_jump = None
+        elif (widgets := self._widgets[index]) and widgets[0].is_mounted:
+            self._pending_jump = None
+            self.call_after_refresh(widgets[0].scroll_visible, top=True, animate=False)
+
+    def _scroll_to_block(self, index: int, attempts: int) -> None:
+        """Scroll a block in a virtual document into view.
+
+        Args:
+            index: The index of the block.
+            attempts: The number of attempts left to get the block in view.
+
+        Note:
+            As the block comes into view the blocks around it get
+            materialised too, which can move it; so a few attempts are made
+            to get it in place, giving the layout time to settle in between.
+        """
+        if index >= len(self._blocks):
+            return
+        page = self._pages[index // self._PAGE_SIZE]
+        if (widget := page.widgets.get(index)) is None:
+            return
+        if widget.is_mounted:
+            widget.scroll_visible(top=True, animate=False)
+            attempts -= 1
+        if attempts > 0:
+            self.call_after_refresh(self._scroll_to_block, index, attempts)
+
+    def goto_anchor(self, anchor: str) -> bool:
+        """Try and find the given anchor in the document, and jump to it.
+
+        Args:
+            anchor: The anchor to try and find.
+
+        Returns:
+            `True` if the anchor was found, `False` if not.
+
+        Note:
+            Anchors are those that GitHub would give the headings of the
+            document; see `AnchorIndex`.
+        """
+        if (index := self.anchors.get(anchor)) is None:
+            return False
+        self.jump_to_block(f"block-{index}")
+        return True
+
+
+### document.py ends here
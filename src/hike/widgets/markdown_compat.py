@@ -0,0 +1,134 @@
+"""Provides access to the parts of Textual's Markdown widget that aren't public.
+
+The document widget builds on Textual's `Markdown` widget, and needs a few
+of its workings that aren't part of Textual's public API. They're all
+reached through here, so that when Textual changes them there's only one
+place that needs to change with it.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import Iterable
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it.token import Token
+
+##############################################################################
+# Textual imports.
+from textual.content import Content
+from textual.widgets import Markdown
+from textual.widgets._markdown import MarkdownTable, MarkdownTableContent
+from textual.widgets.markdown import MarkdownBlock, MarkdownFence
+
+
+##############################################################################
+def parse_blocks(
+    document: Markdown, tokens: Iterable[Token]
+) -> Iterable[MarkdownBlock]:
+    """Build the block widgets for some Markdown tokens.
+
+    Args:
+        document: The document the blocks are for.
+        tokens: The tokens to build the blocks from.
+
+    Returns:
+        The block widgets.
+    """
+    return document._parse_markdown(tokens)
+
+
+##############################################################################
+def set_source(document: Markdown, source: str) -> None:
+    """Set the Markdown source of a document.
+
+    Args:
+        document: The document to set the source of.
+        source: The Markdown source of the document.
+    """
+    document._markdown = source
+    lines = source.splitlines()
+    document._last_parsed_line = len(lines) - (1 if lines and lines[-1] else 0)
+
+
+##############################################################################
+def document_of(block: MarkdownBlock) -> Markdown:
+    """Get the document that a block belongs to.
+
+    Args:
+        block: The block.
+
+    Returns:
+        The document the block belongs to.
+    """
+    return block._markdown
+
+
+##############################################################################
+def set_token(block: MarkdownBlock, token: Token) -> None:
+    """Set the token that a block is built from.
+
+    Args:
+        block: The block.
+        token: The token the block is built from.
+    """
+    block._token = token
+
+
+##############################################################################
+def inline_content(block: MarkdownBlock, token: Token) -> Content:
+    """Get the content of an inline token, as a block would show it.
+
+    Args:
+        block: The block the content is for.
+        token: The inline token.
+
+    Returns:
+        The content of the token.
+    """
+    return block._token_to_content(token)
+
+
+##############################################################################
+def table_cells(table: MarkdownTable) -> tuple[list[Content], list[list[Content]]]:
+    """Get the headers and rows of a table.
+
+    Args:
+        table: The table.
+
+    Returns:
+        The headers of the table, and its rows.
+    """
+    return table._get_headers_and_rows()
+
+
+##############################################################################
+def set_highlighted_code(fence: MarkdownFence, code: Content) -> None:
+    """Set the highlighted code that a fence shows.
+
+    Args:
+        fence: The fence.
+        code: The highlighted code.
+    """
+    fence._highlighted_code = code
+
+
+##############################################################################
+# Exports.
+__all__ = [
+    "MarkdownTable",
+    "MarkdownTableContent",
+    "document_of",
+    "inline_content",
+    "parse_blocks",
+    "set_highlighted_code",
+    "set_source",
+    "set_token",
+    "table_cells",
+]
+
+### markdown_compat.py ends here
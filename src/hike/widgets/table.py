@@ -0,0 +1,245 @@
+"""Provides a widget for showing large Markdown tables."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import Final
+
+##############################################################################
+# Rich imports.
+from rich.segment import Segment
+
+##############################################################################
+# Textual imports.
+from textual.cache import LRUCache
+from textual.content import Content
+from textual.geometry import Size
+from textual.strip import Strip
+from textual.widget import Widget
+from textual.widgets import Markdown
+
+
+##############################################################################
+class VirtualTable(Widget):
+    """Shows a Markdown table, only rendering the rows that are in view.
+
+    Textual's own Markdown table makes a widget of every cell, which is
+    fine for small tables but very costly for large ones. This widget
+    instead renders each line of the table as it's needed. The widths of
+    the columns are worked out once from the cells, and cached for each
+    width of table; cells are clipped to fit their column as they are
+    rendered.
+    """
+
+    DEFAULT_CSS = """
+    VirtualTable {
+        width: 1fr;
+        height: auto;
+        & > .virtual-table--header {
+            color: $primary;
+            text-style: bold;
+        }
+        & > .virtual-table--lines {
+            color: $foreground 20%;
+        }
+    }
+    """
+
+    COMPONENT_CLASSES = {"virtual-table--header", "virtual-table--lines"}
+
+    _MAX_COLUMN_WIDTH: Final[int] = 60
+    """The widest a column will naturally be."""
+
+    _MIN_COLUMN_WIDTH: Final[int] = 3
+    """The narrowest a column will be squeezed to."""
+
+    _CACHED_LINES: Final[int] = 1024
+    """The number of rendered lines to keep around."""
+
+    def __init__(self, headers: list[Content], rows: list[list[Content]]) -> None:
+        """Initialise the table.
+
+        Args:
+            headers: The headers of the table.
+            rows: The rows of the table.
+        """
+        super().__init__()
+        self.headers = headers
+        """The headers of the table."""
+        self.rows = rows
+        """The rows of the table."""
+        self._natural_widths: list[int] | None = None
+        """The natural widths of the columns, once they're known."""
+        self._widths: dict[int, list[int]] = {}
+        """The widths of the columns for each width of the table."""
+        self._lines: LRUCache[tuple[int, int], Strip] = LRUCache(self._CACHED_LINES)
+        """Lines of the table that have been rendered."""
+
+    @property
+    def column_count(self) -> int:
+        """The number of columns in the table."""
+        return max(len(self.headers), *(len(row) for row in self.rows), 0)
+
+    @property
+    def natural_widths(self) -> list[int]:
+        """The natural widths of the columns.
+
+        This is the width of the widest cell in each column, up to a limit.
+        """
+        if self._natural_widths is None:
+            widths = [0] * self.column_count
+            for row in (self.headers, *self.rows):
+                for column, cell in enumerate(row):
+                    widths[column] = max(widths[column], cell.cell_length)
+            self._natural_widths = [
+                max(min(width, self._MAX_COLUMN_WIDTH), 1) for width in widths
+            ]
+        return self._natural_widths
+
+    def _frame_width(self) -> int:
+        """The width taken by the padding and lines between the columns."""
+        return max((self.column_count * 3) - 1, 0)
+
+    def column_widths(self, width: int) -> list[int]:
+        """Get the widths of the columns for a given width of table.
+
+        Args:
+            width: The width of the table.
+
+        Returns:
+            The width of each of the columns.
+
+        Note:
+            If the columns don't fit at their natural widths, the widest
+            columns are narrowed until they do.
+        """
+        if (widths := self._widths.get(width)) is not None:
+            return widths
+        natural = self.natural_widths
+        available = width - self._frame_width()
+        if sum(natural) <= available:
+            widths = natural
+        else:
+            # Find the widest that any column can be for them all to fit.
+            limit = max(natural, default=0)
+            while limit > self._MIN_COLUMN_WIDTH and (
+                sum(min(column, limit) for column in natural) > available
+            ):
+                limit -= 1
+            widths = [min(column, limit) for column in natural]
+        self._widths[width] = widths
+        return widths
+
+    def get_content_width(self, container: Size, viewport: Size) -> int:
+        """Get the width of the table's content.
+
+        Args:
+            container: The size of the container.
+            viewport: The size of the viewport.
+
+        Returns:
+            The width of the content.
+        """
+        return sum(self.natural_widths) + self._frame_width()
+
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        """Get the height of the table's content.
+
+        Args:
+            container: The size of the container.
+            viewport: The size of the viewport.
+            width: The width of the content.
+
+        Returns:
+            The height of the content.
+        """
+        return len(self.rows) + 2
+
+    def notify_style_update(self) -> None:
+        """Handle the styles of the table changing."""
+        super().notify_style_update()
+        self._lines.clear()
+
+    def _render_row(self, row: list[Content], widths: list[int], header: bool) -> Strip:
+        """Render a row of the table.
+
+        Args:
+            row: The cells of the row.
+            widths: The widths of the columns.
+            header: Is this the header row?
+
+        Returns:
+            The rendered row.
+        """
+        base = self.get_visual_style(*(["virtual-table--header"] if header else []))
+        line = self.get_component_rich_style("virtual-table--lines")
+        segments: list[Segment] = []
+        for column, width in enumerate(widths):
+            if column:
+                segments.append(Segment("│", line))
+            cell = row[column] if column < len(row) else Content("")
+            # The styles in the cells can refer to the component classes of
+            # the document's blocks, so they need resolving in context.
+            segments.extend(
+                Segment(text, style.rich_style)
+                for text, style in Content.assemble(
+                    " ", cell.truncate(width, ellipsis=True, pad=True), " "
+                ).render(base, "", self._get_style)
+            )
+        return Strip(segments)
+
+    def _render_rule(self, widths: list[int]) -> Strip:
+        """Render the rule between the header and the body of the table.
+
+        Args:
+            widths: The widths of the columns.
+
+        Returns:
+            The rendered rule.
+        """
+        return Strip(
+            [
+                Segment(
+                    "┼".join("─" * (width + 2) for width in widths),
+                    self.get_component_rich_style("virtual-table--lines"),
+                )
+            ]
+        )
+
+    def render_line(self, y: int) -> Strip:
+        """Render a line of the table.
+
+        Args:
+            y: The line to render.
+
+        Returns:
+            The rendered line.
+        """
+        width = self.size.width
+        if (strip := self._lines.get((y, width))) is None:
+            widths = self.column_widths(width)
+            if y == 0:
+                strip = self._render_row(self.headers, widths, True)
+            elif y == 1:
+                strip = self._render_rule(widths)
+            elif y - 2 < len(self.rows):
+                strip = self._render_row(self.rows[y - 2], widths, False)
+            else:
+                strip = Strip.blank(width)
+            strip = strip.crop_extend(0, width, self.rich_style)
+            self._lines[(y, width)] = strip
+        return strip
+
+    async def action_link(self, href: str) -> None:
+        """Pass a link in a cell on to the document.
+
+        Args:
+            href: The link that was clicked.
+        """
+        self.post_message(Markdown.LinkClicked(self.query_ancestor(Markdown), href))
+
+
+### table.py ends here
@@ -6,20 +6,18 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
+from asyncio import CancelledError, Semaphore, to_thread
 from dataclasses import dataclass
-from functools import singledispatchmethod
+from functools import partial, singledispatchmethod
 from os import getenv
 from pathlib import Path
 from subprocess import run
+from threading import Event
+from typing import Callable, Final
 
 ##############################################################################
 # httpx imports.
-from httpx import URL, AsyncClient, HTTPStatusError, RequestError
-
-##############################################################################
-# MarkdownIt imports.
-from markdown_it import MarkdownIt
-from mdit_py_plugins import front_matter
+from httpx import URL, HTTPStatusError, RequestError, codes
 
 ##############################################################################
 # Textual imports.
@@ -30,6 +28,7 @@ from textual.events import Click
 from textual.message import Message
 from textual.reactive import var
 from textual.widgets import Label, Markdown, Rule
+from textual.worker import get_current_worker
 
 ##############################################################################
 # Typing extensions imports.
@@ -37,13 +36,177 @@ from typing_extensions import Self
 
 ##############################################################################
 # Local imports.
-from .. import USER_AGENT
 from ..commands import JumpToCommandLine
-from ..data import is_editable, load_configuration, looks_urllike
+from ..data import (
+    forget_forge_url,
+    is_editable,
+    load_configuration,
+    looks_urllike,
+    maybe_markdown,
+)
+from ..data.locations import data_dir
 from ..editor import Editor
 from ..messages import CopyToClipboard, OpenLocation
-from ..support import is_copy_request_click, view_in_browser
+from ..network import Download, canonical_url, download_markdown, http_cache
+from ..support import (
+    Coalescer,
+    FileWatcher,
+    HighlightCache,
+    LRUCache,
+    ParseCache,
+    ParsePool,
+    ProgressiveMarkdown,
+    SourceStore,
+    is_copy_request_click,
+    links_in,
+    markdown_parser,
+    read_progressively,
+    view_in_browser,
+    watch_file,
+)
 from ..types import HikeHistory, HikeLocation
+from .document import Document, RenderTimings
+
+
+##############################################################################
+def _parse_cache() -> ParseCache:
+    """Make the cache of parsed documents for a viewer.
+
+    Returns:
+        The cache of parsed documents.
+    """
+    configuration = load_configuration()
+    return ParseCache(
+        configuration.parse_cache_entries,
+        configuration.parse_cache_size,
+        data_dir() / "cache" / "parsed" if configuration.parse_cache_on_disk else None,
+        configuration.parse_cache_disk_threshold,
+        configuration.parse_cache_disk_size,
+    )
+
+
+##############################################################################
+def _parse_pool() -> ParsePool:
+    """Make the pool that a viewer parses documents with.
+
+    Returns:
+        The pool for parsing documents.
+    """
+    configuration = load_configuration()
+    return ParsePool(
+        configuration.parse_process_threshold, configuration.parse_processes
+    )
+
+
+##############################################################################
+def _highlight_cache() -> HighlightCache:
+    """Make the cache of highlighted code for a viewer.
+
+    Returns:
+        The cache of highlighted code.
+    """
+    return HighlightCache(load_configuration().highlight_cache_entries)
+
+
+##############################################################################
+def _source_store() -> SourceStore[HikeLocation]:
+    """Make the store of document sources for a viewer.
+
+    Returns:
+        The store of document sources.
+    """
+    configuration = load_configuration()
+    return SourceStore(
+        configuration.source_store_size,
+        configuration.source_compression
+        if configuration.source_compression in SourceStore.COMPRESSIONS
+        else "zlib",
+    )
+
+
+##############################################################################
+@dataclass
+class _RenderedDocument:
+    """A rendered document that is being kept around for a return visit."""
+
+    document: Document
+    """The widget that the document is rendered in."""
+
+    size: int
+    """The size of the source of the document."""
+
+    stamp: tuple[int, int] | None
+    """The stamp of the file the document came from, if it's local."""
+
+    scroll_y: float = 0.0
+    """The scroll position of the document when it was last viewed."""
+
+
+##############################################################################
+class _RenderedDocuments(LRUCache[HikeLocation, _RenderedDocument]):
+    """The rendered documents being kept around for return visits.
+
+    The widget of a document that stops being kept can itself be kept, as a
+    spare, so long as it isn't too large; a new document can then be shown
+    in the spare, re-binding its block widgets to the new document's blocks
+    rather than building them all afresh.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the collection of rendered documents."""
+        configuration = load_configuration()
+        super().__init__(
+            configuration.rendered_documents,
+            configuration.rendered_documents_size,
+            lambda rendered: rendered.size,
+        )
+        self._recycle_limit = configuration.recycled_block_widgets
+        """The maximum number of block widgets that a spare can have."""
+        self._spare: Document | None = None
+        """A widget that is no longer in use, kept for showing a new document."""
+
+    def discarded(self, key: HikeLocation, value: _RenderedDocument) -> None:
+        """Retire the widget of a document that is no longer being kept.
+
+        Args:
+            key: The location of the document.
+            value: The rendered document.
+        """
+        # If the document is on display it'll get reused for whatever is
+        # shown next, so it's only retired if it's out of sight.
+        if not value.document.display:
+            self.retire(value.document)
+
+    def retire(self, document: Document) -> None:
+        """Retire the widget of a document that is no longer in use.
+
+        Args:
+            document: The widget to retire.
+
+        Note:
+            The widget becomes the spare if it's small enough, replacing any
+            spare there was; otherwise it's removed.
+        """
+        if document is self._spare:
+            return
+        if (
+            not document.is_virtual
+            and 0 < len(document.children) <= self._recycle_limit
+        ):
+            if self._spare is not None:
+                self._spare.remove()
+            self._spare = document
+        else:
+            document.remove()
+
+    def take_spare(self) -> Document | None:
+        """Take the spare widget, if there is one.
+
+        Returns:
+            The spare widget, or `None` if there isn't one.
+        """
+        spare, self._spare = self._spare, None
+        return spare
 
 
 ##############################################################################
@@ -138,20 +301,257 @@ class Viewer(Vertical, can_focus=False):
     history: var[HikeHistory] = var(HikeHistory)
     """The history for the viewer."""
 
-    _source: var[str] = var("")
-    """The source of the Markdown we're viewing."""
+    outline: var[bool] = var(False)
+    """Should documents be shown as an outline?"""
+
+    _sources: var[SourceStore[HikeLocation]] = var(_source_store)
+    """The sources of the documents being viewed and recently viewed."""
+
+    _generation: var[int] = var(0)
+    """The generation of the most recent request to load a location."""
+
+    _prefetched: var[LRUCache[Path, tuple[tuple[int, int], str]]] = var(
+        lambda: LRUCache(load_configuration().prefetch_cache_size)
+    )
+    """Local documents that have been prefetched, with their modification stamp."""
+
+    _file_requests: var[Coalescer[Path, str]] = var(Coalescer)
+    """Coalesces concurrent requests to read the same local file."""
+
+    _url_requests: var[Coalescer[tuple[str, frozenset[tuple[str, str]]], Download]] = (
+        var(Coalescer)
+    )
+    """Coalesces concurrent requests to download the same URL with the same headers."""
+
+    _parsed: var[ParseCache] = var(_parse_cache)
+    """The cache of parsed documents."""
+
+    _parsing: var[ParsePool] = var(_parse_pool)
+    """The pool that documents are parsed with."""
+
+    _highlighted: var[HighlightCache] = var(_highlight_cache)
+    """The cache of highlighted code."""
+
+    _rendered: var[_RenderedDocuments] = var(_RenderedDocuments)
+    """Recently-rendered documents, kept around for return visits."""
+
+    _showing: var[HikeLocation | None] = var(None)
+    """The location of the document that is on display."""
+
+    _watcher: var[FileWatcher | None] = var(None)
+    """The watcher for the local document on display, if it's being watched."""
+
+    _pending_anchor: var[tuple[HikeLocation, str] | None] = var(None)
+    """An anchor to jump to once the document at a location is on display."""
+
+    _READ_CHUNK_SIZE: Final[int] = 64 * 1024
+    """The size of the chunks to read local files in."""
 
     def compose(self) -> ComposeResult:
         """Compose the content of the viewer."""
         yield ViewerTitle()
         yield Rule(line_style="heavy")
         with VerticalScroll(id="document"):
-            yield Markdown(
-                open_links=False,
-                parser_factory=lambda: MarkdownIt("gfm-like").use(
-                    front_matter.front_matter_plugin
-                ),
+            yield self._new_document()
+
+    def _new_document(
+        self, markdown: str | None = None, incomplete: bool = False
+    ) -> Document:
+        """Make a new widget for displaying a document.
+
+        Args:
+            markdown: The Markdown to start the widget with.
+            incomplete: Is the Markdown only the first part of the document?
+
+        Returns:
+            The new widget.
+        """
+        configuration = load_configuration()
+        return Document(
+            markdown,
+            open_links=False,
+            parser_factory=partial(markdown_parser, self._parsed),
+            virtual_threshold=configuration.virtual_document_threshold,
+            parse_pool=self._parsing,
+            virtual_table_rows=configuration.virtual_table_rows,
+            virtual_table_cells=configuration.virtual_table_cells,
+            highlight_cache=self._highlighted,
+            outline=self.outline,
+            partial=incomplete,
+        )
+
+    @property
+    def _document(self) -> Document:
+        """The widget of the document that is on display."""
+        return next(
+            document
+            for document in self.query_one("#document").query_children(Document)
+            if document.display
+        )
+
+    def _is_kept(self, location: HikeLocation | None, document: Document) -> bool:
+        """Is the given document being kept around for a return visit?
+
+        Args:
+            location: The location of the document.
+            document: The widget for the document.
+
+        Returns:
+            `True` if the document is being kept, `False` if not.
+        """
+        return (
+            location is not None
+            and location in self._rendered
+            and (kept := self._rendered.get(location)) is not None
+            and kept.document is document
+        )
+
+    def _show(self, document: Document, location: HikeLocation | None) -> None:
+        """Put a document on display.
+
+        Args:
+            document: The widget of the document to show.
+            location: The location of the document.
+        """
+        if document is not (showing := self._document):
+            showing.display = False
+            document.display = True
+            # If what was showing was being kept for a return visit, all
+            # well and good; otherwise it's of no more use.
+            if not self._is_kept(self._showing, showing):
+                self._rendered.retire(showing)
+        # Only the document on display follows the outline mode as it's
+        # toggled, so a kept document may need to catch up now.
+        document.outline = self.outline
+        self._showing = location
+
+    def _remember_position(self) -> None:
+        """Remember the scroll position of the document on display."""
+        if self._showing is not None and self._showing in self._rendered:
+            if (kept := self._rendered.get(self._showing)) is not None:
+                kept.scroll_y = self.query_one("#document").scroll_y
+
+    def _update_document(
+        self, document: Document, markdown: str, incomplete: bool
+    ) -> None:
+        """Give a document widget a new document to show.
+
+        Args:
+            document: The widget to update.
+            markdown: The Markdown of the document.
+            incomplete: Is this only the first part of the document?
+        """
+        # The widget is about to be given a whole new document, so there's
+        # no sense in showing what it has now in the current outline mode;
+        # the new document will be shown in it anyway.
+        document.set_reactive(Document.outline, self.outline)
+        document.update(markdown, partial=incomplete)
+
+    def _display_markdown(
+        self, location: HikeLocation | None, markdown: str, incomplete: bool = False
+    ) -> None:
+        """Render a document.
+
+        Args:
+            location: The location of the document.
+            markdown: The Markdown of the document.
+            incomplete: Is this only the first part of the document?
+
+        Note:
+            Only a complete document is kept around for a return visit.
+        """
+        # Work out which widget to render the document in; if the location
+        # was already rendered it'll be that widget, otherwise the one on
+        # display will do, so long as it isn't being kept for a return
+        # visit, failing that the spare will do; only if there's no spare
+        # do we need a new one.
+        if (
+            location is not None
+            and location in self._rendered
+            and (kept := self._rendered.get(location)) is not None
+        ):
+            self._update_document(document := kept.document, markdown, incomplete)
+        elif not self._is_kept(self._showing, showing := self._document):
+            self._update_document(document := showing, markdown, incomplete)
+        elif (spare := self._rendered.take_spare()) is not None:
+            self._update_document(document := spare, markdown, incomplete)
+        else:
+            self.query_one("#document").mount(
+                document := self._new_document(markdown, incomplete)
+            )
+        self._show(document, location)
+        if location is not None and not incomplete:
+            self._rendered[location] = _RenderedDocument(
+                document, len(markdown), self._version(location)
+            )
+
+    def _activate_source(self, location: HikeLocation | None, markdown: str) -> None:
+        """Make the source of a document the one being viewed.
+
+        Args:
+            location: The location of the document, or `None` if its source
+                isn't to be kept once it's no longer being viewed.
+            markdown: The Markdown of the document.
+        """
+        self._sources.activate(
+            location, markdown, None if location is None else self._version(location)
+        )
+        self._compress_sources()
+
+    @work(thread=True, group="sources")
+    def _compress_sources(self) -> None:
+        """Compress the sources of the documents no longer being viewed."""
+        self._sources.compress()
+
+    def _return_to(self, location: HikeLocation | None) -> bool:
+        """Return to a document that is still rendered or stored, if possible.
+
+        Args:
+            location: The location of the document to return to.
+
+        Returns:
+            `True` if the document was returned to, `False` if not.
+
+        Note:
+            If the document is no longer rendered, but its source is still
+            in the store of sources, it's rendered again from there.
+        """
+        if location is None:
+            return False
+        version = self._version(location)
+        kept = self._rendered.get(location) if location in self._rendered else None
+        # If it's a local file that has changed since it was rendered, it's
+        # no use to us.
+        if kept is not None and kept.stamp != version:
+            self._rendered.pop(location)
+            if location != self._showing:
+                self._rendered.retire(kept.document)
+            kept = None
+        source = self._sources.restore(location, version)
+        self._compress_sources()
+        if kept is None:
+            if source is None:
+                return False
+            self.query_one(ViewerTitle).location = location
+            self._display_markdown(location, source)
+            self._start_watching(location, source)
+            return True
+        if source is None:
+            # The source has been dropped from the store, but the document
+            # still has it.
+            self._activate_source(location, source := kept.document.source)
+        self._show(kept.document, location)
+        self.query_one(ViewerTitle).location = location
+        self._start_watching(location, source)
+        self.call_after_refresh(
+            self.query_one("#document").scroll_to, y=kept.scroll_y, animate=False
+        )
+        kept.document.post_message(
+            Markdown.TableOfContentsUpdated(
+                kept.document, kept.document.table_of_contents
             )
+        )
+        return True
 
     def focus(self, scroll_visible: bool = True) -> Self:
         """Focus the viewer.
@@ -168,7 +568,7 @@ class Viewer(Vertical, can_focus=False):
     @property
     def source(self) -> str:
         """The source of the markdown being viewed."""
-        return self._source
+        return self._sources.active
 
     @property
     def filename(self) -> Path | None:
@@ -201,6 +601,12 @@ class Viewer(Vertical, can_focus=False):
         remember: bool
         """Should this load be remembered?"""
 
+        generation: int
+        """The generation of the load that produced the content."""
+
+        partial: bool = False
+        """Is this only the first part of the content, with more to come?"""
+
     @dataclass
     class HistoryUpdated(Message):
         """Class posted when the history is updated."""
@@ -219,72 +625,362 @@ class Viewer(Vertical, can_focus=False):
     def _history_updated(self) -> None:
         """React to the bindings being updated."""
         self.refresh_bindings()
-        # Given that the content of history has changed, we need to update
-        # the display. If we have history...
+        # Given that the content of history has changed, we might need to
+        # update the display. If we have history...
         if self.history:
-            # ...visit whatever is now current.
-            self._visit_from_history()
+            # ...visit whatever is now current; unless it's what we're
+            # already looking at. The most common cause of this is that a
+            # load has just added the location it loaded to history, and
+            # there's no sense in loading and rendering it all over again.
+            if self.history.current_item != self.location:
+                self._visit_from_history()
         else:
             # ...otherwise there's nothing to display.
             self.location = None
 
+    def _watch_outline(self) -> None:
+        """React to the outline mode changing."""
+        # Only the document on display is changed; any that are being kept
+        # for a return visit are brought up to date when they're shown.
+        for document in self.query("#document > Document").results(Document):
+            if document.display:
+                document.outline = self.outline
+
     def _watch_history(self) -> None:
         """React to the history being updated."""
         self.post_message(self.HistoryUpdated(self))
 
-    @work(thread=True, exclusive=True)
-    def _load_from_file(self, location: Path, remember: bool) -> None:
+    def _is_stale(self, generation: int) -> bool:
+        """Is the given load generation stale?
+
+        Args:
+            generation: The generation of the load to check.
+
+        Returns:
+            `True` if a newer load has been requested since, `False` if not.
+        """
+        return generation != self._generation
+
+    @property
+    def coalesced_requests(self) -> tuple[int, int]:
+        """The hits and misses of the coalescing of requests for locations.
+
+        A hit is a request that joined an identical request already in
+        flight; a miss is a request that had to go and do the work itself.
+        """
+        return (
+            self._file_requests.hits + self._url_requests.hits,
+            self._file_requests.misses + self._url_requests.misses,
+        )
+
+    @property
+    def render_timings(self) -> RenderTimings:
+        """The timings for the most recent render of the document on display.
+
+        This can be used to find out how long it took for the first part of
+        the document to be on display, and for all of it to be.
+        """
+        return self._document.timings
+
+    @property
+    def parse_cache(self) -> ParseCache:
+        """The cache of parsed documents.
+
+        This can be used to find out how well the cache is doing, in terms
+        of its hit rate and the time it has saved.
+        """
+        return self._parsed
+
+    @property
+    def sources(self) -> SourceStore[HikeLocation]:
+        """The store of the sources of documents.
+
+        This can be used to find out how much memory is being taken by the
+        sources of the documents being viewed and recently viewed.
+        """
+        return self._sources
+
+    @classmethod
+    def _read_file(cls, location: Path, stop: Event) -> str:
+        """Read the content of a local file.
+
+        Args:
+            location: The path to read the content from.
+            stop: Event that is set if the read should be abandoned.
+
+        Returns:
+            The content of the file.
+
+        Raises:
+            OSError: If there was a problem reading the file.
+            CancelledError: If the read was abandoned.
+        """
+        # The read happens in a thread, and threads can't be cancelled, so
+        # we read the file in chunks and give up as soon as we notice we're
+        # no longer wanted.
+        chunks: list[str] = []
+        with location.open(encoding="utf-8") as source:
+            while chunk := source.read(cls._READ_CHUNK_SIZE):
+                if stop.is_set():
+                    raise CancelledError()
+                chunks.append(chunk)
+        return "".join(chunks)
+
+    async def _read(self, location: Path) -> str:
+        """Read the content of a local file.
+
+        Args:
+            location: The path to read the content from.
+
+        Returns:
+            The content of the file.
+
+        Raises:
+            OSError: If there was a problem reading the file.
+
+        Note:
+            If the same file is already being read, this waits on that read
+            rather than reading it again.
+        """
+
+        async def read() -> str:
+            stop = Event()
+            try:
+                return await to_thread(self._read_file, location, stop)
+            finally:
+                stop.set()
+
+        return await self._file_requests.request(location.absolute(), read)
+
+    async def _download(
+        self,
+        location: URL,
+        headers: dict[str, str],
+        progress: Callable[[str], None] | None = None,
+    ) -> Download:
+        """Download a URL.
+
+        Args:
+            location: The URL to download.
+            headers: Any extra headers for the request.
+            progress: Function to call with each piece of a large document
+                as it arrives.
+
+        Returns:
+            The result of the download.
+
+        Raises:
+            RequestError: If there was a problem making the request.
+
+        Note:
+            If the same URL is already being downloaded, with the same
+            headers, this waits on that download rather than downloading it
+            again; in which case the progress of the download isn't
+            reported. A conditional request is never shared with one that
+            isn't, as the former can come back with nothing but a
+            not-modified response.
+        """
+        return await self._url_requests.request(
+            (canonical_url(location), frozenset(headers.items())),
+            lambda: download_markdown(
+                location,
+                headers,
+                progress=progress,
+                progress_threshold=load_configuration().progressive_load_threshold,
+            ),
+        )
+
+    def _loading_progressively(
+        self, remember: bool, generation: int
+    ) -> tuple[ProgressiveMarkdown, Callable[[str], None]]:
+        """Get ready to show a document as it's loaded.
+
+        Args:
+            remember: Should the location being loaded go into history?
+            generation: The generation of the load.
+
+        Returns:
+            The document being loaded, and the function to feed each piece
+            of it to as it arrives.
+        """
+        loading = ProgressiveMarkdown(load_configuration().progressive_load_chunk_size)
+
+        def arrived(text: str) -> None:
+            if (markdown := loading.feed(text)) is not None:
+                self.post_message(
+                    self.Loaded(self, markdown, remember, generation, partial=True)
+                )
+
+        return loading, arrived
+
+    def _read_file_progressively(
+        self, location: Path, arrived: Callable[[str], None], stop: Event
+    ) -> None:
+        """Read a local file a chunk at a time.
+
+        Args:
+            location: The path to read the content from.
+            arrived: Function to call with each chunk as it's read.
+            stop: Event that is set if the read should be abandoned.
+
+        Raises:
+            OSError: If there was a problem reading the file.
+            UnicodeDecodeError: If the file isn't valid UTF-8.
+            CancelledError: If the read was abandoned.
+
+        Note:
+            This runs in a thread, from start to finish, so that the file
+            is only ever read, and closed, from the one thread; each chunk
+            is handed back to the application as it's read.
+        """
+        chunks = read_progressively(
+            location, load_configuration().progressive_load_chunk_size
+        )
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    raise CancelledError()
+                self.app.call_from_thread(arrived, chunk)
+        finally:
+            chunks.close()
+
+    async def _read_progressively(
+        self, location: Path, remember: bool, generation: int
+    ) -> str:
+        """Read a local file, showing it as it's read.
+
+        Args:
+            location: The path to read the content from.
+            remember: Should this location go into history?
+            generation: The generation of the load.
+
+        Returns:
+            The content of the file.
+
+        Raises:
+            OSError: If there was a problem reading the file.
+            UnicodeDecodeError: If the file isn't valid UTF-8.
+        """
+        loading, arrived = self._loading_progressively(remember, generation)
+        stop = Event()
+        try:
+            await to_thread(self._read_file_progressively, location, arrived, stop)
+        finally:
+            stop.set()
+        return loading.text
+
+    @work(exclusive=True, group="load")
+    async def _load_from_file(
+        self, location: Path, remember: bool, generation: int
+    ) -> None:
         """Load up markdown content from a file.
 
         Args:
             location: The path to load the content from.
             remember: Should this location go into history?
+            generation: The generation of the load.
         """
         try:
-            self.post_message(
-                self.Loaded(self, Path(location).read_text(encoding="utf-8"), remember)
-            )
-        except OSError as error:
-            self.notify(str(error), title="Load error", severity="error", timeout=8)
+            if location.stat().st_size >= (
+                load_configuration().progressive_load_threshold
+            ):
+                markdown = await self._read_progressively(
+                    location, remember, generation
+                )
+            else:
+                markdown = await self._read(location)
+        except (OSError, UnicodeDecodeError) as error:
+            if not self._is_stale(generation):
+                self.notify(str(error), title="Load error", severity="error", timeout=8)
+            return
+        self.post_message(self.Loaded(self, markdown, remember, generation))
 
-    @work(exclusive=True)
-    async def _load_from_url(self, location: URL, remember: bool) -> None:
+    @work(exclusive=True, group="load")
+    async def _load_from_url(
+        self, location: URL, remember: bool, generation: int
+    ) -> None:
         """Load up markdown content from a URL.
 
         Args:
             location: The URL to load the content from.
             remember: Should this location go into history?
+            generation: The generation of the load.
         """
 
-        # Download the data from the remote location.
+        # If we've seen this location before, show what we have right away;
+        # if what we have is still fresh there's nothing more to do,
+        # otherwise we'll check with the server in the background.
+        cache = http_cache()
+        if (cached := await to_thread(cache.get, location)) is not None:
+            details, shown = cached
+            self.post_message(self.Loaded(self, shown, remember, generation))
+            if details.is_fresh:
+                return
+
+        # Download the data from the remote location; if there's nothing
+        # on display yet, a large document is shown as it arrives.
         try:
-            async with AsyncClient() as client:
-                response = await client.get(
-                    location,
-                    follow_redirects=True,
-                    headers={"user-agent": USER_AGENT},
-                )
+            download = await self._download(
+                location,
+                {} if cached is None else cached[0].conditional_headers,
+                None
+                if cached is not None
+                else self._loading_progressively(remember, generation)[1],
+            )
         except RequestError as error:
-            self.notify(str(error), title="Request error", severity="error", timeout=8)
+            # If we're already showing a cached copy that'll do for now.
+            if cached is None:
+                self.notify(
+                    str(error), title="Request error", severity="error", timeout=8
+                )
+            return
+        response = download.response
+
+        # If the server tells us that what we have is still good, make a
+        # note of that and we're done.
+        if cached is not None and response.status_code == codes.NOT_MODIFIED:
+            await to_thread(cache.revalidated, location, response.headers)
             return
 
         # We got a response, left's check it's a good one.
         try:
             response.raise_for_status()
         except HTTPStatusError as error:
-            self.notify(str(error), title="Response error", severity="error", timeout=8)
+            # Only if the document has gone is the cached copy of it of no
+            # more use; for any other error it's kept, and if it's already
+            # on display that'll do for now.
+            if error.response.status_code in (codes.NOT_FOUND, codes.GONE):
+                await to_thread(cache.forget, location)
+                # If we got here via a remembered forge location, that's
+                # clearly no good any more.
+                await to_thread(forget_forge_url, location)
+            if cached is None:
+                self.notify(
+                    str(error), title="Response error", severity="error", timeout=8
+                )
             return
 
-        # At this point we've got a good response. Now let's be sure that
-        # what we got back is something that admits to being markdown, or at
-        # least a form of plain text we can render.
-        if content_type := response.headers.get("content-type"):
-            if any(
-                content_type.startswith(allowed_type)
-                for allowed_type in load_configuration().markdown_content_types
-            ):
-                self.post_message(self.Loaded(self, response.text, remember))
-                return
+        # At this point we've got a good response. If what came back is
+        # something that admits to being markdown, or at least a form of
+        # plain text we can render, we'll have the body.
+        if download.markdown is not None:
+            await to_thread(cache.store, location, response.headers, download.markdown)
+            # Only update the display if we weren't already showing this
+            # exact content from the cache.
+            if cached is None or download.markdown != cached[1]:
+                self.post_message(
+                    self.Loaded(self, download.markdown, remember, generation)
+                )
+            return
+        await to_thread(cache.forget, location)
+
+        # If it's Markdown, but too big to sensibly show, say so.
+        if download.too_large:
+            self.notify(
+                "That Markdown file is too large to view, opening in your browser..."
+            )
+            view_in_browser(location)
+            return
 
         # It doesn't look like Markdown, so let's open it in the browser.
         self.notify(
@@ -292,29 +988,85 @@ class Viewer(Vertical, can_focus=False):
         )
         view_in_browser(location)
 
+    @classmethod
+    def _version(cls, location: HikeLocation) -> tuple[int, int] | None:
+        """Get the version of the document at a location.
+
+        Args:
+            location: The location of the document.
+
+        Returns:
+            The stamp of the file if the document is local, otherwise `None`.
+        """
+        return cls._file_stamp(location) if isinstance(location, Path) else None
+
+    @staticmethod
+    def _file_stamp(location: Path) -> tuple[int, int] | None:
+        """Get a stamp that will change if a local file changes.
+
+        Args:
+            location: The location of the file.
+
+        Returns:
+            The stamp for the file, or `None` if it couldn't be had.
+        """
+        try:
+            details = location.stat()
+        except OSError:
+            return None
+        return details.st_mtime_ns, details.st_size
+
     @singledispatchmethod
-    def _load_markdown(self, location: Path, remember: bool) -> None:
+    def _load_markdown(self, location: Path, remember: bool, generation: int) -> None:
         """Load markdown from a location.
 
         Args:
             location: The location to load the markdown from.
             remember: Should this location go into history?
+            generation: The generation of the load.
         """
-        self._load_from_file(location, remember)
+        if (prefetched := self._prefetched.pop(location)) is not None:
+            stamp, markdown = prefetched
+            if stamp == self._file_stamp(location):
+                self.post_message(self.Loaded(self, markdown, remember, generation))
+                return
+        self._load_from_file(location, remember, generation)
 
     @_load_markdown.register
-    def _(self, location: URL, remember: bool) -> None:
-        self._load_from_url(location, remember)
+    def _(self, location: URL, remember: bool, generation: int) -> None:
+        self._load_from_url(location, remember, generation)
 
     @_load_markdown.register
-    def _(self, location: None, remember: bool) -> None:
-        self.post_message(self.Loaded(self, "", remember))
+    def _(self, location: None, remember: bool, generation: int) -> None:
+        self.post_message(self.Loaded(self, "", remember, generation))
+
+    def _start_load(
+        self,
+        location: HikeLocation | None,
+        remember: bool,
+        generation: int,
+        return_visit: bool,
+    ) -> None:
+        """Start loading a location, if it's still wanted.
+
+        Args:
+            location: The location to load the markdown from.
+            remember: Should this location go into history?
+            generation: The generation of the load.
+            return_visit: Is this a return visit to the location?
+        """
+        if self._is_stale(generation):
+            return
+        if return_visit and self._return_to(location):
+            return
+        self._load_markdown(location, remember, generation)
 
     def _visit(
         self,
         location: HikeLocation | None,
         remember: bool = True,
         preserve_position: bool = False,
+        return_visit: bool = False,
     ) -> None:
         """Visit the given location.
 
@@ -322,9 +1074,39 @@ class Viewer(Vertical, can_focus=False):
             location: The location to visit.
             remember: Should this location go into history?
             preserve_position: Attempt to preserve the scroll position?
+            return_visit: Is this a return visit to the location?
+
+        Note:
+            On a return visit, if the document at the location is still
+            rendered, it is put back on display rather than being loaded
+            again.
         """
         self.set_class(location is None, "empty")
-        self._load_markdown(location, remember)
+        # If the location comes with an anchor, that's where to go once the
+        # document is on display; a return visit goes back to where it was
+        # left instead. Any anchor waiting on another location is of no
+        # more use.
+        if isinstance(location, URL) and location.fragment and not return_visit:
+            self._pending_anchor = (location, location.fragment)
+        elif self._pending_anchor is not None and self._pending_anchor[0] != location:
+            self._pending_anchor = None
+        self._remember_position()
+        self._stop_watching()
+        # Anything that is still loading, or being fetched ahead of time
+        # for the current document, is of no interest any more, so cancel
+        # it and bump the generation so that any result that's already on
+        # its way gets ignored.
+        self.workers.cancel_group(self, "load")
+        self.workers.cancel_group(self, "prefetch")
+        for document in self.query_one("#document").query_children(Document):
+            document.cancel_parse()
+        self._generation += 1
+        # Rather than start the load right away, queue it up; that way if
+        # a burst of visits comes in (think hammering backward or forward
+        # through history) only the last of them results in any work.
+        self.call_later(
+            self._start_load, location, remember, self._generation, return_visit
+        )
         if not preserve_position:
             self.query_one("#document").scroll_home(animate=False)
 
@@ -340,9 +1122,24 @@ class Viewer(Vertical, can_focus=False):
         Args:
             message: The message requesting the update.
         """
+        if self._is_stale(message.generation):
+            return
+        # If the document is already on display, it stays as it is until
+        # the whole of the new content has arrived.
+        if message.partial and self.location in self._rendered:
+            return
         self.query_one(ViewerTitle).location = self.location
-        self._source = message.markdown
-        self.query_one(Markdown).update(message.markdown)
+        self._activate_source(
+            None if message.partial else self.location, message.markdown
+        )
+        self._display_markdown(self.location, message.markdown, message.partial)
+        if message.partial:
+            return
+        self._start_watching(self.location, message.markdown)
+        if message.markdown and load_configuration().prefetch_links:
+            self.call_after_refresh(
+                self._find_prefetch_targets, message.markdown, message.generation
+            )
         if (
             message.remember
             and self.location
@@ -351,16 +1148,88 @@ class Viewer(Vertical, can_focus=False):
             self.history.add(self.location)
             self.post_message(self.HistoryUpdated(self))
 
+    def _start_watching(self, location: HikeLocation | None, markdown: str) -> None:
+        """Start watching the document on display for changes, if wanted.
+
+        Args:
+            location: The location of the document.
+            markdown: The Markdown of the document.
+        """
+        if (
+            not isinstance(location, Path)
+            or not (configuration := load_configuration()).watch_local_documents
+        ):
+            return
+        if self._watcher is not None and self._watcher.path == location:
+            return
+        self._stop_watching()
+
+        def changed(markdown: str) -> None:
+            # This is called from the watcher's thread, and the application
+            # could be on its way out by the time it is.
+            try:
+                self.app.call_from_thread(self._file_changed, location, markdown)
+            except RuntimeError:
+                pass
+
+        self._watcher = watch_file(
+            location,
+            markdown,
+            changed,
+            configuration.watch_debounce,
+            configuration.watch_poll_interval,
+        )
+
+    def _stop_watching(self) -> None:
+        """Stop watching the document on display for changes."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _file_changed(self, location: Path, markdown: str) -> None:
+        """Show the new content of a watched document.
+
+        Args:
+            location: The location of the document.
+            markdown: The new Markdown of the document.
+        """
+        # The content goes through the same path as any other load, but as
+        # part of the current generation; the document only replaces what
+        # changed, so the position in it is kept.
+        if location == self.location == self._showing:
+            self.post_message(self.Loaded(self, markdown, False, self._generation))
+
+    def on_unmount(self) -> None:
+        """Clean up when the viewer is unmounted."""
+        self._stop_watching()
+        self._parsing.shutdown()
+
     def _visit_from_history(self) -> None:
         """Visit the current location in history."""
         self.set_reactive(Viewer.location, self.history.current_item)
-        self._visit(self.location, remember=False)
+        self._visit(self.location, remember=False, return_visit=True)
         self.post_message(self.HistoryVisit(self))
         self.refresh_bindings()
 
     def reload(self) -> None:
         """Reload the current document."""
-        self._visit(self.location, remember=False, preserve_position=True)
+        if isinstance(self.location, URL):
+            self._expire_and_reload(self.location)
+        else:
+            self._visit(self.location, remember=False, preserve_position=True)
+
+    @work(exclusive=True, group="reload")
+    async def _expire_and_reload(self, location: URL) -> None:
+        """Reload a remote document, making sure it's checked with the server.
+
+        Args:
+            location: The location of the document to reload.
+        """
+        # Expiring the cached copy can mean loading or saving the cache's
+        # index, so it's done away from the application.
+        await to_thread(http_cache().expire, location)
+        if location == self.location:
+            self._visit(location, remember=False, preserve_position=True)
 
     def goto(self, history_location: int) -> None:
         """Go to a specific location in history."""
@@ -384,7 +1253,32 @@ class Viewer(Vertical, can_focus=False):
         Args:
             block_id: The ID of the content to jump to.
         """
-        self.scroll_to_widget(self.query_one(f"#{block_id}"), top=True)
+        self._document.jump_to_block(block_id)
+
+    @on(Markdown.TableOfContentsUpdated)
+    def _table_of_contents_updated(
+        self, message: Markdown.TableOfContentsUpdated
+    ) -> None:
+        """Handle the table of contents of a document being updated.
+
+        Args:
+            message: The message saying the table of contents has changed.
+
+        Note:
+            A document that isn't on display, such as one being kept for a
+            return visit, has no say in the table of contents; its message
+            goes no further. Otherwise the message is left to carry on to
+            anything else that wants it, once any anchor that is waiting on
+            the document has been jumped to.
+        """
+        if message.markdown is not self._document:
+            message.stop()
+            return
+        if self._pending_anchor is None:
+            return
+        location, anchor = self._pending_anchor
+        if location == self._showing and message.markdown.goto_anchor(anchor):
+            self._pending_anchor = None
 
     def remove_from_history(self, history: int) -> None:
         """Remove a specific location from history.
@@ -399,47 +1293,176 @@ class Viewer(Vertical, can_focus=False):
         """Clear all locations from history."""
         self.history = HikeHistory()
 
-    @on(Markdown.LinkClicked)
-    def _handle_link(self, message: Markdown.LinkClicked) -> None:
-        """Handle a link being clicked in the Markdown widget.
+    def _resolve_link(self, href: str) -> HikeLocation | None:
+        """Resolve a link in the current document to a location.
 
         Args:
-            message: The message requesting the link be handled.
+            href: The target of the link.
+
+        Returns:
+            The location the link leads to, or `None` if it doesn't lead to
+            another location.
         """
-        message.stop()
 
         # Outright URL?
-        if looks_urllike(message.href):
-            self.post_message(OpenLocation(URL(message.href)))
-            return
+        if looks_urllike(href):
+            return URL(href)
 
         # Possibly a relative path to a currently-visited URL?
         if isinstance(self.location, URL):
-            self.post_message(
-                OpenLocation(self.location.copy_with().join(message.href))
-            )
-            return
+            return self.location.copy_with().join(href)
 
         # A local file that exists?
-        if (local_file := Path(message.href).expanduser()).exists():
-            self.post_message(OpenLocation(local_file.resolve()))
-            return
+        if (local_file := Path(href).expanduser()).exists():
+            return local_file.resolve()
 
         # A local file relative to the current location?
         if (
             isinstance(self.location, Path)
-            and (local_file := self.location.parent / Path(message.href))
-            .absolute()
-            .exists()
+            and (local_file := self.location.parent / Path(href)).absolute().exists()
         ):
-            self.post_message(OpenLocation(local_file))
+            return local_file
+
+        return None
+
+    def _is_current(self, location: HikeLocation) -> bool:
+        """Is a location that of the document being viewed?
+
+        Args:
+            location: The location to check.
+
+        Returns:
+            `True` if it's the location being viewed, `False` if not.
+        """
+        if isinstance(location, Path) and isinstance(self.location, Path):
+            return location.resolve() == self.location.resolve()
+        if isinstance(location, URL) and isinstance(self.location, URL):
+            return location.copy_with(fragment=None) == self.location.copy_with(
+                fragment=None
+            )
+        return False
+
+    @work(thread=True, group="prefetch")
+    def _find_prefetch_targets(self, markdown: str, generation: int) -> None:
+        """Find the Markdown documents the current document links to.
+
+        Args:
+            markdown: The source of the current document.
+            generation: The generation of the load of the current document.
+        """
+        worker = get_current_worker()
+        targets: list[HikeLocation] = []
+        limit = load_configuration().prefetch_limit
+        for href in links_in(markdown_parser(self._parsed).parse(markdown)):
+            if worker.is_cancelled or self._is_stale(generation):
+                return
+            if (
+                (location := self._resolve_link(href)) is not None
+                and maybe_markdown(location)
+                and location != self.location
+                and location not in targets
+            ):
+                targets.append(location)
+                if len(targets) >= limit:
+                    break
+        self.app.call_from_thread(self._start_prefetching, targets, generation)
+
+    def _start_prefetching(self, targets: list[HikeLocation], generation: int) -> None:
+        """Start fetching documents ahead of them being visited.
+
+        Args:
+            targets: The locations to fetch.
+            generation: The generation of the load of the current document.
+        """
+        if not self._is_stale(generation):
+            limit = Semaphore(max(load_configuration().prefetch_concurrency, 1))
+            for target in targets:
+                self._prefetch(target, limit)
+
+    @work(group="prefetch")
+    async def _prefetch(self, location: HikeLocation, limit: Semaphore) -> None:
+        """Fetch a document ahead of it being visited.
+
+        Args:
+            location: The location of the document to fetch.
+            limit: The semaphore that limits how many fetches happen at once.
+        """
+        async with limit:
+            if isinstance(location, Path):
+                await self._prefetch_file(location)
+            else:
+                await self._prefetch_url(location)
+
+    async def _prefetch_file(self, location: Path) -> None:
+        """Fetch a local document ahead of it being visited.
+
+        Args:
+            location: The location of the document to fetch.
+        """
+        if (stamp := self._file_stamp(location)) is None:
             return
+        if (prefetched := self._prefetched.get(location)) is not None:
+            if prefetched[0] == stamp:
+                return
+        try:
+            markdown = await self._read(location)
+        except (OSError, UnicodeDecodeError):
+            return
+        self._prefetched[location] = (stamp, markdown)
 
-        # Some sort of internal anchor perhaps?
-        if message.href.startswith("#") and message.markdown.goto_anchor(
-            message.href[1:]
-        ):
+    async def _prefetch_url(self, location: URL) -> None:
+        """Fetch a remote document ahead of it being visited.
+
+        Args:
+            location: The location of the document to fetch.
+
+        Note:
+            Remote documents are fetched into the HTTP cache, from where
+            they'll be shown as soon as they're visited.
+        """
+        cache = http_cache()
+        if (cached := await to_thread(cache.get, location)) is not None and cached[
+            0
+        ].is_fresh:
+            return
+        try:
+            download = await self._download(
+                location, {} if cached is None else cached[0].conditional_headers
+            )
+        except RequestError:
             return
+        if cached is not None and download.response.status_code == codes.NOT_MODIFIED:
+            await to_thread(cache.revalidated, location, download.response.headers)
+        elif download.markdown is not None:
+            await to_thread(
+                cache.store, location, download.response.headers, download.markdown
+            )
+
+    @on(Markdown.LinkClicked)
+    def _handle_link(self, message: Markdown.LinkClicked) -> None:
+        """Handle a link being clicked in the Markdown widget.
+
+        Args:
+            message: The message requesting the link be handled.
+        """
+        message.stop()
+        target, _, anchor = message.href.partition("#")
+
+        # An anchor in the current document?
+        if not target:
+            if message.markdown.goto_anchor(anchor):
+                return
+
+        # A link to another location?
+        elif (location := self._resolve_link(target)) is not None:
+            if not self._is_current(location):
+                # If the link has an anchor, it gets jumped to once the
+                # document has loaded.
+                self._pending_anchor = (location, anchor) if anchor else None
+                self.post_message(OpenLocation(location))
+                return
+            if not anchor or message.markdown.goto_anchor(anchor):
+                return
 
         self.notify(
             f"The clicked link could not be handled:\n\n{message.href}",
@@ -454,9 +1477,9 @@ class Viewer(Vertical, can_focus=False):
         Args:
             message: The mouse click message.
         """
-        if is_copy_request_click(message) and self._source:
+        if is_copy_request_click(message) and self.source:
             message.stop()
-            self.post_message(CopyToClipboard(self._source))
+            self.post_message(CopyToClipboard(self.source))
 
     @property
     def is_editable(self) -> bool:
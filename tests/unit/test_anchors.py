@@ -0,0 +1,75 @@
+"""Tests for the anchors of the headings in a document."""
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from hike.support import AnchorIndex, github_slug
+
+
+##############################################################################
+@mark.parametrize(
+    "heading, slug",
+    (
+        ("Hello", "hello"),
+        ("Hello, World!", "hello-world"),
+        ("Version 1.2.3", "version-123"),
+        ("snake_case & kebab-case", "snake_case--kebab-case"),
+        ("C++ / C#", "c--c"),
+        ("Café au lait", "café-au-lait"),
+        ("Ünïcödé", "ünïcödé"),
+        ("日本語の見出し", "日本語の見出し"),
+        ("🎉 Party time", "-party-time"),
+        ("`code` in a heading", "code-in-a-heading"),
+        ("", ""),
+    ),
+)
+def test_github_slug(heading: str, slug: str) -> None:
+    """Headings should be slugged as GitHub would slug them."""
+    assert github_slug(heading) == slug
+
+
+##############################################################################
+def test_anchors_are_indexed() -> None:
+    """Each heading's anchor should lead to its block."""
+    anchors = AnchorIndex([(0, "Introduction"), (4, "Getting started"), (9, "FAQ")])
+    assert list(anchors) == ["introduction", "getting-started", "faq"]
+    assert anchors.get("getting-started") == 4
+    assert anchors.get("faq") == 9
+    assert anchors.get("nope") is None
+    assert len(anchors) == 3
+
+
+##############################################################################
+def test_duplicate_headings_get_numbered() -> None:
+    """Repeated headings should get numbered anchors."""
+    anchors = AnchorIndex(enumerate(["Notes", "Notes", "Notes"]))
+    assert list(anchors) == ["notes", "notes-1", "notes-2"]
+    assert [anchors.get(anchor) for anchor in anchors] == [0, 1, 2]
+
+
+##############################################################################
+def test_numbered_anchors_dont_clash() -> None:
+    """A numbered anchor shouldn't clash with a heading ending in a number."""
+    anchors = AnchorIndex(enumerate(["Notes 1", "Notes", "Notes", "NOTES"]))
+    assert list(anchors) == ["notes-1", "notes", "notes-2", "notes-3"]
+
+
+##############################################################################
+def test_encoded_anchors_are_found() -> None:
+    """Anchors that are percent-encoded should be found."""
+    anchors = AnchorIndex([(3, "Café au lait")])
+    assert anchors.get("caf%C3%A9-au-lait") == 3
+    assert "caf%C3%A9-au-lait" in anchors
+
+
+##############################################################################
+def test_anchors_are_found_regardless_of_case() -> None:
+    """An anchor in a link might not be in lower case."""
+    anchors = AnchorIndex([(3, "Getting started")])
+    assert anchors.get("Getting-Started") == 3
+
+
+### test_anchors.py ends here
@@ -0,0 +1,81 @@
+"""Tests for working with the top-level blocks of a Markdown document."""
+
+##############################################################################
+# Local imports.
+from hike.support import markdown_parser, top_level_blocks
+
+##############################################################################
+DOCUMENT = """\
+---
+title: Testing
+---
+
+# The *first* heading
+
+A paragraph
+over two lines.
+
+- A list
+  - with nesting
+
+```python
+print("Hello")
+```
+
+---
+
+## The `second` heading
+"""
+"""A document to split into blocks."""
+
+
+##############################################################################
+def test_blocks_are_found() -> None:
+    """The top-level blocks of a document should be found."""
+    assert [
+        (block.kind, block.lines)
+        for block in top_level_blocks(markdown_parser().parse(DOCUMENT))
+    ] == [
+        ("front_matter", (0, 3)),
+        ("heading", (4, 5)),
+        ("paragraph", (6, 8)),
+        ("bullet_list", (9, 12)),
+        ("fence", (12, 15)),
+        ("hr", (16, 17)),
+        ("heading", (18, 19)),
+    ]
+
+
+##############################################################################
+def test_headings_are_plain_text() -> None:
+    """Headings should be available as plain text."""
+    assert [
+        (block.heading_level, block.heading)
+        for block in top_level_blocks(markdown_parser().parse(DOCUMENT))
+        if block.heading is not None
+    ] == [(1, "The first heading"), (2, "The second heading")]
+
+
+##############################################################################
+def test_blocks_cover_all_tokens() -> None:
+    """Splitting a document into blocks shouldn't lose any tokens."""
+    tokens = markdown_parser().parse(DOCUMENT)
+    assert [
+        token for block in top_level_blocks(tokens) for token in block.tokens
+    ] == tokens
+
+
+##############################################################################
+def test_fingerprints_ignore_position() -> None:
+    """Moving a block shouldn't change its fingerprint, changing it should."""
+    original = top_level_blocks(markdown_parser().parse("# Title\n\nText.\n"))
+    moved = top_level_blocks(markdown_parser().parse("Intro.\n\n# Title\n\nText.\n"))
+    changed = top_level_blocks(markdown_parser().parse("# Title\n\nText!\n"))
+    assert [block.fingerprint for block in original] == [
+        block.fingerprint for block in moved[1:]
+    ]
+    assert original[0].lines != moved[1].lines
+    assert original[1].fingerprint != changed[1].fingerprint
+
+
+### test_blocks.py ends here
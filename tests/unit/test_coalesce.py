@@ -0,0 +1,128 @@
+"""Tests for the request coalescer."""
+
+##############################################################################
+# Python imports.
+from asyncio import CancelledError, Event, create_task, gather, run, sleep
+
+##############################################################################
+# Pytest imports.
+from pytest import raises
+
+##############################################################################
+# Local imports.
+from hike.support import Coalescer
+
+
+##############################################################################
+def test_concurrent_requests_are_shared() -> None:
+    """Concurrent requests for the same thing should do the work once."""
+    starts: list[str] = []
+
+    async def requests() -> list[str]:
+        coalescer = Coalescer[str, str]()
+
+        async def start(key: str) -> str:
+            async def work() -> str:
+                starts.append(key)
+                await sleep(0.01)
+                return key.upper()
+
+            return await coalescer.request(key, work)
+
+        results = await gather(start("a"), start("a"), start("b"), start("a"))
+        assert (coalescer.hits, coalescer.misses) == (2, 2)
+        return list(results)
+
+    assert run(requests()) == ["A", "A", "B", "A"]
+    assert starts == ["a", "b"]
+
+
+##############################################################################
+def test_sequential_requests_are_not_shared() -> None:
+    """Once a request has landed the next one should do the work again."""
+
+    async def requests() -> tuple[int, int]:
+        coalescer = Coalescer[str, int]()
+
+        async def work() -> int:
+            return 42
+
+        await coalescer.request("a", work)
+        await coalescer.request("a", work)
+        return coalescer.hits, coalescer.misses
+
+    assert run(requests()) == (0, 2)
+
+
+##############################################################################
+def test_errors_are_shared() -> None:
+    """Everyone waiting on a request should see it fail."""
+
+    async def requests() -> list[int | BaseException]:
+        coalescer = Coalescer[str, int]()
+
+        async def work() -> int:
+            await sleep(0.01)
+            raise OSError("Nope")
+
+        return list(
+            await gather(
+                coalescer.request("a", work),
+                coalescer.request("a", work),
+                return_exceptions=True,
+            )
+        )
+
+    assert [type(result) for result in run(requests())] == [OSError, OSError]
+
+
+##############################################################################
+def test_cancelling_one_waiter_keeps_the_request() -> None:
+    """Cancelling one of several waiters should not cancel the request."""
+
+    async def requests() -> int:
+        coalescer = Coalescer[str, int]()
+        release = Event()
+
+        async def work() -> int:
+            await release.wait()
+            return 42
+
+        first = create_task(coalescer.request("a", work))
+        second = create_task(coalescer.request("a", work))
+        await sleep(0)
+        first.cancel()
+        release.set()
+        with raises(CancelledError):
+            await first
+        return await second
+
+    assert run(requests()) == 42
+
+
+##############################################################################
+def test_cancelling_every_waiter_cancels_the_request() -> None:
+    """Once nobody is waiting on a request it should be cancelled."""
+    finished: list[bool] = []
+
+    async def requests() -> bool:
+        coalescer = Coalescer[str, int]()
+
+        async def work() -> int:
+            await sleep(10)
+            finished.append(True)
+            return 42
+
+        waiter = create_task(coalescer.request("a", work))
+        await sleep(0)
+        waiter.cancel()
+        with raises(CancelledError):
+            await waiter
+        await sleep(0)
+        return "a" in coalescer
+
+    assert run(requests()) is False
+    assert finished == []
+
+
+### test_coalesce.py ends here
@@ -0,0 +1,831 @@
+"""Tests for the Markdown document widget."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+from typing import Iterable
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.app import App, ComposeResult
+from textual.containers import VerticalScroll
+from textual.pilot import Pilot
+from textual.widget import AwaitMount, Widget
+from textual.widgets import Markdown
+from textual.widgets.markdown import MarkdownBlock
+
+##############################################################################
+# Local imports.
+from hike.support import Block, HighlightCache, ParsePool
+from hike.widgets.document import Document, DocumentFence, DocumentPage
+
+##############################################################################
+LARGE = "".join(
+    f"## Section {section}\n\n"
+    + "".join(f"Paragraph {paragraph}.\n\n" for paragraph in range(10))
+    for section in range(100)
+)
+"""A document large enough to be shown in virtual mode."""
+
+
+##############################################################################
+class DocumentApp(App[None]):
+    """An application for testing the document widget."""
+
+    def __init__(self, markdown: str) -> None:
+        """Initialise the application.
+
+        Args:
+            markdown: The Markdown to show.
+        """
+        super().__init__()
+        self._markdown = markdown
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(self._markdown, virtual_threshold=len(LARGE))
+
+
+##############################################################################
+async def settle(pilot: Pilot[None]) -> None:
+    """Give the document time to settle."""
+    for _ in range(5):
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+
+
+##############################################################################
+def mounted_blocks(document: Document) -> int:
+    """Count the top-level blocks that are mounted in a document."""
+    return sum(
+        1
+        for page in document.query_children(DocumentPage)
+        for child in page.children
+        if isinstance(child, MarkdownBlock)
+    )
+
+
+##############################################################################
+MEDIUM = "".join(
+    f"## Section {section}\n\n"
+    + "".join(f"Paragraph {paragraph}.\n\n" for paragraph in range(5))
+    for section in range(10)
+)
+"""A document that won't be shown in virtual mode."""
+
+
+##############################################################################
+def test_small_documents_are_not_virtual() -> None:
+    """A document under the threshold should be shown as normal."""
+
+    async def show() -> tuple[bool, int]:
+        async with DocumentApp("# Small\n\nDocument.\n").run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            return document.is_virtual, len(document.query_children(MarkdownBlock))
+
+    assert run(show()) == (False, 2)
+
+
+##############################################################################
+def test_large_documents_only_mount_what_is_in_view() -> None:
+    """A large document should only have the blocks near the view mounted."""
+
+    async def show() -> tuple[bool, int, int]:
+        async with DocumentApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            return (
+                document.is_virtual,
+                mounted_blocks(document),
+                len(document.table_of_contents),
+            )
+
+    virtual, mounted, contents = run(show())
+    assert virtual
+    assert 0 < mounted < 1100
+    assert contents == 100
+
+
+##############################################################################
+def test_scrolling_moves_the_window() -> None:
+    """Scrolling a large document should change what is mounted."""
+
+    async def show() -> tuple[bool, bool]:
+        async with DocumentApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            pilot.app.query_one(VerticalScroll).scroll_end(animate=False)
+            await settle(pilot)
+            pages = list(document.query_children(DocumentPage))
+            return pages[0].materialised, pages[-1].materialised
+
+    assert run(show()) == (False, True)
+
+
+##############################################################################
+def test_jump_to_unmounted_heading() -> None:
+    """Jumping to a heading that isn't mounted should bring it into view."""
+
+    async def show() -> tuple[str, bool]:
+        async with DocumentApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            _, heading, block_id = document.table_of_contents[-1]
+            assert block_id is not None
+            document.jump_to_block(block_id)
+            await settle(pilot)
+            page = document.query_children(DocumentPage).last()
+            widget = page.widgets[int(block_id.removeprefix("block-"))]
+            return heading, pilot.app.query_one(VerticalScroll).region.overlaps(
+                widget.region
+            )
+
+    assert run(show()) == ("Section 99", True)
+
+
+##############################################################################
+def test_goto_anchor_in_virtual_document() -> None:
+    """Anchors should work in a virtual document."""
+
+    async def show() -> tuple[bool, bool]:
+        async with DocumentApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            found = document.goto_anchor("section-50")
+            await settle(pilot)
+            return found, pilot.app.query_one(VerticalScroll).scroll_y > 0
+
+    assert run(show()) == (True, True)
+
+
+##############################################################################
+def test_anchors_lead_to_their_headings() -> None:
+    """Anchors should be those GitHub would give, including for duplicates."""
+
+    async def show() -> tuple[list[str], list[int | None]]:
+        async with DocumentApp(
+            "# Title\n\n## Notes\n\nOne.\n\n## Notes\n\nTwo.\n\n## What's new?\n"
+        ).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            return list(document.anchors), [
+                document.anchors.get(anchor)
+                for anchor in ("title", "notes", "notes-1", "whats-new", "nope")
+            ]
+
+    assert run(show()) == (
+        ["title", "notes", "notes-1", "whats-new"],
+        [0, 1, 3, 5, None],
+    )
+
+
+##############################################################################
+def test_anchors_follow_updates() -> None:
+    """The anchors should be those of the current content of the document."""
+
+    async def show() -> tuple[list[str], list[str]]:
+        async with DocumentApp("# First\n").run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            before = list(document.anchors)
+            await document.update("# Second\n\n## Second\n")
+            await settle(pilot)
+            return before, list(document.anchors)
+
+    assert run(show()) == (["first"], ["second", "second-1"])
+
+
+##############################################################################
+def test_leaving_virtual_mode() -> None:
+    """Updating a virtual document with a small one should leave virtual mode."""
+
+    async def show() -> tuple[bool, int]:
+        async with DocumentApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            await document.update("# Small\n")
+            await settle(pilot)
+            return document.is_virtual, len(document.children)
+
+    assert run(show()) == (False, 1)
+
+
+##############################################################################
+def test_update_only_replaces_changed_blocks() -> None:
+    """Updating a document should only replace the blocks that changed."""
+
+    async def show() -> tuple[list[bool], bool]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            before = list(document.query_children(MarkdownBlock))
+            contents = document.table_of_contents
+            await document.update(
+                MEDIUM.replace(
+                    "## Section 3\n\nParagraph 0.", "## Section 3\n\n- Fixed."
+                )
+            )
+            await settle(pilot)
+            after = list(document.query_children(MarkdownBlock))
+            return (
+                [old is new for old, new in zip(before, after)],
+                document.table_of_contents == contents,
+            )
+
+    kept, same_contents = run(show())
+    assert kept.count(False) == 1
+    assert kept.index(False) == (3 * 6) + 1
+    assert same_contents
+
+
+##############################################################################
+def test_changed_blocks_are_recycled() -> None:
+    """Widgets of changed blocks should be re-bound to blocks of the same type."""
+
+    async def show() -> tuple[bool, str | None, int, int]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            before = list(document.query_children(MarkdownBlock))
+            await document.update(
+                MEDIUM.replace("## Section 3\n\nParagraph 0.", "## Section 3\n\nFixed.")
+            )
+            await settle(pilot)
+            after = list(document.query_children(MarkdownBlock))
+            return (
+                before == after,
+                after[(3 * 6) + 1].source,
+                document.timings.recycled,
+                document.timings.built,
+            )
+
+    assert run(show()) == (True, "Fixed.\n", 1, 0)
+
+
+##############################################################################
+def test_a_new_document_recycles_the_old_one() -> None:
+    """Showing a different document should re-bind what widgets it can."""
+    other = "# Other\n\n- A list.\n\nA paragraph.\n\n---\n\n## More\n\nThe end.\n"
+
+    async def show() -> tuple[list[str | None], int, int]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            await document.update(other)
+            await settle(pilot)
+            return (
+                [block.source for block in document.query_children(MarkdownBlock)],
+                document.timings.recycled,
+                document.timings.built,
+            )
+
+    assert run(show()) == (
+        [
+            "# Other\n",
+            "- A list.\n\n",
+            "A paragraph.\n",
+            "---\n",
+            "## More\n",
+            "The end.\n",
+        ],
+        3,
+        3,
+    )
+
+
+##############################################################################
+def test_update_keeps_the_view_in_place() -> None:
+    """Changes above the view should not move what's in view."""
+
+    async def show() -> tuple[str, str]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            scroller = pilot.app.query_one(VerticalScroll)
+            scroller.scroll_to(y=30, animate=False)
+            await settle(pilot)
+
+            def top_block() -> str:
+                return next(
+                    str(block.source)
+                    for block in document.query_children(MarkdownBlock)
+                    if block.region.y >= scroller.region.y
+                )
+
+            before = top_block()
+            await document.update(
+                MEDIUM.replace("Paragraph 0.", "Paragraph 0.\n\nAnd more.", 1)
+            )
+            await settle(pilot)
+            return before, top_block()
+
+    before, after = run(show())
+    assert before == after
+
+
+##############################################################################
+def test_superseded_updates_are_abandoned() -> None:
+    """An update that is superseded before its parse finishes should be dropped."""
+
+    async def show() -> tuple[str, list[str]]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            first = document.update("# First\n")
+            second = document.update("# Second\n")
+            await first
+            await second
+            await settle(pilot)
+            return document.source, [
+                heading for _, heading, _ in document.table_of_contents
+            ]
+
+    assert run(show()) == ("# Second\n", ["Second"])
+
+
+##############################################################################
+def test_the_first_part_of_a_document_is_not_abandoned() -> None:
+    """An update with the first part of a document should get on display."""
+
+    async def show() -> tuple[bool, bool, str]:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            first = document.update("# First\n", partial=True)
+            first_timings = document.timings
+            middle = document.update("# First\n\n# Middle\n", partial=True)
+            whole = document.update("# First\n\n# Middle\n\n# Whole\n")
+            await first
+            await middle
+            await whole
+            await settle(pilot)
+            return (
+                first_timings.first_paint is not None,
+                document.timings is not first_timings,
+                document.source,
+            )
+
+    assert run(show()) == (True, True, "# First\n\n# Middle\n\n# Whole\n")
+
+
+##############################################################################
+def test_cancelled_parses_change_nothing() -> None:
+    """Cancelling a parse should leave the document as it was."""
+
+    async def show() -> str:
+        async with DocumentApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            update = document.update("# Changed\n")
+            document.cancel_parse()
+            await update
+            await settle(pilot)
+            return document.source
+
+    assert run(show()) == MEDIUM
+
+
+##############################################################################
+def test_documents_can_be_parsed_in_a_process() -> None:
+    """A document parsed in a worker process should display as normal."""
+    pool = ParsePool(1, 1)
+
+    class PoolApp(App[None]):
+        def compose(self) -> ComposeResult:
+            with VerticalScroll():
+                yield Document(MEDIUM, parse_pool=pool)
+
+    async def show() -> list[str]:
+        try:
+            async with PoolApp().run_test() as pilot:
+                await settle(pilot)
+                return [
+                    heading
+                    for _, heading, _ in pilot.app.query_one(Document).table_of_contents
+                ]
+        finally:
+            pool.shutdown()
+
+    assert run(show()) == [f"Section {section}" for section in range(10)]
+
+
+##############################################################################
+LONG = "".join(
+    f"## Section {section}\n\nParagraph {section}.\n\n" for section in range(300)
+)
+"""A document with more blocks than get mounted in one go."""
+
+
+##############################################################################
+class ContentsApp(DocumentApp):
+    """An application that reacts to the table of contents arriving."""
+
+    def __init__(self, markdown: str, jump: bool = False) -> None:
+        """Initialise the application.
+
+        Args:
+            markdown: The Markdown to show.
+            jump: Jump to the last heading as soon as the contents arrive?
+        """
+        super().__init__(markdown)
+        self._jump = jump
+        self.mounted_with_contents: list[int] = []
+        """The number of mounted blocks each time some contents arrived."""
+
+    @on(Markdown.TableOfContentsUpdated)
+    def _contents(self, message: Markdown.TableOfContentsUpdated) -> None:
+        if not message.table_of_contents:
+            return
+        document = self.query_one(Document)
+        self.mounted_with_contents.append(len(document.query_children(MarkdownBlock)))
+        if self._jump:
+            _, _, block_id = message.table_of_contents[-1]
+            assert block_id is not None
+            document.jump_to_block(block_id)
+
+
+##############################################################################
+def test_contents_arrive_before_the_document_is_mounted() -> None:
+    """The table of contents should be published before mounting is done."""
+
+    async def show() -> tuple[list[int], int, int]:
+        async with (app := ContentsApp(LONG)).run_test() as pilot:
+            await settle(pilot)
+            document = app.query_one(Document)
+            return (
+                app.mounted_with_contents,
+                len(document.query_children(MarkdownBlock)),
+                len(document.table_of_contents),
+            )
+
+    mounted_with_contents, mounted, contents = run(show())
+    assert len(mounted_with_contents) == 1
+    assert mounted_with_contents[0] < mounted == 600
+    assert contents == 300
+
+
+##############################################################################
+def test_early_jumps_wait_for_the_block() -> None:
+    """A jump made before the target is mounted should happen once it is."""
+
+    async def show() -> bool:
+        async with (app := ContentsApp(LONG, jump=True)).run_test() as pilot:
+            await settle(pilot)
+            target = app.query_one(Document).query_children(MarkdownBlock)[-2]
+            return app.query_one(VerticalScroll).region.overlaps(target.region)
+
+    assert run(show())
+
+
+##############################################################################
+class BatchingDocument(Document):
+    """A document that records the batches of widgets it mounts."""
+
+    def __init__(self, markdown: str) -> None:
+        """Initialise the document.
+
+        Args:
+            markdown: The Markdown to show.
+        """
+        super().__init__(markdown)
+        self.batches: list[int] = []
+        """The size of each batch of widgets mounted, in order."""
+
+    def mount_all(
+        self,
+        widgets: Iterable[Widget],
+        *,
+        before: int | str | Widget | None = None,
+        after: int | str | Widget | None = None,
+    ) -> AwaitMount:
+        self.batches.append(len(widgets := list(widgets)))
+        return super().mount_all(widgets, before=before, after=after)
+
+
+##############################################################################
+class BatchingApp(App[None]):
+    """An application for testing the batching of mounts."""
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield BatchingDocument(LONG)
+
+
+##############################################################################
+def test_documents_are_mounted_in_batches() -> None:
+    """The first screenful should be mounted first, then the rest in batches."""
+
+    async def show() -> list[int]:
+        async with BatchingApp().run_test() as pilot:
+            await settle(pilot)
+            return pilot.app.query_one(BatchingDocument).batches
+
+    first, *rest = [batch for batch in run(show()) if batch]
+    assert first < 24
+    assert max(rest) <= Document._MOUNT_BATCH_SIZE
+    assert first + sum(rest) == 600
+
+
+##############################################################################
+def test_render_timings() -> None:
+    """The time to first paint and to completion should be recorded."""
+
+    async def show() -> tuple[float | None, float | None]:
+        async with DocumentApp(LONG).run_test() as pilot:
+            await settle(pilot)
+            timings = pilot.app.query_one(Document).timings
+            return timings.first_paint, timings.complete
+
+    first_paint, complete = run(show())
+    assert first_paint is not None and complete is not None
+    assert 0 < first_paint < complete
+
+
+##############################################################################
+FENCES = "".join(
+    f"## Example {example}\n\n```python\nvalue = {example}\n```\n\n"
+    for example in range(100)
+)
+"""A document with lots of code in it."""
+
+
+##############################################################################
+class FenceApp(App[None]):
+    """An application for testing the highlighting of fences."""
+
+    def __init__(self, cache: HighlightCache) -> None:
+        """Initialise the application.
+
+        Args:
+            cache: The cache of highlighted code to use.
+        """
+        super().__init__()
+        self._cache = cache
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(FENCES, highlight_cache=self._cache)
+
+
+##############################################################################
+def highlighted(app: App[None]) -> list[bool]:
+    """Get which of the fences in an application have been highlighted."""
+    return [fence.highlighted for fence in app.query(DocumentFence)]
+
+
+##############################################################################
+def test_only_fences_near_the_view_are_highlighted() -> None:
+    """Fences should be highlighted as they come near the view."""
+
+    async def show() -> tuple[list[bool], list[bool]]:
+        async with FenceApp(HighlightCache(1000)).run_test() as pilot:
+            await settle(pilot)
+            before = highlighted(pilot.app)
+            pilot.app.query_one(VerticalScroll).scroll_end(animate=False)
+            await settle(pilot)
+            return before, highlighted(pilot.app)
+
+    before, after = run(show())
+    assert len(before) == 100
+    assert before[0] and not before[-1]
+    assert after[-1]
+
+
+##############################################################################
+def test_highlighted_code_comes_from_the_cache() -> None:
+    """Code that has been highlighted before should be shown highlighted."""
+    cache = HighlightCache(1000)
+
+    async def show() -> list[bool]:
+        async with FenceApp(cache).run_test() as pilot:
+            await settle(pilot)
+            return highlighted(pilot.app)
+
+    first = run(show())
+    size, hits = len(cache), cache.hits
+    second = run(show())
+    assert second == first
+    assert len(cache) == size > 0
+    assert cache.hits - hits >= size
+
+
+##############################################################################
+def test_theme_changes_only_rehighlight_if_needed() -> None:
+    """Changing theme should only highlight again if the highlighting differs."""
+    cache = HighlightCache(1000)
+
+    async def show() -> tuple[int, int, bool]:
+        async with FenceApp(cache).run_test() as pilot:
+            await settle(pilot)
+            size = len(cache)
+            pilot.app.theme = "textual-light"
+            await settle(pilot)
+            light = len(cache)
+            pilot.app.theme = "ansi-dark"
+            await settle(pilot)
+            return size, light, highlighted(pilot.app)[0]
+
+    size, light, first_highlighted = run(show())
+    assert light == size
+    assert first_highlighted
+    assert len(cache) > size
+
+
+##############################################################################
+class OutlineApp(App[None]):
+    """An application for testing outline mode."""
+
+    def __init__(self, markdown: str) -> None:
+        """Initialise the application.
+
+        Args:
+            markdown: The Markdown to show.
+        """
+        super().__init__()
+        self._markdown = markdown
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(self._markdown, virtual_threshold=len(LARGE), outline=True)
+
+
+##############################################################################
+def built(document: Document) -> list[MarkdownBlock]:
+    """Get the blocks of a document that have been built."""
+    return [
+        block
+        for page in document.query_children(DocumentPage)
+        for block in page.query_children(MarkdownBlock)
+    ]
+
+
+##############################################################################
+def shown(document: Document) -> list[str]:
+    """Get the kinds of the blocks of a document that are on show."""
+    return [
+        "heading" if block.name and block.name.startswith("h") else "body"
+        for block in built(document)
+    ]
+
+
+##############################################################################
+def test_outlines_only_build_headings() -> None:
+    """In outline mode, only the headings should be built to start with."""
+
+    async def show() -> tuple[int, list[str]]:
+        async with OutlineApp("Preamble.\n\n" + MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            return len(built(document)), shown(document)
+
+    count, on_show = run(show())
+    assert count == 11
+    assert on_show == ["body"] + ["heading"] * 10
+
+
+##############################################################################
+def test_sections_expand_and_collapse() -> None:
+    """Expanding a section should build its body; collapsing should hide it."""
+
+    async def show() -> tuple[list[str], list[str], int]:
+        async with OutlineApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            await document.expand_section(6)
+            expanded = shown(document)
+            await document.collapse_section(6)
+            return expanded, shown(document), len(built(document))
+
+    expanded, collapsed, count = run(show())
+    assert expanded == ["heading"] * 2 + ["body"] * 5 + ["heading"] * 8
+    assert collapsed == ["heading"] * 10
+    assert count == 10
+
+
+##############################################################################
+def test_clicking_a_heading_toggles_its_section() -> None:
+    """Clicking on the heading of a section should expand and collapse it."""
+
+    async def show() -> tuple[list[str], list[str]]:
+        async with OutlineApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            await pilot.click(built(document)[0])
+            await settle(pilot)
+            expanded = shown(document)
+            await pilot.click(built(document)[0])
+            await settle(pilot)
+            return expanded, shown(document)
+
+    expanded, collapsed = run(show())
+    assert expanded == ["heading"] + ["body"] * 5 + ["heading"] * 9
+    assert collapsed == ["heading"] * 10
+
+
+##############################################################################
+def test_jumping_to_a_section_expands_it() -> None:
+    """Jumping to a section from the table of contents should expand it."""
+
+    async def show() -> tuple[list[str], bool]:
+        async with OutlineApp(LONG).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            _, _, block_id = document.table_of_contents[-1]
+            assert block_id is not None
+            document.jump_to_block(block_id)
+            await settle(pilot)
+            body = built(document)[-1]
+            return shown(document)[-2:], pilot.app.query_one(
+                VerticalScroll
+            ).region.overlaps(body.region)
+
+    assert run(show()) == (["heading", "body"], True)
+
+
+##############################################################################
+def test_leaving_and_entering_outline_mode() -> None:
+    """Turning outline mode off should show everything; on should hide it."""
+
+    async def show() -> tuple[int, int]:
+        async with OutlineApp(MEDIUM).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            document.outline = False
+            await settle(pilot)
+            everything = len(document.query_children(MarkdownBlock))
+            document.outline = True
+            await settle(pilot)
+            return everything, len(shown(document))
+
+    assert run(show()) == (60, 10)
+
+
+##############################################################################
+def test_outlines_are_shown_virtually() -> None:
+    """A large outline should only have the headings near the view built."""
+
+    async def show() -> tuple[bool, list[str]]:
+        async with OutlineApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(Document)
+            return document.is_virtual, shown(document)
+
+    virtual, on_show = run(show())
+    assert virtual
+    assert on_show == ["heading"] * len(on_show)
+    assert 0 < len(on_show) < 100
+
+
+##############################################################################
+class ParseCountingDocument(Document):
+    """A document that counts the times it parses its Markdown."""
+
+    parses = 0
+    """The number of parses performed."""
+
+    async def _parse(self, markdown: str) -> list[Block]:
+        self.parses += 1
+        return await super()._parse(markdown)
+
+
+##############################################################################
+class ParseCountingApp(DocumentApp):
+    """An application for testing how often a document is parsed."""
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield ParseCountingDocument(self._markdown, virtual_threshold=len(MEDIUM))
+
+
+##############################################################################
+def test_toggling_outline_mode_reuses_the_document() -> None:
+    """Toggling outline mode shouldn't parse or page the document again."""
+
+    async def show() -> tuple[int, bool, bool, list[str]]:
+        async with ParseCountingApp(LARGE).run_test() as pilot:
+            await settle(pilot)
+            document = pilot.app.query_one(ParseCountingDocument)
+            pages = document.query_children(DocumentPage).nodes
+            parses = document.parses
+            document.outline = True
+            await settle(pilot)
+            outlined = shown(document)
+            document.outline = False
+            await settle(pilot)
+            return (
+                document.parses - parses,
+                document.query_children(DocumentPage).nodes == pages,
+                "body" in shown(document),
+                outlined,
+            )
+
+    parses, same_pages, everything, outlined = run(show())
+    assert parses == 0
+    assert same_pages
+    assert everything
+    assert outlined == ["heading"] * len(outlined)
+
+
+### test_document.py ends here
@@ -0,0 +1,225 @@
+"""Tests for downloading Markdown documents."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncByteStream, AsyncClient, MockTransport, Request, Response
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, fixture, mark
+
+##############################################################################
+# Local imports.
+from hike.data import load_configuration
+from hike.network import Download, download_markdown
+
+##############################################################################
+CHUNK = b"# Hello\n\n" + b"Some text. " * 100 + b"\n"
+"""A chunk of a document."""
+
+
+##############################################################################
+class CountingStream(AsyncByteStream):
+    """A response body that keeps count of how much of it is read."""
+
+    def __init__(self, chunks: int, first: bytes = CHUNK) -> None:
+        """Initialise the stream.
+
+        Args:
+            chunks: The number of chunks in the body.
+            first: The first chunk of the body.
+        """
+        self.chunks = [first, *([CHUNK] * (chunks - 1))]
+        """The chunks of the body."""
+        self.read = 0
+        """The number of chunks that have been read."""
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+##############################################################################
+@fixture(autouse=True)
+def isolated_configuration(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Keep the configuration away from the user's own."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    load_configuration.cache_clear()
+
+
+##############################################################################
+def download(
+    body: CountingStream,
+    headers: dict[str, str],
+    status: int = 200,
+    progress: Callable[[str], None] | None = None,
+    progress_threshold: int = 0,
+) -> Download:
+    """Download from a stand-in server.
+
+    Args:
+        body: The body the server should respond with.
+        headers: The headers the server should respond with.
+        status: The status the server should respond with.
+        progress: Function to call with each piece of the document.
+        progress_threshold: The size at which progress is reported.
+
+    Returns:
+        The result of the download.
+    """
+
+    async def handler(_: Request) -> Response:
+        return Response(status, headers=headers, stream=body)
+
+    async def get() -> Download:
+        async with AsyncClient(transport=MockTransport(handler)) as client:
+            return await download_markdown(
+                URL("https://example.com/README.md"),
+                client=client,
+                progress=progress,
+                progress_threshold=progress_threshold,
+            )
+
+    return run(get())
+
+
+##############################################################################
+@mark.parametrize("content_type", ("text/markdown", "text/plain; charset=utf-8"))
+def test_markdown_is_downloaded(content_type: str) -> None:
+    """Markdown should be downloaded in full."""
+    body = CountingStream(3)
+    result = download(body, {"content-type": content_type})
+    assert result.markdown == (CHUNK * 3).decode()
+    assert body.read == 3
+
+
+##############################################################################
+@mark.parametrize("status", (200, 404))
+def test_body_is_not_read_if_not_wanted(status: int) -> None:
+    """The body should be left alone if it isn't Markdown, or isn't good."""
+    body = CountingStream(3)
+    result = download(body, {"content-type": "text/html"}, status)
+    assert result.markdown is None
+    assert result.response.status_code == status
+    assert body.read == 0
+
+
+##############################################################################
+def test_unknown_text_is_sniffed_as_markdown() -> None:
+    """Text with no content type should be treated as Markdown."""
+    body = CountingStream(3)
+    assert download(body, {}).markdown == (CHUNK * 3).decode()
+
+
+##############################################################################
+@mark.parametrize("first", (b"<!DOCTYPE html>" + CHUNK, b"\x89PNG\0" + CHUNK))
+def test_unknown_non_text_is_abandoned(first: bytes) -> None:
+    """Content with no content type that isn't Markdown should be abandoned."""
+    body = CountingStream(3, first)
+    assert download(body, {}).markdown is None
+    assert body.read == 1
+
+
+##############################################################################
+def test_sniffing_can_be_turned_off() -> None:
+    """If sniffing is turned off, unknown content shouldn't be Markdown."""
+    load_configuration().markdown_sniff_size = 0
+    body = CountingStream(3)
+    assert download(body, {}).markdown is None
+    assert body.read == 0
+
+
+##############################################################################
+def test_too_large_by_header() -> None:
+    """A document that says it's too large shouldn't be downloaded."""
+    load_configuration().maximum_markdown_size = len(CHUNK)
+    body = CountingStream(3)
+    result = download(
+        body, {"content-type": "text/markdown", "content-length": str(len(CHUNK) * 3)}
+    )
+    assert result.too_large
+    assert result.markdown is None
+    assert body.read == 0
+
+
+##############################################################################
+@mark.parametrize("length", ("lots", "1.5", "-1", "12, 34"))
+def test_malformed_length_is_ignored(length: str) -> None:
+    """A length that makes no sense should leave it to the body to say."""
+    load_configuration().maximum_markdown_size = len(CHUNK) * 2
+    result = download(
+        CountingStream(1), {"content-type": "text/markdown", "content-length": length}
+    )
+    assert result.markdown == CHUNK.decode()
+    body = CountingStream(3)
+    result = download(body, {"content-type": "text/markdown", "content-length": length})
+    assert result.too_large
+    assert body.read == 3
+
+
+##############################################################################
+def test_too_large_by_body() -> None:
+    """A document that turns out to be too large should be abandoned."""
+    load_configuration().maximum_markdown_size = len(CHUNK)
+    body = CountingStream(3)
+    result = download(body, {"content-type": "text/markdown"})
+    assert result.too_large
+    assert result.markdown is None
+    assert body.read == 2
+
+
+##############################################################################
+@mark.parametrize("headers", ({"content-type": "text/markdown"}, {}))
+def test_progress_is_reported(headers: dict[str, str]) -> None:
+    """Each piece of a large document should be reported as it arrives."""
+    pieces: list[str] = []
+    result = download(
+        CountingStream(4), headers, progress=pieces.append, progress_threshold=1
+    )
+    assert "".join(pieces) == result.markdown == (CHUNK * 4).decode()
+
+
+##############################################################################
+@mark.parametrize(
+    "headers, reported",
+    (
+        ({"content-type": "text/markdown"}, 3),
+        ({"content-type": "text/markdown", "content-length": str(len(CHUNK) * 4)}, 4),
+    ),
+)
+def test_progress_waits_for_a_large_document(
+    headers: dict[str, str], reported: int
+) -> None:
+    """Progress should only be reported for a document that's large enough."""
+    pieces: list[str] = []
+    download(
+        CountingStream(4),
+        headers,
+        progress=pieces.append,
+        progress_threshold=len(CHUNK) * 2,
+    )
+    assert len(pieces) == reported
+    assert "".join(pieces) == (CHUNK * 4).decode()
+
+
+##############################################################################
+def test_progress_is_not_reported_for_small_documents() -> None:
+    """Progress shouldn't be reported for a document below the threshold."""
+    pieces: list[str] = []
+    download(
+        CountingStream(2),
+        {"content-type": "text/markdown"},
+        progress=pieces.append,
+        progress_threshold=len(CHUNK) * 3,
+    )
+    assert pieces == []
+
+
+### test_download.py ends here
@@ -0,0 +1,108 @@
+"""Tests for finding the first available URL from a set of candidates."""
+
+##############################################################################
+# Python imports.
+from asyncio import run, sleep
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncClient, MockTransport, Request, Response
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from hike.network import first_available
+
+
+##############################################################################
+def candidates(*branches: str) -> list[str]:
+    """Make a list of candidate URLs for the given branches."""
+    return [f"https://example.com/{branch}/README.md" for branch in branches]
+
+
+##############################################################################
+def find(
+    branches: list[str], available: dict[str, float]
+) -> tuple[URL | None, list[str]]:
+    """Find the first available URL against a stand-in server.
+
+    Args:
+        branches: The branches to try, in order of preference.
+        available: The branches that exist, and how long they take to respond.
+
+    Returns:
+        The URL found, and the branches that ran to completion.
+    """
+    completed: list[str] = []
+
+    async def handler(request: Request) -> Response:
+        branch = request.url.path.split("/")[1]
+        await sleep(available.get(branch, 0.01))
+        completed.append(branch)
+        return Response(200 if branch in available else 404)
+
+    async def probe() -> URL | None:
+        async with AsyncClient(transport=MockTransport(handler)) as client:
+            return await first_available(candidates(*branches), 4, client)
+
+    return run(probe()), completed
+
+
+##############################################################################
+@mark.parametrize(
+    "available, expected",
+    (
+        ({}, None),
+        ({"main": 0}, "main"),
+        ({"master": 0}, "master"),
+        ({"main": 0.1, "master": 0}, "main"),
+        ({"main": 0, "master": 0.1}, "main"),
+    ),
+)
+def test_preference_is_respected(
+    available: dict[str, float], expected: str | None
+) -> None:
+    """The first available candidate in preference order should win."""
+    found, _ = find(["main", "master"], available)
+    assert found == (None if expected is None else URL(candidates(expected)[0]))
+
+
+##############################################################################
+def test_losers_are_cancelled() -> None:
+    """Once the winner is known the other probes should be abandoned."""
+    found, completed = find(["main", "master"], {"main": 0, "master": 1})
+    assert found == URL(candidates("main")[0])
+    assert completed == ["main"]
+
+
+##############################################################################
+@mark.parametrize("concurrency", (1, 2, 3, 8))
+def test_concurrency_is_limited(concurrency: int) -> None:
+    """No more than the given number of probes should be in flight at once."""
+    in_flight = 0
+    most_in_flight = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        try:
+            await sleep(0.02)
+        finally:
+            in_flight -= 1
+        return Response(404)
+
+    async def probe() -> URL | None:
+        async with AsyncClient(transport=MockTransport(handler)) as client:
+            return await first_available(
+                candidates(*(f"branch-{n}" for n in range(6))), concurrency, client
+            )
+
+    assert run(probe()) is None
+    assert most_in_flight == min(concurrency, 6)
+
+
+### test_first_available.py ends here
@@ -0,0 +1,133 @@
+"""Tests for the forge resolution cache."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+from pathlib import Path
+from time import time
+
+##############################################################################
+# httpx imports.
+from httpx import URL
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, fixture, mark
+
+##############################################################################
+# Local imports.
+from hike.data import cached_forge_url, forget_forge_url, remember_forge_url
+from hike.data.forge_cache import forge_cache_file
+from hike.messages import OpenFromForge
+
+##############################################################################
+README = URL("https://raw.githubusercontent.com/davep/hike/main/README.md")
+"""A URL to remember."""
+
+
+##############################################################################
+@fixture(autouse=True)
+def isolated_storage(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Keep the application's configuration and data out of the way."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+
+
+##############################################################################
+def test_unknown_is_not_cached() -> None:
+    """Something we've never resolved should not be in the cache."""
+    assert cached_forge_url("GitHub", "davep", "hike", None, None) is None
+
+
+##############################################################################
+def test_remember_and_recall() -> None:
+    """A remembered resolution should be recalled."""
+    remember_forge_url("GitHub", "davep", "hike", None, None, README)
+    assert cached_forge_url("GitHub", "davep", "hike", None, None) == README
+    assert cached_forge_url("GitHub", "davep", "hike", "main", None) is None
+    assert cached_forge_url("GitLab", "davep", "hike", None, None) is None
+
+
+##############################################################################
+def test_only_the_repository_ignores_case() -> None:
+    """Branches and files should be case-sensitive, owners and repositories not."""
+    remember_forge_url("GitHub", "davep", "hike", "main", "README.md", README)
+    assert cached_forge_url("github", "DavEP", "Hike", "main", "README.md") == README
+    assert cached_forge_url("GitHub", "davep", "hike", "Main", "README.md") is None
+    assert cached_forge_url("GitHub", "davep", "hike", "main", "readme.md") is None
+
+
+##############################################################################
+def test_resolutions_expire(monkeypatch: MonkeyPatch) -> None:
+    """A resolution should be forgotten once it's too old."""
+    remember_forge_url("GitHub", "davep", "hike", None, None, README)
+    monkeypatch.setattr(
+        "hike.data.forge_cache.time", lambda: time() + 365 * 24 * 60 * 60
+    )
+    assert cached_forge_url("GitHub", "davep", "hike", None, None) is None
+
+
+##############################################################################
+def test_forget_by_url() -> None:
+    """It should be possible to forget every resolution that led to a URL."""
+    remember_forge_url("GitHub", "davep", "hike", None, None, README)
+    remember_forge_url("GitHub", "davep", "hike", None, "README.md", README)
+    forget_forge_url(README)
+    assert cached_forge_url("GitHub", "davep", "hike", None, None) is None
+    assert cached_forge_url("GitHub", "davep", "hike", None, "README.md") is None
+
+
+##############################################################################
+def test_cached_resolution_skips_probing(monkeypatch: MonkeyPatch) -> None:
+    """Opening a known file from a forge should not go near the network."""
+
+    async def no_probing(*_: object) -> URL | None:
+        raise AssertionError("The forge should not have been probed")
+
+    monkeypatch.setattr("hike.messages.opening.first_available", no_probing)
+    remember_forge_url("GitHub", "davep", "hike", None, None, README)
+    request = OpenFromForge("GitHub", "{owner}/{repository}", "davep", "hike")
+    assert run(request.url()) == README
+
+
+##############################################################################
+@mark.parametrize(
+    "content",
+    (
+        "not JSON",
+        "[]",
+        '{"github:davep/hike::": "nope"}',
+        '{"github:davep/hike::": {"resolved": 0}}',
+        '{"github:davep/hike::": {"url": 42}}',
+    ),
+)
+def test_bad_caches_are_misses(content: str) -> None:
+    """A cache file, or entry, that isn't what's expected should be a miss."""
+    forge_cache_file().write_text(content, encoding="utf-8")
+    assert cached_forge_url("GitHub", "davep", "hike", None, None) is None
+    remember_forge_url("GitHub", "davep", "hike", None, "README.md", README)
+    assert cached_forge_url("GitHub", "davep", "hike", None, "README.md") == README
+
+
+##############################################################################
+def test_unsaveable_caches_are_ignored(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Not being able to save the cache shouldn't stop a forge being opened."""
+    monkeypatch.setattr(
+        "hike.data.forge_cache.forge_cache_file",
+        lambda: tmp_path / "missing" / "forge-cache.json",
+    )
+
+    async def found(*_: object) -> URL | None:
+        return README
+
+    monkeypatch.setattr("hike.messages.opening.first_available", found)
+    request = OpenFromForge(
+        "GitHub", "{owner}/{repository}", "davep", "hike", None, "README.md"
+    )
+    assert run(request.url()) == README
+    forget_forge_url(README)
+
+
+### test_forge_cache.py ends here
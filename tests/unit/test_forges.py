@@ -0,0 +1,301 @@
+"""Tests for asking forges about their repositories."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from pathlib import Path
+from threading import Thread
+from typing import Any, Iterator
+
+##############################################################################
+# httpx imports.
+from httpx import URL, AsyncClient
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, fixture, mark
+
+##############################################################################
+# Local imports.
+from hike.messages import OpenFromForge
+from hike.network import (
+    FORGE_APIS,
+    RepositoryDetails,
+    close_http_client,
+    readme_candidates,
+    repository_details,
+)
+
+
+##############################################################################
+class StandInForge(ThreadingHTTPServer):
+    """A local stand-in for a forge."""
+
+    def __init__(self) -> None:
+        """Initialise the stand-in forge."""
+        self.responses: dict[str, Any] = {}
+        """The JSON responses to give, keyed by path."""
+        self.requests: list[tuple[str, str]] = []
+        """The requests that have been made, as method and path."""
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+
+    @property
+    def root(self) -> str:
+        """The root URL of the stand-in forge."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+##############################################################################
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler for the stand-in forge."""
+
+    server: StandInForge
+
+    def _respond(self, with_body: bool) -> None:
+        self.server.requests.append((self.command, self.path))
+        if (response := self.server.responses.get(self.path)) is None:
+            self.send_error(404)
+            return
+        body = (
+            response.encode("utf-8")
+            if isinstance(response, str)
+            else dumps(response).encode("utf-8")
+        )
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._respond(True)
+
+    def do_HEAD(self) -> None:
+        self._respond(False)
+
+    def log_message(self, *_: Any) -> None:
+        pass
+
+
+##############################################################################
+@fixture
+def forge(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[StandInForge]:
+    """Provide a stand-in forge."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    server = StandInForge()
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+##############################################################################
+def contents(branch: str, *names: str) -> list[dict[str, str]]:
+    """Make a GitHub-style contents listing."""
+    return [
+        {
+            "name": name.rstrip("/"),
+            "type": "dir" if name.endswith("/") else "file",
+            "url": f"https://example.com/contents/{name.rstrip('/')}?ref={branch}",
+        }
+        for name in names
+    ]
+
+
+##############################################################################
+def details_from(
+    forge: StandInForge, name: str, response: Any
+) -> RepositoryDetails | None:
+    """Get repository details from the stand-in forge."""
+    forge.responses[FORGE_APIS[name].path.format(owner="davep", repository="hike")] = (
+        response
+    )
+
+    async def get_details() -> RepositoryDetails | None:
+        async with AsyncClient() as client:
+            return await repository_details(
+                name, "davep", "hike", api_root=forge.root, client=client
+            )
+
+    return run(get_details())
+
+
+##############################################################################
+@mark.parametrize("name", ("GitHub", "Codeberg"))
+def test_contents_listing(forge: StandInForge, name: str) -> None:
+    """A contents listing should give us the branch and the entries."""
+    assert details_from(
+        forge, name, contents("trunk", "docs/", "readme.md")
+    ) == RepositoryDetails(branch="trunk", entries=("docs/", "readme.md"))
+
+
+##############################################################################
+def test_gitlab_project(forge: StandInForge) -> None:
+    """A GitLab project should give us the branch and the README."""
+    assert details_from(
+        forge,
+        "GitLab",
+        {
+            "default_branch": "trunk",
+            "readme_url": "https://gitlab.com/davep/hike/-/blob/trunk/docs/README.md",
+        },
+    ) == RepositoryDetails(branch="trunk", readme="docs/README.md")
+
+
+##############################################################################
+def test_bitbucket_repository(forge: StandInForge) -> None:
+    """A Bitbucket repository should give us the branch."""
+    assert details_from(
+        forge, "Bitbucket", {"mainbranch": {"name": "trunk"}}
+    ) == RepositoryDetails(branch="trunk")
+
+
+##############################################################################
+@mark.parametrize(
+    "name, response, expected",
+    (
+        (
+            "GitHub",
+            [
+                "README.md",
+                None,
+                {"type": "file"},
+                {"name": 42},
+                *contents("trunk", "docs/"),
+            ],
+            RepositoryDetails(branch="trunk", entries=("docs/",)),
+        ),
+        (
+            "GitHub",
+            [{"name": "README.md", "url": 42}],
+            RepositoryDetails(entries=("README.md",)),
+        ),
+        ("GitLab", {"default_branch": 42, "readme_url": 42}, RepositoryDetails()),
+        (
+            "GitLab",
+            {"default_branch": "trunk", "readme_url": 42},
+            RepositoryDetails(branch="trunk"),
+        ),
+        ("Bitbucket", {"mainbranch": "trunk"}, RepositoryDetails()),
+        ("Bitbucket", {"mainbranch": {"name": 42}}, RepositoryDetails()),
+    ),
+)
+def test_unexpected_answers_are_ignored(
+    forge: StandInForge, name: str, response: Any, expected: RepositoryDetails
+) -> None:
+    """Parts of an answer from a forge that aren't as expected should be ignored."""
+    assert details_from(forge, name, response) == expected
+
+
+##############################################################################
+def test_unknown_repository(forge: StandInForge) -> None:
+    """Asking about a repository that doesn't exist should give nothing."""
+
+    async def get_details() -> RepositoryDetails | None:
+        async with AsyncClient() as client:
+            return await repository_details(
+                "GitHub", "davep", "nope", api_root=forge.root, client=client
+            )
+
+    assert run(get_details()) is None
+
+
+##############################################################################
+def test_unknown_forge() -> None:
+    """Asking an unknown forge about a repository should give nothing."""
+    assert run(repository_details("Nope", "davep", "hike")) is None
+
+
+##############################################################################
+PREFERRED = ["README.md", "README.markdown", "docs/README.md"]
+"""README names in order of preference."""
+
+
+##############################################################################
+@mark.parametrize(
+    "details, expected",
+    (
+        (RepositoryDetails(), PREFERRED),
+        (RepositoryDetails(entries=("readme.md",)), ["readme.md"]),
+        (
+            RepositoryDetails(entries=("README.markdown", "README.md")),
+            ["README.md", "README.markdown"],
+        ),
+        (RepositoryDetails(entries=("docs/", "setup.py")), ["docs/README.md"]),
+        (RepositoryDetails(entries=("Readme.mkd",)), []),
+        (RepositoryDetails(entries=("ReadMe.md", "README.rst")), ["ReadMe.md"]),
+        (
+            RepositoryDetails(readme="docs/README.md", entries=("README.md",)),
+            ["docs/README.md", "README.md"],
+        ),
+        (RepositoryDetails(readme="README.rst"), PREFERRED),
+    ),
+)
+def test_readme_candidates(details: RepositoryDetails, expected: list[str]) -> None:
+    """README candidates should be ranked correctly."""
+    assert readme_candidates(details, PREFERRED) == expected
+
+
+##############################################################################
+def test_readme_needs_one_request(
+    forge: StandInForge, monkeypatch: MonkeyPatch
+) -> None:
+    """Finding a README that the forge listed should take a single request."""
+    monkeypatch.setitem(
+        FORGE_APIS, "GitHub", replace(FORGE_APIS["GitHub"], root=forge.root)
+    )
+    forge.responses["/repos/davep/hike/contents"] = contents(
+        "trunk", "src/", "readme.md"
+    )
+
+    async def find_readme() -> URL | None:
+        try:
+            return await OpenFromForge(
+                "GitHub",
+                f"{forge.root}/raw/{{owner}}/{{repository}}/{{branch}}/{{file}}",
+                "davep",
+                "hike",
+            ).url()
+        finally:
+            await close_http_client()
+
+    assert run(find_readme()) == URL(f"{forge.root}/raw/davep/hike/trunk/readme.md")
+    assert forge.requests == [("GET", "/repos/davep/hike/contents")]
+
+
+##############################################################################
+def test_readme_in_a_subdirectory(
+    forge: StandInForge, monkeypatch: MonkeyPatch
+) -> None:
+    """A README in a subdirectory should only be probed for on one branch."""
+    monkeypatch.setitem(
+        FORGE_APIS, "GitHub", replace(FORGE_APIS["GitHub"], root=forge.root)
+    )
+    forge.responses["/repos/davep/hike/contents"] = contents("trunk", "docs/")
+    forge.responses["/raw/davep/hike/trunk/docs/README.md"] = "# Hike"
+
+    async def find_readme() -> URL | None:
+        try:
+            return await OpenFromForge(
+                "GitHub",
+                f"{forge.root}/raw/{{owner}}/{{repository}}/{{branch}}/{{file}}",
+                "davep",
+                "hike",
+            ).url()
+        finally:
+            await close_http_client()
+
+    assert run(find_readme()) == URL(
+        f"{forge.root}/raw/davep/hike/trunk/docs/README.md"
+    )
+    assert forge.requests == [
+        ("GET", "/repos/davep/hike/contents"),
+        ("HEAD", "/raw/davep/hike/trunk/docs/README.md"),
+    ]
+
+
+### test_forges.py ends here
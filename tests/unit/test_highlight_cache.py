@@ -0,0 +1,58 @@
+"""Tests for the cache of highlighted code."""
+
+##############################################################################
+# Local imports.
+from hike.support import HighlightCache, highlight_theme
+
+##############################################################################
+CODE = "def hello() -> None:\n    print('Hello, World!')\n"
+"""Some code to highlight."""
+
+
+##############################################################################
+def test_repeat_highlight_comes_from_the_cache() -> None:
+    """Highlighting the same code again should not highlight it again."""
+    cache = HighlightCache(10)
+    first = cache.highlight(CODE, "python", "textual")
+    assert cache.highlight(CODE, "python", "textual") is first
+    assert cache.get(CODE, "python", "textual") is first
+    assert len(cache) == 1
+
+
+##############################################################################
+def test_code_is_keyed_on_language_and_theme() -> None:
+    """The same code in another language or theme should be cached apart."""
+    cache = HighlightCache(10)
+    python = cache.highlight(CODE, "python", "textual")
+    assert cache.get(CODE, "text", "textual") is None
+    assert cache.get(CODE, "python", "ansi-dark") is None
+    cache.highlight(CODE, "python", "ansi-dark")
+    assert cache.get(CODE, "python", "textual") is python
+    assert len(cache) == 2
+
+
+##############################################################################
+def test_highlighting_is_styled() -> None:
+    """Highlighted code should have some styling."""
+    assert HighlightCache(10).highlight(CODE, "python", "textual").spans
+
+
+##############################################################################
+def test_the_cache_has_a_limit() -> None:
+    """The cache should only hold so many pieces of code."""
+    cache = HighlightCache(2)
+    for count in range(5):
+        cache.highlight(f"x = {count}\n", "python", "textual")
+    assert len(cache) == 2
+    assert cache.get("x = 0\n", "python", "textual") is None
+    assert cache.get("x = 4\n", "python", "textual") is not None
+
+
+##############################################################################
+def test_highlight_themes() -> None:
+    """Only ANSI mode should care about the darkness of the theme."""
+    assert highlight_theme(False, True) == highlight_theme(False, False)
+    assert highlight_theme(True, True) != highlight_theme(True, False)
+
+
+### test_highlight_cache.py ends here
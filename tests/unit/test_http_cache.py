@@ -0,0 +1,170 @@
+"""Tests for the on-disk HTTP response cache."""
+
+##############################################################################
+# Python imports.
+from json import loads
+from pathlib import Path
+
+##############################################################################
+# httpx imports.
+from httpx import URL, Headers
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from hike.network import HTTPCache
+
+##############################################################################
+DOCUMENT = URL("https://example.com/README.md")
+"""A URL to cache things for."""
+
+
+##############################################################################
+def test_empty_cache_has_nothing(tmp_path: Path) -> None:
+    """An empty cache should have nothing in it."""
+    cache = HTTPCache(tmp_path, 1024)
+    assert len(cache) == 0
+    assert cache.get(DOCUMENT) is None
+
+
+##############################################################################
+def test_store_and_get(tmp_path: Path) -> None:
+    """A stored response should be available from the cache."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(
+        DOCUMENT,
+        Headers({"content-type": "text/markdown", "etag": '"v1"'}),
+        "# Hello",
+    )
+    assert DOCUMENT in cache
+    assert (cached := cache.get(DOCUMENT)) is not None
+    details, body = cached
+    assert body == "# Hello"
+    assert details.content_type == "text/markdown"
+    assert details.conditional_headers == {"if-none-match": '"v1"'}
+
+
+##############################################################################
+def test_fragment_is_not_part_of_the_key(tmp_path: Path) -> None:
+    """The fragment of a URL should not matter to the cache."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT.copy_with(fragment="intro"), Headers(), "# Hello")
+    assert DOCUMENT in cache
+
+
+##############################################################################
+def test_cache_survives_reloading(tmp_path: Path) -> None:
+    """The cache should be persistent."""
+    HTTPCache(tmp_path, 1024).store(
+        DOCUMENT, Headers({"last-modified": "yesterday"}), "# Hello"
+    )
+    assert (cached := HTTPCache(tmp_path, 1024).get(DOCUMENT)) is not None
+    assert cached[0].conditional_headers == {"if-modified-since": "yesterday"}
+    assert cached[1] == "# Hello"
+
+
+##############################################################################
+@mark.parametrize(
+    "cache_control, fresh",
+    (
+        ("", False),
+        ("max-age=3600", True),
+        ("public, max-age=3600", True),
+        ("max-age=0", False),
+        ("no-cache, max-age=3600", False),
+    ),
+)
+def test_freshness(tmp_path: Path, cache_control: str, fresh: bool) -> None:
+    """The freshness of a response should follow its Cache-Control."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers({"cache-control": cache_control}), "# Hello")
+    assert (cached := cache.get(DOCUMENT)) is not None
+    assert cached[0].is_fresh is fresh
+
+
+##############################################################################
+def test_expire_makes_stale(tmp_path: Path) -> None:
+    """Expiring a response should make it need revalidation."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers({"cache-control": "max-age=3600"}), "# Hello")
+    cache.expire(DOCUMENT)
+    assert (cached := cache.get(DOCUMENT)) is not None
+    assert cached[0].is_fresh is False
+
+
+##############################################################################
+def test_revalidation_updates_details(tmp_path: Path) -> None:
+    """Revalidating should update what we know about a response."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers({"etag": '"v1"'}), "# Hello")
+    cache.revalidated(
+        DOCUMENT, Headers({"etag": '"v2"', "cache-control": "max-age=60"})
+    )
+    assert (cached := cache.get(DOCUMENT)) is not None
+    assert cached[0].etag == '"v2"'
+    assert cached[0].is_fresh is True
+
+
+##############################################################################
+def test_no_store_is_respected(tmp_path: Path) -> None:
+    """A response that says it shouldn't be stored should not be stored."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers({"cache-control": "no-store"}), "# Hello")
+    assert DOCUMENT not in cache
+
+
+##############################################################################
+def test_least_recently_used_is_evicted(tmp_path: Path) -> None:
+    """When the cache is full the least-recently-used entry should go."""
+    cache = HTTPCache(tmp_path, 20)
+    first, second, third = (URL(f"https://example.com/{n}.md") for n in range(3))
+    cache.store(first, Headers(), "1" * 8)
+    cache.store(second, Headers(), "2" * 8)
+    assert cache.get(first) is not None
+    cache.store(third, Headers(), "3" * 8)
+    assert first in cache
+    assert second not in cache
+    assert third in cache
+    assert cache.size <= 20
+
+
+##############################################################################
+def test_forget(tmp_path: Path) -> None:
+    """It should be possible to forget a response."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers(), "# Hello")
+    cache.forget(DOCUMENT)
+    assert DOCUMENT not in cache
+    assert not list(tmp_path.glob("*.body"))
+
+
+##############################################################################
+def test_uses_are_saved_in_batches(tmp_path: Path) -> None:
+    """Using the cache should only save the index every so often."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers(), "# Hello")
+    index = (tmp_path / "index.json").read_text()
+    assert (cached := cache.get(DOCUMENT)) is not None
+    assert (tmp_path / "index.json").read_text() == index
+    for _ in range(HTTPCache.SAVE_EVERY - 1):
+        cache.get(DOCUMENT)
+    assert (tmp_path / "index.json").read_text() != index
+
+
+##############################################################################
+def test_flush_saves_uses(tmp_path: Path) -> None:
+    """Flushing the cache should save any uses that haven't been saved."""
+    cache = HTTPCache(tmp_path, 1024)
+    cache.store(DOCUMENT, Headers(), "# Hello")
+    assert (cached := cache.get(DOCUMENT)) is not None
+    cache.flush()
+    assert [
+        entry["last_used"]
+        for entry in loads((tmp_path / "index.json").read_text()).values()
+    ] == [cached[0].last_used]
+
+
+### test_http_cache.py ends here
@@ -0,0 +1,37 @@
+"""Tests for the application-wide HTTP client."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+from pathlib import Path
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch
+
+##############################################################################
+# Local imports.
+from hike.data import load_configuration
+from hike.network import close_http_client, http_client
+
+
+##############################################################################
+def test_client_is_shared_until_closed(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """The same client should be handed out until it's closed."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    load_configuration.cache_clear()
+
+    async def get_clients() -> tuple[bool, bool]:
+        first = http_client()
+        shared = first is http_client()
+        await close_http_client()
+        fresh = first is not http_client() and first.is_closed
+        await close_http_client()
+        return shared, fresh
+
+    assert run(get_clients()) == (True, True)
+
+
+### test_http_client.py ends here
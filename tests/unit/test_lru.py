@@ -0,0 +1,97 @@
+"""Tests for the least-recently-used cache."""
+
+##############################################################################
+# Local imports.
+from hike.support import LRUCache
+
+
+##############################################################################
+def test_empty_cache() -> None:
+    """An empty cache should have nothing in it."""
+    cache = LRUCache[str, int](10)
+    assert len(cache) == 0
+    assert cache.size == 0
+    assert cache.get("nope") is None
+    assert cache.misses == 1
+
+
+##############################################################################
+def test_store_and_get() -> None:
+    """A value put in the cache should be available."""
+    cache = LRUCache[str, int](10)
+    cache["one"] = 1
+    assert "one" in cache
+    assert cache.get("one") == 1
+    assert cache.hits == 1
+
+
+##############################################################################
+def test_least_recently_used_goes_first() -> None:
+    """When the cache is full the least-recently-used entry should go."""
+    cache = LRUCache[str, int](2)
+    cache["one"] = 1
+    cache["two"] = 2
+    assert cache.get("one") == 1
+    cache["three"] = 3
+    assert list(cache) == ["one", "three"]
+
+
+##############################################################################
+def test_size_is_bounded() -> None:
+    """When the cache is too big the least-recently-used entries should go."""
+    cache = LRUCache[str, str](10, max_size=10, size_of=len)
+    cache["one"] = "1" * 4
+    cache["two"] = "2" * 4
+    cache["three"] = "3" * 4
+    assert list(cache) == ["two", "three"]
+    assert cache.size == 8
+
+
+##############################################################################
+def test_oversized_value_is_not_kept() -> None:
+    """A value bigger than the whole cache should not be kept."""
+    cache = LRUCache[str, str](10, max_size=10, size_of=len)
+    cache["one"] = "1" * 4
+    cache["two"] = "2" * 20
+    assert list(cache) == []
+    assert cache.size == 0
+
+
+##############################################################################
+def test_replacing_a_value() -> None:
+    """Replacing a value should keep the size right."""
+    cache = LRUCache[str, str](10, max_size=10, size_of=len)
+    cache["one"] = "1" * 4
+    cache["one"] = "1" * 2
+    assert cache.size == 2
+    assert cache.get("one") == "11"
+
+
+##############################################################################
+def test_pop() -> None:
+    """Popping a value should remove it."""
+    cache = LRUCache[str, str](10, max_size=10, size_of=len)
+    cache["one"] = "1"
+    assert cache.pop("one") == "1"
+    assert cache.pop("one") is None
+    assert cache.size == 0
+
+
+##############################################################################
+def test_discarded_is_called() -> None:
+    """Discarding an entry to make room should be reported."""
+
+    class Reporting(LRUCache[str, int]):
+        discards: list[tuple[str, int]] = []
+
+        def discarded(self, key: str, value: int) -> None:
+            self.discards.append((key, value))
+
+    cache = Reporting(1)
+    cache["one"] = 1
+    cache["two"] = 2
+    cache.pop("two")
+    assert cache.discards == [("one", 1)]
+
+
+### test_lru.py ends here
@@ -0,0 +1,98 @@
+"""Tests for the cache of parsed Markdown documents."""
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+
+##############################################################################
+# Local imports.
+from hike.support import ParseCache, markdown_parser
+
+##############################################################################
+DOCUMENT = "# Hello\n\nSome [text](other.md) for *testing*.\n"
+"""A document to parse."""
+
+
+##############################################################################
+def test_repeat_parse_comes_from_the_cache() -> None:
+    """Parsing the same document again should not parse it again."""
+    cache = ParseCache(10, 1024)
+    first = markdown_parser(cache).parse(DOCUMENT)
+    second = markdown_parser(cache).parse(DOCUMENT)
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+    assert cache.time_saved > 0
+
+
+##############################################################################
+def test_cached_parse_matches_a_real_parse() -> None:
+    """The tokens from the cache should be the same as from parsing."""
+    cache = ParseCache(10, 1024)
+    markdown_parser(cache).parse(DOCUMENT)
+    assert markdown_parser(cache).parse(DOCUMENT) == markdown_parser().parse(DOCUMENT)
+
+
+##############################################################################
+def test_parser_configuration_is_part_of_the_key() -> None:
+    """Differently-configured parsers should not share parsed documents."""
+    cache = ParseCache(10, 1024)
+    cache.parse(markdown_parser(), DOCUMENT)
+    cache.parse(MarkdownIt("commonmark"), DOCUMENT)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+##############################################################################
+def test_environment_bypasses_the_cache() -> None:
+    """A parse with an environment should always parse."""
+    cache = ParseCache(10, 1024)
+    markdown_parser(cache).parse(DOCUMENT, {})
+    markdown_parser(cache).parse(DOCUMENT, {})
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+##############################################################################
+def test_memory_is_bounded() -> None:
+    """The cache should only hold as much source as it's allowed."""
+    cache = ParseCache(10, (len(DOCUMENT) + 1) * 2)
+    for suffix in range(3):
+        cache.parse(markdown_parser(), f"{DOCUMENT}{suffix}")
+    assert len(cache) == 2
+    cache.parse(markdown_parser(), f"{DOCUMENT}0")
+    assert cache.misses == 4
+
+
+##############################################################################
+def test_large_documents_are_kept_on_disk(tmp_path: Path) -> None:
+    """A large document should be available from disk in a later session."""
+    large = DOCUMENT * 10
+    ParseCache(10, 4096, tmp_path, len(DOCUMENT) * 2, 1024 * 1024).parse(
+        markdown_parser(), large
+    )
+    ParseCache(10, 4096, tmp_path, len(DOCUMENT) * 2, 1024 * 1024).parse(
+        markdown_parser(), DOCUMENT
+    )
+    assert len(list(tmp_path.glob("*.tokens"))) == 1
+    cache = ParseCache(10, 4096, tmp_path, len(DOCUMENT) * 2, 1024 * 1024)
+    tokens = cache.parse(markdown_parser(), large)
+    assert (cache.disk_hits, cache.misses) == (1, 0)
+    assert cache.time_saved > 0
+    assert tokens == markdown_parser().parse(large)
+
+
+##############################################################################
+def test_disk_is_bounded(tmp_path: Path) -> None:
+    """The on-disk tier should stay within its size."""
+    cache = ParseCache(10, 1024 * 1024, tmp_path, 0, 1024 * 1024)
+    cache.parse(markdown_parser(), DOCUMENT)
+    (saved,) = tmp_path.glob("*.tokens")
+    cache = ParseCache(10, 1024 * 1024, tmp_path, 0, saved.stat().st_size)
+    cache.parse(markdown_parser(), f"{DOCUMENT}again")
+    assert len(list(tmp_path.glob("*.tokens"))) == 1
+
+
+### test_parse_cache.py ends here
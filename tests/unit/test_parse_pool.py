@@ -0,0 +1,84 @@
+"""Tests for parsing Markdown documents away from the event loop."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+
+##############################################################################
+# MarkdownIt imports.
+from markdown_it import MarkdownIt
+
+##############################################################################
+# Local imports.
+from hike.support import ParseCache, ParsePool, markdown_parser
+
+##############################################################################
+DOCUMENT = "# Title\n\nSome *text*.\n\n| A | B |\n|---|---|\n| 1 | 2 |\n"
+"""A document to parse."""
+
+
+##############################################################################
+def test_small_documents_are_parsed_on_a_thread() -> None:
+    """Documents under the threshold should not be parsed in a process."""
+    assert not ParsePool(len(DOCUMENT) + 1, 1).in_process(
+        markdown_parser(), len(DOCUMENT)
+    )
+
+
+##############################################################################
+def test_large_documents_are_parsed_in_a_process() -> None:
+    """Documents at or over the threshold should be parsed in a process."""
+    pool = ParsePool(len(DOCUMENT), 1)
+    assert pool.in_process(markdown_parser(), len(DOCUMENT))
+    assert pool.in_process(markdown_parser(ParseCache(1, 1024)), len(DOCUMENT))
+
+
+##############################################################################
+def test_processes_can_be_turned_off() -> None:
+    """A threshold of zero should mean never parsing in a process."""
+    assert not ParsePool(0, 1).in_process(markdown_parser(), len(DOCUMENT))
+    assert not ParsePool(1, 0).in_process(markdown_parser(), len(DOCUMENT))
+
+
+##############################################################################
+def test_other_parsers_are_parsed_on_a_thread() -> None:
+    """A parser unlike the pool's should not be used in a process."""
+    assert not ParsePool(1, 1).in_process(MarkdownIt("commonmark"), len(DOCUMENT))
+
+
+##############################################################################
+def test_parsing_in_a_process() -> None:
+    """Parsing in a process should give the same result as parsing here."""
+    pool = ParsePool(1, 1)
+
+    async def parse() -> None:
+        try:
+            assert await pool.parse(
+                markdown_parser(), DOCUMENT
+            ) == markdown_parser().parse(DOCUMENT)
+        finally:
+            pool.shutdown()
+
+    run(parse())
+
+
+##############################################################################
+def test_parsing_in_a_process_uses_the_cache() -> None:
+    """A parse in a process should still make use of the parser's cache."""
+    pool = ParsePool(1, 1)
+    cache = ParseCache(10, 1024)
+
+    async def parse() -> None:
+        try:
+            await pool.parse(markdown_parser(cache), DOCUMENT)
+            await pool.parse(markdown_parser(cache), DOCUMENT)
+        finally:
+            pool.shutdown()
+
+    run(parse())
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert markdown_parser(cache).parse(DOCUMENT) == markdown_parser().parse(DOCUMENT)
+    assert cache.hits == 2
+
+
+### test_parse_pool.py ends here
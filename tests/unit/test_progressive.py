@@ -0,0 +1,85 @@
+"""Tests for gathering up Markdown documents as they arrive."""
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from hike.support import ProgressiveMarkdown, read_progressively
+
+
+##############################################################################
+def test_nothing_is_offered_until_there_is_enough() -> None:
+    """Nothing should be offered for display until enough has arrived."""
+    loading = ProgressiveMarkdown(100)
+    assert loading.feed("# Hello\n\nThere.\n\n") is None
+    assert loading.text == "# Hello\n\nThere.\n\n"
+
+
+##############################################################################
+def test_documents_are_cut_at_blank_lines() -> None:
+    """What's offered for display should stop at the last blank line."""
+    loading = ProgressiveMarkdown(10)
+    assert loading.feed("# Hello\n\nThere.\n\nMore") == "# Hello\n\nThere.\n\n"
+    assert loading.text == "# Hello\n\nThere.\n\nMore"
+
+
+##############################################################################
+@mark.parametrize(
+    "opening, closing",
+    (("```", "```"), ("~~~~", "~~~~~"), ("```python", "```"), ("~~~", "~~~")),
+)
+def test_documents_are_not_cut_inside_fences(opening: str, closing: str) -> None:
+    """A blank line inside a fenced block shouldn't be somewhere to cut."""
+    loading = ProgressiveMarkdown(5)
+    assert loading.feed(f"Start.\n\n{opening}\ncode\n\n```python\n~~~ x\n\n") == (
+        "Start.\n\n"
+    )
+    assert loading.feed(f"{closing}\n\nAfter.\n\n") is not None
+    assert loading.text.endswith(f"{closing}\n\nAfter.\n\n")
+
+
+##############################################################################
+def test_lines_can_arrive_in_pieces() -> None:
+    """A line split across pieces should be treated as a single line."""
+    loading = ProgressiveMarkdown(20)
+    assert loading.feed("Start.\n\n``") is None
+    assert loading.feed("`\ncode\n\nmore code\n```\n\nEnd.\n") == (
+        "Start.\n\n```\ncode\n\nmore code\n```\n\n"
+    )
+
+
+##############################################################################
+def test_more_is_offered_as_it_doubles() -> None:
+    """More of the document should only be offered once what's safe doubles."""
+    loading = ProgressiveMarkdown(10)
+    paragraph = "Paragraph.\n\n"
+    offered = [loading.feed(paragraph) for _ in range(10)]
+    assert [len(text) // len(paragraph) for text in offered if text] == [1, 2, 4, 8]
+
+
+##############################################################################
+@mark.parametrize("chunk_size", (1, 3, 7, 1024))
+def test_files_are_read_in_chunks(tmp_path: Path, chunk_size: int) -> None:
+    """Reading a file progressively should give the same as reading it."""
+    (document := tmp_path / "document.md").write_bytes(
+        "# Héllo\r\n\r\nThis is — a tëst.\rThe end.\n".encode("utf-8")
+    )
+    assert "".join(read_progressively(document, chunk_size)) == (
+        document.read_text(encoding="utf-8")
+    )
+
+
+##############################################################################
+def test_empty_files_can_be_read(tmp_path: Path) -> None:
+    """An empty file should be read as nothing."""
+    (document := tmp_path / "document.md").write_text("")
+    assert list(read_progressively(document, 10)) == []
+
+
+### test_progressive.py ends here
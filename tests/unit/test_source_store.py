@@ -0,0 +1,165 @@
+"""Tests for the store of document sources."""
+
+##############################################################################
+# Python imports.
+from threading import Thread
+
+##############################################################################
+# Pytest imports.
+from pytest import mark, raises
+
+##############################################################################
+# Local imports.
+from hike.support import SourceStore
+
+##############################################################################
+SOURCE = "# Heading\n\n" + "Some text that goes on and on.\n\n" * 1_000
+"""A source that compresses well."""
+
+
+##############################################################################
+def test_the_active_source_is_plain() -> None:
+    """The active source should be available as it was given."""
+    store = SourceStore[str](1024)
+    store.activate("one", SOURCE)
+    assert store.active == SOURCE
+    assert store.active_key == "one"
+    assert store.size == len(SOURCE)
+    assert store.compressed_size == 0
+
+
+##############################################################################
+@mark.parametrize("compression", SourceStore.COMPRESSIONS)
+def test_inactive_sources_are_compressed(compression: str) -> None:
+    """A source that is no longer active should be held compressed."""
+    store = SourceStore[str](len(SOURCE), compression)
+    store.activate("one", SOURCE)
+    store.activate("two", "# Two\n")
+    assert store.compress() == 1
+    assert 0 < store.compressed_size < len(SOURCE) // 10
+    assert store.size == store.compressed_size + len("# Two\n")
+    assert store.get("one") == SOURCE
+    assert store.active == "# Two\n"
+
+
+##############################################################################
+def test_sources_waiting_to_be_compressed_can_be_had() -> None:
+    """A source should be available before it has been compressed."""
+    store = SourceStore[str](1024)
+    store.activate("one", SOURCE)
+    store.activate("two", "# Two\n")
+    assert store.compressed_size == 0
+    assert store.get("one") == SOURCE
+    assert len(store) == 2
+
+
+##############################################################################
+def test_restoring_makes_a_source_active() -> None:
+    """Restoring a source should swap it with the active one."""
+    store = SourceStore[str](len(SOURCE))
+    store.activate("one", SOURCE)
+    store.activate("two", "# Two\n")
+    store.compress()
+    assert store.restore("one") == SOURCE
+    assert store.active == SOURCE
+    assert store.active_key == "one"
+    assert "two" in store
+    assert len(store) == 2
+
+
+##############################################################################
+def test_restoring_something_unknown() -> None:
+    """Restoring a source that isn't in the store should find nothing."""
+    store = SourceStore[str](1024)
+    store.activate("one", "# One\n")
+    assert store.restore("two") is None
+    assert store.active_key == "one"
+
+
+##############################################################################
+def test_versions_must_match() -> None:
+    """A source with a different version should not be found, and go."""
+    store = SourceStore[str](1024)
+    store.activate("one", "# One\n", (1, 6))
+    store.activate("two", "# Two\n")
+    assert store.get("one", (2, 6)) is None
+    assert store.get("one", (1, 6)) == "# One\n"
+    assert store.restore("one", (2, 6)) is None
+    assert "one" not in store
+
+
+##############################################################################
+def test_unkeyed_sources_are_not_kept() -> None:
+    """An active source without a key should be dropped once inactive."""
+    store = SourceStore[str](1024)
+    store.activate(None, "# Part of one\n")
+    store.activate("one", "# One\n")
+    assert len(store) == 1
+    assert store.size == len("# One\n")
+
+
+##############################################################################
+def test_reactivating_replaces_the_source() -> None:
+    """Activating the active key again should replace its source."""
+    store = SourceStore[str](1024)
+    store.activate("one", "# One\n")
+    store.activate("one", "# One, again\n")
+    assert store.active == "# One, again\n"
+    assert len(store) == 1
+
+
+##############################################################################
+def test_the_store_keeps_to_its_budget() -> None:
+    """Only as many inactive sources as fit the budget should be kept."""
+    store = SourceStore[int](1024)
+    for key in range(100):
+        store.activate(key, f"# {key}\n\n{SOURCE[:2_000]}")
+        store.compress()
+    assert store.compressed_size <= 1024
+    assert 99 in store
+    assert 98 in store
+    assert 0 not in store
+
+
+##############################################################################
+def test_no_budget_keeps_nothing_inactive() -> None:
+    """With no budget, only the active source should be kept."""
+    store = SourceStore[str](0)
+    store.activate("one", "# One\n")
+    store.activate("two", "# Two\n")
+    assert "one" not in store
+    assert len(store) == 1
+
+
+##############################################################################
+def test_discarding() -> None:
+    """Sources should be able to be discarded."""
+    store = SourceStore[str](1024)
+    store.activate("one", "# One\n")
+    store.activate("two", "# Two\n")
+    store.discard("one")
+    store.discard("two")
+    assert len(store) == 0
+    assert store.active == ""
+
+
+##############################################################################
+def test_compressing_from_another_thread() -> None:
+    """Compressing should be able to happen away from the store's user."""
+    store = SourceStore[str](len(SOURCE))
+    store.activate("one", SOURCE)
+    store.activate("two", "# Two\n")
+    (compressor := Thread(target=store.compress)).start()
+    compressor.join()
+    assert store.compressed_size > 0
+    assert store.get("one") == SOURCE
+
+
+##############################################################################
+def test_unknown_compression() -> None:
+    """Asking for an unknown compression should be an error."""
+    with raises(ValueError):
+        SourceStore[str](1024, "zip")
+
+
+### test_source_store.py ends here
@@ -0,0 +1,152 @@
+"""Tests for the widget that shows large Markdown tables."""
+
+##############################################################################
+# Python imports.
+from asyncio import run
+
+##############################################################################
+# Textual imports.
+from textual.app import App, ComposeResult
+from textual.containers import VerticalScroll
+from textual.content import Content
+
+##############################################################################
+# Local imports.
+from hike.widgets.document import Document
+from hike.widgets.markdown_compat import MarkdownTableContent
+from hike.widgets.table import VirtualTable
+
+
+##############################################################################
+def table(rows: int) -> str:
+    """Make the Markdown for a table.
+
+    Args:
+        rows: The number of rows in the table.
+
+    Returns:
+        The Markdown for the table.
+    """
+    return "| Name | Value |\n|------|-------|\n" + "".join(
+        f"| Row {row} | {row * 2} |\n" for row in range(rows)
+    )
+
+
+##############################################################################
+class TableApp(App[None]):
+    """An application for testing the showing of tables."""
+
+    def __init__(self, markdown: str) -> None:
+        """Initialise the application.
+
+        Args:
+            markdown: The Markdown to show.
+        """
+        super().__init__()
+        self._markdown = markdown
+
+    def compose(self) -> ComposeResult:
+        with VerticalScroll():
+            yield Document(self._markdown, virtual_table_rows=100)
+
+
+##############################################################################
+def test_small_tables_are_not_virtual() -> None:
+    """A table under the threshold should be shown as normal."""
+
+    async def show() -> tuple[int, int]:
+        async with TableApp(table(10)).run_test() as pilot:
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            return (
+                len(pilot.app.query(VirtualTable)),
+                len(pilot.app.query(MarkdownTableContent)),
+            )
+
+    assert run(show()) == (0, 1)
+
+
+##############################################################################
+def test_large_tables_only_render_what_is_in_view() -> None:
+    """A large table should be shown virtually, rendering only what's seen."""
+
+    async def show() -> tuple[int, int, int]:
+        async with TableApp(table(5000)).run_test(size=(80, 24)) as pilot:
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            await pilot.pause()
+            virtual_table = pilot.app.query_one(VirtualTable)
+            return (
+                len(pilot.app.query(MarkdownTableContent)),
+                virtual_table.size.height,
+                len({line for line, _ in virtual_table._lines.keys()}),
+            )
+
+    grid_tables, height, rendered = run(show())
+    assert grid_tables == 0
+    assert height == 5002
+    assert 0 < rendered <= 24
+
+
+##############################################################################
+def test_column_widths() -> None:
+    """Columns should be as wide as their widest cell, if there's room."""
+    virtual_table = VirtualTable(
+        [Content("A"), Content("B")],
+        [[Content("Short"), Content("A" * 20)], [Content("Longer one"), Content("")]],
+    )
+    assert virtual_table.column_widths(80) == [10, 20]
+    assert virtual_table.column_widths(25) == [10, 10]
+    assert virtual_table.column_widths(80) is virtual_table.column_widths(80)
+
+
+##############################################################################
+def test_cells_are_clipped() -> None:
+    """Cells that are too wide for their column should be clipped."""
+
+    async def show() -> list[str]:
+        async with TableApp(
+            "| Name | Description |\n|---|---|\n"
+            + "".join(f"| {row} | {'word ' * 40} |\n" for row in range(200))
+        ).run_test(size=(40, 24)) as pilot:
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            virtual_table = pilot.app.query_one(VirtualTable)
+            return [virtual_table.render_line(line).text for line in range(3)]
+
+    header, rule, row = run(show())
+    assert header.startswith(" Name │ Description")
+    assert set(rule) <= {"─", "┼", " "}
+    assert row.rstrip().endswith("…")
+    assert len(row) == len(header)
+
+
+##############################################################################
+def test_cells_keep_their_styles() -> None:
+    """Inline markup in the cells of a large table should still be styled."""
+
+    async def show() -> tuple[bool, bool]:
+        async with TableApp(
+            "| Name | Value |\n|---|---|\n"
+            + "".join(f"| *Row {row}* | `{row}` |\n" for row in range(200))
+        ).run_test() as pilot:
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            line = pilot.app.query_one(VirtualTable).render_line(2)
+            return (
+                any(
+                    segment.style is not None and bool(segment.style.italic)
+                    for segment in line
+                    if "Row" in segment.text
+                ),
+                any(
+                    segment.style is not None and segment.style.bgcolor is not None
+                    for segment in line
+                    if segment.text.strip() == "0"
+                ),
+            )
+
+    assert run(show()) == (True, True)
+
+
+### test_table.py ends here
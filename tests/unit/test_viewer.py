@@ -0,0 +1,706 @@
+"""Tests for the Markdown viewer widget."""
+
+##############################################################################
+# Python imports.
+from asyncio import gather, run, sleep
+from pathlib import Path
+from time import sleep as block
+from typing import Iterator
+
+##############################################################################
+# httpx imports.
+from httpx import URL, Headers, Request, Response, codes
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, fixture, mark
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.app import App, ComposeResult
+from textual.pilot import Pilot
+from textual.widgets import Markdown
+from textual.widgets.markdown import MarkdownBlock
+from textual.worker import Worker
+
+##############################################################################
+# Local imports.
+from hike.data import load_configuration, update_configuration
+from hike.messages import OpenLocation
+from hike.network import Download, HTTPCache
+from hike.support import read_progressively
+from hike.types import HikeHistory, HikeLocation
+from hike.widgets import Viewer
+
+
+##############################################################################
+class CountingViewer(Viewer):
+    """A viewer that counts the loads it performs."""
+
+    def __init__(self) -> None:
+        """Initialise the viewer."""
+        super().__init__()
+        self.loads: list[HikeLocation] = []
+        """The locations that have been loaded, in order."""
+        self.reads: list[Path] = []
+        """The local files that have been read, in order."""
+
+    def _load_markdown(
+        self, location: HikeLocation | None, remember: bool, generation: int
+    ) -> None:
+        if location is not None:
+            self.loads.append(location)
+        super()._load_markdown(location, remember, generation)
+
+    def _load_from_file(
+        self, location: Path, remember: bool, generation: int
+    ) -> Worker[None]:
+        self.reads.append(location)
+        return super()._load_from_file(location, remember, generation)
+
+
+##############################################################################
+class ViewerApp(App[None]):
+    """An application for testing the viewer."""
+
+    def compose(self) -> ComposeResult:
+        yield CountingViewer()
+
+
+##############################################################################
+@fixture(autouse=True)
+def isolated_storage(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[None]:
+    """Keep the application's configuration and data out of the way."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    load_configuration.cache_clear()
+    yield
+    load_configuration.cache_clear()
+
+
+##############################################################################
+@fixture
+def documents(tmp_path: Path) -> tuple[Path, Path]:
+    """A couple of documents to visit."""
+    (first := tmp_path / "first.md").write_text("# First\n", encoding="utf-8")
+    (second := tmp_path / "second.md").write_text("# Second\n", encoding="utf-8")
+    return first, second
+
+
+##############################################################################
+async def settle(pilot: Pilot[None]) -> None:
+    """Give the viewer time to finish everything it's doing."""
+    for _ in range(5):
+        while any(not worker.is_finished for worker in pilot.app.workers):
+            await pilot.pause()
+        await pilot.pause()
+
+
+##############################################################################
+def test_each_navigation_loads_once(documents: tuple[Path, Path]) -> None:
+    """Every navigation should result in exactly one load."""
+    first, second = documents
+    with update_configuration() as config:
+        config.rendered_documents = 0
+        config.source_store_size = 0
+
+    async def navigate() -> list[HikeLocation]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            viewer.backward()
+            await settle(pilot)
+            viewer.forward()
+            await settle(pilot)
+            return viewer.loads
+
+    assert run(navigate()) == [first, second, first, second]
+
+
+##############################################################################
+def test_history_is_recorded_without_reloading(documents: tuple[Path, Path]) -> None:
+    """Recording a load in history should not load the document again."""
+    first, second = documents
+
+    async def navigate() -> tuple[list[HikeLocation], list[HikeLocation]]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            return viewer.loads, list(viewer.history)
+
+    loads, history = run(navigate())
+    assert loads == history == [first, second]
+
+
+##############################################################################
+def test_only_the_final_history_target_is_loaded(
+    documents: tuple[Path, Path], tmp_path: Path
+) -> None:
+    """Hammering through history should only load where we end up."""
+    first, second = documents
+    (third := tmp_path / "third.md").write_text("# Third\n", encoding="utf-8")
+
+    async def navigate() -> tuple[list[HikeLocation], str]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.history = HikeHistory([first, second, third])
+            await settle(pilot)
+            viewer.loads.clear()
+            viewer.backward()
+            viewer.backward()
+            viewer.forward()
+            viewer.backward()
+            await settle(pilot)
+            return viewer.loads, viewer.source
+
+    assert run(navigate()) == ([first], "# First\n")
+
+
+##############################################################################
+def test_stale_loads_are_ignored(documents: tuple[Path, Path]) -> None:
+    """Content from an older load should never make it into the view."""
+    first, second = documents
+
+    async def navigate() -> tuple[str, list[HikeLocation]]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            stale = viewer._generation
+            viewer.location = second
+            await settle(pilot)
+            viewer.post_message(Viewer.Loaded(viewer, "# Stale\n", True, stale))
+            await settle(pilot)
+            return viewer.source, list(viewer.history)
+
+    assert run(navigate()) == ("# Second\n", [first, second])
+
+
+##############################################################################
+def test_linked_documents_are_prefetched(documents: tuple[Path, Path]) -> None:
+    """With prefetching on, following a link should not need a read."""
+    first, second = documents
+    first.write_text(f"# First\n\nSee [the second]({second.name}).\n")
+    with update_configuration() as config:
+        config.prefetch_links = True
+
+    async def navigate() -> tuple[list[Path], str]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            return viewer.reads, viewer.source
+
+    assert run(navigate()) == ([first], "# Second\n")
+
+
+##############################################################################
+def test_prefetch_is_off_by_default(documents: tuple[Path, Path]) -> None:
+    """Prefetching should only happen if asked for."""
+    first, second = documents
+    first.write_text(f"# First\n\nSee [the second]({second.name}).\n")
+
+    async def navigate() -> list[Path]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            return viewer.reads
+
+    assert run(navigate()) == [first, second]
+
+
+##############################################################################
+def test_revisits_are_not_parsed_again(documents: tuple[Path, Path]) -> None:
+    """Going back to a document should use the cached parse of it."""
+    first, second = documents
+    with update_configuration() as config:
+        config.rendered_documents = 0
+        config.source_store_size = 0
+
+    async def navigate() -> tuple[int, int]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            parsed = viewer.parse_cache.misses
+            viewer.backward()
+            await settle(pilot)
+            return viewer.parse_cache.hits, viewer.parse_cache.misses - parsed
+
+    assert run(navigate()) == (1, 0)
+
+
+##############################################################################
+def long_document(title: str) -> str:
+    """Make a document long enough to scroll."""
+    return f"# {title}\n\n" + "".join(
+        f"Paragraph {paragraph}.\n\n" for paragraph in range(100)
+    )
+
+
+##############################################################################
+def test_return_visits_are_swapped_in(tmp_path: Path) -> None:
+    """Going back and forward should put the rendered documents back."""
+    (first := tmp_path / "first.md").write_text(long_document("First"))
+    (second := tmp_path / "second.md").write_text(long_document("Second"))
+
+    async def navigate() -> tuple[list[HikeLocation], bool, float, str]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            rendered = viewer._document
+            viewer.query_one("#document").scroll_to(y=20, animate=False)
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            viewer.backward()
+            await settle(pilot)
+            return (
+                viewer.loads,
+                viewer._document is rendered,
+                viewer.query_one("#document").scroll_y,
+                viewer.source,
+            )
+
+    assert run(navigate()) == ([first, second], True, 20, long_document("First"))
+
+
+##############################################################################
+def test_changed_files_are_not_swapped_in(documents: tuple[Path, Path]) -> None:
+    """A local document that has changed should be loaded again."""
+    first, second = documents
+
+    async def navigate() -> tuple[list[HikeLocation], str]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            first.write_text("# First, again\n")
+            viewer.backward()
+            await settle(pilot)
+            return viewer.loads, viewer.source
+
+    assert run(navigate()) == ([first, second, first], "# First, again\n")
+
+
+##############################################################################
+def test_return_visits_use_stored_sources(documents: tuple[Path, Path]) -> None:
+    """A document no longer rendered should be rendered again from its source."""
+    first, second = documents
+    with update_configuration() as config:
+        config.rendered_documents = 0
+
+    async def navigate() -> tuple[list[HikeLocation], str, bool, bool]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            viewer.backward()
+            await settle(pilot)
+            return (
+                viewer.loads,
+                viewer.source,
+                viewer.sources.active_key == first,
+                second in viewer.sources,
+            )
+
+    assert run(navigate()) == ([first, second], "# First\n", True, True)
+
+
+##############################################################################
+def test_rendered_documents_are_limited(tmp_path: Path) -> None:
+    """Only so many rendered documents should be kept around."""
+    with update_configuration() as config:
+        config.rendered_documents = 2
+        config.recycled_block_widgets = 0
+    locations = [tmp_path / f"{name}.md" for name in ("one", "two", "three", "four")]
+    for location in locations:
+        location.write_text(f"# {location.stem}\n")
+
+    async def navigate() -> int:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            for location in locations:
+                viewer.location = location
+                await settle(pilot)
+            return len(viewer.query(Markdown))
+
+    assert run(navigate()) == 2
+
+
+##############################################################################
+def test_new_documents_are_shown_in_a_spare(tmp_path: Path) -> None:
+    """A document no longer kept should have its widgets reused."""
+    with update_configuration() as config:
+        config.rendered_documents = 1
+    locations = [tmp_path / f"{name}.md" for name in ("one", "two", "three")]
+    for location in locations:
+        location.write_text(long_document(location.stem).replace(".", location.stem))
+
+    async def navigate() -> tuple[int, bool, int]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = locations[0]
+            await settle(pilot)
+            first = viewer._document
+            for location in locations[1:]:
+                viewer.location = location
+                await settle(pilot)
+            return (
+                len(viewer.query(Markdown)),
+                viewer._document is first,
+                viewer._document.timings.recycled,
+            )
+
+    assert run(navigate()) == (2, True, 101)
+
+
+##############################################################################
+def test_watched_documents_are_reloaded_in_place(tmp_path: Path) -> None:
+    """A watched document that changes on disk should be updated in place."""
+    (document := tmp_path / "document.md").write_text(long_document("Before"))
+    with update_configuration() as config:
+        config.watch_local_documents = True
+        config.watch_debounce = 0.05
+        config.watch_poll_interval = 0.02
+
+    async def navigate() -> tuple[list[HikeLocation], bool, float, str]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = document
+            await settle(pilot)
+            rendered = viewer._document
+            viewer.query_one("#document").scroll_to(y=20, animate=False)
+            await settle(pilot)
+            document.write_text(long_document("After"))
+            for _ in range(100):
+                if viewer.source != long_document("Before"):
+                    break
+                await pilot.pause(0.05)
+            await settle(pilot)
+            return (
+                viewer.loads,
+                viewer._document is rendered,
+                viewer.query_one("#document").scroll_y,
+                viewer.source,
+            )
+
+    assert run(navigate()) == ([document], True, 20, long_document("After"))
+
+
+##############################################################################
+def test_documents_are_not_watched_by_default(documents: tuple[Path, Path]) -> None:
+    """Watching local documents should only happen if asked for."""
+    first, _ = documents
+
+    async def navigate() -> bool:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            return viewer._watcher is None
+
+    assert run(navigate())
+
+
+##############################################################################
+def test_navigating_stops_the_watch(documents: tuple[Path, Path]) -> None:
+    """Moving to another document should stop watching the last one."""
+    first, second = documents
+    with update_configuration() as config:
+        config.watch_local_documents = True
+
+    async def navigate() -> tuple[bool, Path | None]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            assert (watcher := viewer._watcher) is not None
+            viewer.location = second
+            await settle(pilot)
+            return watcher.stopped, (
+                None if viewer._watcher is None else viewer._watcher.path
+            )
+
+    assert run(navigate()) == (True, second)
+
+
+##############################################################################
+class LoadRecordingApp(ViewerApp):
+    """An application for testing the viewer that records what it loads."""
+
+    def __init__(self) -> None:
+        """Initialise the application."""
+        super().__init__()
+        self.loaded: list[tuple[bool, int]] = []
+        """If each load was partial, and its size, in order."""
+
+    @on(Viewer.Loaded)
+    def _record_load(self, message: Viewer.Loaded) -> None:
+        self.loaded.append((message.partial, len(message.markdown)))
+
+
+##############################################################################
+class LinkFollowingApp(ViewerApp):
+    """An application that follows the links in the viewer."""
+
+    @on(OpenLocation)
+    def _open(self, message: OpenLocation) -> None:
+        self.query_one(CountingViewer).location = message.to_open
+
+
+##############################################################################
+def sectioned_document(title: str) -> str:
+    """Make a document with many sections."""
+    return f"# {title}\n\n" + "".join(
+        f"## Section {section}\n\n" + "Paragraph.\n\n" * 5 for section in range(50)
+    )
+
+
+##############################################################################
+def click_link(viewer: Viewer, href: str) -> None:
+    """Click on a link in the document that the viewer is showing."""
+    viewer._document.post_message(Markdown.LinkClicked(viewer._document, href))
+
+
+##############################################################################
+def test_links_to_anchors_in_other_documents(tmp_path: Path) -> None:
+    """Following a link with an anchor should jump to it once loaded."""
+    (first := tmp_path / "first.md").write_text("# First\n")
+    (second := tmp_path / "second.md").write_text(sectioned_document("Second"))
+
+    async def navigate() -> tuple[HikeLocation | None, str | None]:
+        async with LinkFollowingApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            click_link(viewer, "second.md#section-40")
+            await settle(pilot)
+            scroller = viewer.query_one("#document")
+            return viewer.location, next(
+                (
+                    block.source
+                    for block in viewer._document.query_children(MarkdownBlock)
+                    if block.region.y >= scroller.region.y
+                ),
+                None,
+            )
+
+    assert run(navigate()) == (second, "## Section 40\n")
+
+
+##############################################################################
+def test_links_to_anchors_in_the_same_document(tmp_path: Path) -> None:
+    """Following a link to an anchor in the document shouldn't load it again."""
+    (first := tmp_path / "first.md").write_text(sectioned_document("First"))
+
+    async def navigate() -> tuple[list[HikeLocation], float, float]:
+        async with LinkFollowingApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            scroller = viewer.query_one("#document")
+            click_link(viewer, "#section-20")
+            await settle(pilot)
+            internal = scroller.scroll_y
+            click_link(viewer, "first.md#section-30")
+            await settle(pilot)
+            return viewer.loads, internal, scroller.scroll_y
+
+    loads, internal, relative = run(navigate())
+    assert loads == [first]
+    assert 0 < internal < relative
+
+
+##############################################################################
+def test_large_documents_are_shown_as_they_load(tmp_path: Path) -> None:
+    """A large local document should be shown a part at a time as it's read."""
+    (large := tmp_path / "large.md").write_text(
+        "".join(f"Paragraph {paragraph}.\n\n" for paragraph in range(2000)),
+        encoding="utf-8",
+    )
+    with update_configuration() as config:
+        config.progressive_load_threshold = 1024
+        config.progressive_load_chunk_size = 1024
+
+    async def navigate() -> tuple[str, list[HikeLocation], list[tuple[bool, int]]]:
+        async with (app := LoadRecordingApp()).run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = large
+            await settle(pilot)
+            return viewer.source, list(viewer.history), app.loaded
+
+    source, history, loaded = run(navigate())
+    assert source == large.read_text(encoding="utf-8")
+    assert history == [large]
+    assert len(loaded) > 2
+    assert all(partial for partial, _ in loaded[:-1])
+    assert [size for _, size in loaded] == sorted(size for _, size in loaded)
+    assert loaded[-1] == (False, len(source))
+
+
+##############################################################################
+def test_leaving_a_document_while_it_loads(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """Moving away from a document part way through reading it should stop the read."""
+    (large := tmp_path / "large.md").write_text(
+        "".join(f"Paragraph {paragraph}.\n\n" for paragraph in range(2000)),
+        encoding="utf-8",
+    )
+    (small := tmp_path / "small.md").write_text("# Small\n", encoding="utf-8")
+    with update_configuration() as config:
+        config.progressive_load_threshold = 1024
+        config.progressive_load_chunk_size = 1024
+    read: list[str] = []
+
+    def read_slowly(location: Path, chunk_size: int) -> Iterator[str]:
+        for chunk in read_progressively(location, chunk_size):
+            block(0.01)
+            read.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr("hike.widgets.viewer.read_progressively", read_slowly)
+
+    async def navigate() -> tuple[str, list[HikeLocation]]:
+        async with (app := LoadRecordingApp()).run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = large
+            while not app.loaded:
+                await sleep(0.001)
+            viewer.location = small
+            await settle(pilot)
+            return viewer.source, list(viewer.history)
+
+    assert run(navigate()) == ("# Small\n", [small])
+    assert 0 < len("".join(read)) < len(large.read_text(encoding="utf-8"))
+
+
+##############################################################################
+class ContentsRecordingApp(ViewerApp):
+    """An application that records the tables of contents that reach it."""
+
+    def __init__(self) -> None:
+        """Initialise the application."""
+        super().__init__()
+        self.contents: list[str] = []
+        """The first heading of each table of contents, in order."""
+
+    @on(Markdown.TableOfContentsUpdated)
+    def _record_contents(self, message: Markdown.TableOfContentsUpdated) -> None:
+        if message.table_of_contents:
+            self.contents.append(message.table_of_contents[0][1])
+
+
+##############################################################################
+def test_outline_mode_only_changes_the_document_on_display(tmp_path: Path) -> None:
+    """Toggling outline mode should leave kept documents until they're shown."""
+    (first := tmp_path / "first.md").write_text(sectioned_document("First"))
+    (second := tmp_path / "second.md").write_text(sectioned_document("Second"))
+
+    async def navigate() -> tuple[bool, bool, list[str], bool]:
+        async with (app := ContentsRecordingApp()).run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = first
+            await settle(pilot)
+            viewer.location = second
+            await settle(pilot)
+            kept = viewer._document
+            viewer.backward()
+            await settle(pilot)
+            app.contents.clear()
+            viewer.outline = True
+            await settle(pilot)
+            toggled = viewer._document.outline, kept.outline, [*app.contents]
+            viewer.forward()
+            await settle(pilot)
+            return *toggled, kept.outline
+
+    assert run(navigate()) == (True, False, ["First"], True)
+
+
+##############################################################################
+def test_conditional_downloads_are_not_shared(monkeypatch: MonkeyPatch) -> None:
+    """A download shouldn't join a conditional download of the same URL."""
+    asked_for: list[dict[str, str]] = []
+
+    async def download(
+        _: URL, headers: dict[str, str] | None = None, **__: object
+    ) -> Download:
+        asked_for.append(headers or {})
+        await sleep(0.05)
+        return Download(Response(304)) if headers else Download(Response(200), "# Hi")
+
+    monkeypatch.setattr("hike.widgets.viewer.download_markdown", download)
+    location = URL("https://example.com/README.md")
+
+    async def downloads() -> tuple[Download, Download, Download]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            return await gather(
+                viewer._download(location, {"if-none-match": '"v1"'}),
+                viewer._download(location, {}),
+                viewer._download(location, {}),
+            )
+
+    revalidated, *downloaded = run(downloads())
+    assert revalidated.response.status_code == 304
+    assert [download.markdown for download in downloaded] == ["# Hi", "# Hi"]
+    assert asked_for == [{"if-none-match": '"v1"'}, {}]
+
+
+##############################################################################
+@mark.parametrize(
+    "status, kept",
+    (
+        (codes.SERVICE_UNAVAILABLE, True),
+        (codes.TOO_MANY_REQUESTS, True),
+        (codes.NOT_FOUND, False),
+        (codes.GONE, False),
+    ),
+)
+def test_response_errors_only_forget_documents_that_have_gone(
+    tmp_path: Path, monkeypatch: MonkeyPatch, status: int, kept: bool
+) -> None:
+    """An error revalidating a cached document should only forget it if it's gone."""
+    location = URL("https://example.com/README.md")
+    cache = HTTPCache(tmp_path / "http", 1024 * 1024)
+    cache.store(location, Headers({"etag": '"v1"'}), "# Cached")
+    monkeypatch.setattr("hike.network.cache._cache", cache)
+
+    async def download(_: URL, *__: object, **___: object) -> Download:
+        return Download(Response(status, request=Request("GET", location)))
+
+    monkeypatch.setattr("hike.widgets.viewer.download_markdown", download)
+
+    async def navigate() -> tuple[str, int]:
+        async with ViewerApp().run_test() as pilot:
+            viewer = pilot.app.query_one(CountingViewer)
+            viewer.location = location
+            await settle(pilot)
+            return viewer.source, len(pilot.app._notifications)
+
+    assert run(navigate()) == ("# Cached", 0)
+    assert (location in cache) is kept
+
+
+### test_viewer.py ends here
@@ -0,0 +1,140 @@
+"""Tests for watching files for changes."""
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from threading import Event
+from time import sleep
+from typing import Callable
+
+##############################################################################
+# Pytest imports.
+from pytest import mark, raises
+
+##############################################################################
+# Local imports.
+from hike.support import FileWatcher, watch_file
+from hike.support.watch import PollingFileWatcher
+
+##############################################################################
+WatcherMaker = Callable[[Path, str, Callable[[str], None]], FileWatcher]
+"""Type of a function that makes a file watcher."""
+
+WATCHERS: list[WatcherMaker] = [
+    lambda path, content, on_change: PollingFileWatcher(
+        path, content, on_change, 0.1, 0.02
+    ).start(),
+    lambda path, content, on_change: watch_file(path, content, on_change, 0.1, 0.02),
+]
+"""The ways of making a watcher to test."""
+
+
+##############################################################################
+class Changes:
+    """Collects the changes reported by a watcher."""
+
+    def __init__(self) -> None:
+        """Initialise the collection."""
+        self.seen: list[str] = []
+        """The content reported, in order."""
+        self.reported = Event()
+        """Set when a change is reported."""
+
+    def __call__(self, content: str) -> None:
+        self.seen.append(content)
+        self.reported.set()
+
+
+##############################################################################
+def watching(make: WatcherMaker, path: Path, changes: Changes) -> FileWatcher:
+    """Start watching a file."""
+    return make(path, path.read_text(), changes)
+
+
+##############################################################################
+@mark.parametrize("make", WATCHERS)
+def test_changes_are_reported(make: WatcherMaker, tmp_path: Path) -> None:
+    """A change to the content of a file should be reported."""
+    (document := tmp_path / "document.md").write_text("# Before\n")
+    watcher = watching(make, document, changes := Changes())
+    try:
+        sleep(0.1)
+        document.write_text("# After\n")
+        assert changes.reported.wait(5)
+    finally:
+        watcher.stop()
+    assert changes.seen == ["# After\n"]
+
+
+##############################################################################
+@mark.parametrize("make", WATCHERS)
+def test_bursts_are_debounced(make: WatcherMaker, tmp_path: Path) -> None:
+    """A burst of writes should be reported as a single change."""
+    (document := tmp_path / "document.md").write_text("# Before\n")
+    watcher = watching(make, document, changes := Changes())
+    try:
+        sleep(0.1)
+        for write in range(5):
+            document.write_text(f"# Write {write}\n")
+            sleep(0.03)
+        assert changes.reported.wait(5)
+        sleep(0.3)
+    finally:
+        watcher.stop()
+    assert changes.seen == ["# Write 4\n"]
+
+
+##############################################################################
+@mark.parametrize("make", WATCHERS)
+def test_unchanged_content_is_not_reported(make: WatcherMaker, tmp_path: Path) -> None:
+    """Writing the same content again should not be reported."""
+    (document := tmp_path / "document.md").write_text("# Same\n")
+    watcher = watching(make, document, changes := Changes())
+    try:
+        sleep(0.1)
+        document.write_text("# Same\n")
+        assert not changes.reported.wait(0.5)
+    finally:
+        watcher.stop()
+    assert changes.seen == []
+
+
+##############################################################################
+@mark.parametrize("make", WATCHERS)
+def test_replaced_files_are_reported(make: WatcherMaker, tmp_path: Path) -> None:
+    """A file being replaced by another should be reported."""
+    (document := tmp_path / "document.md").write_text("# Before\n")
+    watcher = watching(make, document, changes := Changes())
+    try:
+        sleep(0.1)
+        (replacement := tmp_path / "replacement.md").write_text("# Replaced\n")
+        replacement.replace(document)
+        assert changes.reported.wait(5)
+    finally:
+        watcher.stop()
+    assert changes.seen == ["# Replaced\n"]
+
+
+##############################################################################
+@mark.parametrize("make", WATCHERS)
+def test_other_files_are_ignored(make: WatcherMaker, tmp_path: Path) -> None:
+    """Changes to other files should not be reported."""
+    (document := tmp_path / "document.md").write_text("# Document\n")
+    watcher = watching(make, document, changes := Changes())
+    try:
+        sleep(0.1)
+        (tmp_path / "other.md").write_text("# Other\n")
+        assert not changes.reported.wait(0.5)
+    finally:
+        watcher.stop()
+    assert changes.seen == []
+
+
+##############################################################################
+def test_a_watcher_needs_a_way_to_notice_activity(tmp_path: Path) -> None:
+    """A watcher that can't notice activity on the file can't be made."""
+    with raises(TypeError):
+        FileWatcher(tmp_path / "document.md", "", print, 0.1)  # type: ignore[abstract]
+
+
+### test_watch.py ends here